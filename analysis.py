@@ -0,0 +1,102 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from solver import search_astar
+
+def get_owners(game: dict) -> list[int]:
+    """Index of the car covering each cell, -1 when empty."""
+    width = game['width']
+    owners = [-1] * (width * game['height'])
+    for i, ((x, y), orientation, size) in enumerate(game['cars']):
+        step = 1 if orientation == 'h' else width
+        for j in range(size):
+            owners[y * width + x + j * step] = i
+    return owners
+
+def get_locked_cars(game: dict) -> list[int]:
+    """Cars that can never move: each end of the car is against the border or a car that can never move either."""
+    width, height = game['width'], game['height']
+    owners = get_owners(game)
+
+    def is_wall(x, y, locked):
+        return not (0 <= x < width and 0 <= y < height) or owners[y * width + x] in locked
+
+    # start from every car and free the ones with room on one side until nothing changes
+    locked = set(range(len(game['cars'])))
+    changed = True
+    while changed:
+        changed = False
+        for i in sorted(locked):
+            (x, y), orientation, size = game['cars'][i]
+            if orientation == 'h':
+                stuck = is_wall(x - 1, y, locked) and is_wall(x + size, y, locked)
+            else:
+                stuck = is_wall(x, y - 1, locked) and is_wall(x, y + size, locked)
+            if not stuck:
+                locked.discard(i)
+                changed = True
+    return sorted(locked)
+
+def get_exit_blockers(game: dict, locked: list[int]) -> list[int]:
+    """Cars that will always stand between car A and the exit (A itself if it can't reach it)."""
+    if not game['cars']:
+        return []
+    (a_x, a_y), a_orientation, a_size = game['cars'][0]
+    if a_orientation != 'h':
+        return [0]
+    if a_x + a_size >= game['width']:
+        return []
+    if 0 in locked:
+        return [0]
+    blockers = []
+    for i, ((x, y), orientation, size) in enumerate(game['cars'][1:], 1):
+        if orientation == 'h':
+            # on A's row for good
+            in_the_way = y == a_y and x > a_x
+        else:
+            in_the_way = x >= a_x + a_size and y <= a_y < y + size
+            # too long to get out of the row, up or down
+            in_the_way = in_the_way and (i in locked or (a_y < size and game['height'] - a_y - 1 < size))
+        if in_the_way:
+            blockers.append(i)
+    return blockers
+
+def analyse_game(game: dict, max_expanded: int = 200_000) -> dict:
+    """Locked cars, cars that make the game unwinnable, and the optimal length if it is within max_moves.
+
+    winnable is None when the search gave up after max_expanded states.
+    """
+    locked = get_locked_cars(game)
+    analysis = {
+        'locked': locked,
+        'exit_blockers': get_exit_blockers(game, locked),
+        'optimal': None,
+        'winnable': False,
+        'explored': 0,
+    }
+    if analysis['exit_blockers']:
+        return analysis
+    # only looks for solutions within max_moves, with the locked cars left out
+    result = search_astar(game, max_cost=game['max_moves'], max_expanded=max_expanded, locked=locked)
+    analysis['explored'] = result['explored']
+    if result['moves'] is not None:
+        analysis['optimal'] = len(result['moves'])
+        analysis['winnable'] = True
+    elif not result['complete']:
+        analysis['winnable'] = None
+    return analysis
+
+def get_analysis_str(analysis: dict) -> str:
+    """Return a printable report of analyse_game."""
+    letters = lambda cars: ", ".join(chr(65 + i) for i in cars) or "none"
+    lines = [f"Locked cars:    {letters(analysis['locked'])}"]
+    if analysis['exit_blockers']:
+        lines.append(f"Unwinnable:     {letters(analysis['exit_blockers'])} never leave{'s' if len(analysis['exit_blockers']) == 1 else ''} A's way")
+    elif analysis['winnable']:
+        lines.append(f"Winnable:       in {analysis['optimal']} moves")
+    elif analysis['winnable'] is None:
+        lines.append(f"Winnable:       unknown, gave up after {analysis['explored']} states")
+    else:
+        lines.append("Unwinnable:     not within max_moves")
+    return "\n".join(lines)
@@ -0,0 +1,106 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+import asyncio
+import time
+
+from getkey import keys_terminal, start_key_reader
+from ulbloque import (get_controls_str, get_game_str, get_move_update_str, get_message_update_str, new_session,
+                      apply_key, is_win, start_hint_table, new_shown_hint, get_show_hint_str, get_hide_hint_str,
+                      get_unwinnable_str, get_dead_position_str, get_table_ready_str)
+
+# Line under the hint message holding the clock and the hint table progress.
+STATUS_LINE = 1
+
+def get_status_str(elapsed: float, hints: dict) -> str:
+    """Return the status line: time since the start and whether hints are ready."""
+    minutes, seconds = divmod(int(elapsed), 60)
+    if hints.get('unavailable'):
+        hint = "unavailable"
+    else:
+        hint = "ready, press ?" if hints['distances'] is not None else "thinking..."
+    return f"Time: {minutes}:{seconds:02d}   Hint: {hint}"
+
+async def read_key(keys: asyncio.Queue) -> str:
+    """Waits for the next key decoded by start_key_reader."""
+    return await keys.get()
+
+async def play_game_async(game: dict, tick: float = 0.25) -> int:
+    """play_game where keys are awaited, so the status line keeps updating between keys (Unix only)."""
+    loop = asyncio.get_running_loop()
+    session = new_session(game)
+    controls = get_controls_str()
+    top = len(controls.splitlines())
+    start_time = time.monotonic()
+
+    def write(updates: str):
+        print(updates, end="", flush=True)
+
+    def end_screen(message: str):
+        print("\033[H\033[J", end="")
+        print(get_game_str(game, session['moves']))
+        print(message)
+
+    async def update_status():
+        # redrawn only when the text changes, at most once per tick
+        status = None
+        while True:
+            text = get_status_str(time.monotonic() - start_time, hints)
+            if text != status:
+                write(get_message_update_str(game, text, top, STATUS_LINE))
+                status = text
+            warning = get_table_ready_str(game, hints, session)
+            if warning:
+                write(get_message_update_str(game, warning, top))
+                shown_hint['message'] = True
+            await asyncio.sleep(tick)
+
+    with keys_terminal() as fd:
+        print("\033[H\033[J", end="")
+        print(controls)
+        print(get_game_str(game, session['moves']))
+        hints = start_hint_table(game)
+        shown_hint = new_shown_hint()
+        warning = get_unwinnable_str(game)
+        if warning:
+            session['checked'] = True
+            write(get_message_update_str(game, warning, top))
+            shown_hint['message'] = True
+        keys = start_key_reader(loop, fd)
+        status_task = asyncio.create_task(update_status())
+        try:
+            while session['moves'] < game['max_moves']:
+                key = (await read_key(keys)).upper()
+
+                # abandoned
+                if key == 'ESCAPE':
+                    print("Leaving Game! See you soon!")
+                    return 2
+                if key == '?':
+                    write(get_show_hint_str(game, hints, shown_hint, top))
+                else:
+                    moved = apply_key(game, session, key)
+                    if moved is not None:
+                        car_index, old_pos = moved
+                        updates = get_hide_hint_str(game, shown_hint, top)
+                        updates += get_move_update_str(game, car_index, old_pos, session['moves'], top)
+                        warning = get_dead_position_str(game, hints, session['moves'])
+                        if warning:
+                            updates += get_message_update_str(game, warning, top)
+                            shown_hint['message'] = True
+                        write(updates)
+
+                if is_win(game):
+                    end_screen(f"\nCongratulations! You've won in {session['moves']} moves!")
+                    return 0  # victory!
+
+            end_screen("\nGame Over! You've run out of moves.")
+            return 1  # defeat (out of moves)
+        finally:
+            status_task.cancel()
+            loop.remove_reader(fd)
+
+def run_game(game: dict) -> int:
+    """Runs play_game_async to the end and returns its outcome."""
+    return asyncio.run(play_game_async(game))
@@ -0,0 +1,161 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+try:
+    import numpy as np
+except ImportError:  # optional, only the batch functions need it
+    np = None
+
+from solver import get_layout, pack_state
+
+# Index of each direction in the last axis of get_legal_moves' mask.
+DIRECTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+
+# A batch holds N boards of the same size as a dict of (N, C) arrays, C being
+# the largest number of cars. Boards with fewer cars are padded with size 0
+# cars, which never move and cover no cell.
+
+def require_numpy():
+    if np is None:
+        raise ImportError("batch evaluation needs numpy (pip install numpy)")
+
+def new_batch(games: list[dict]) -> dict:
+    """Builds a batch from game dicts, which must all have the same width and height."""
+    require_numpy()
+    width, height = games[0]['width'], games[0]['height']
+    count = max(len(game['cars']) for game in games)
+    horizontal = np.zeros((len(games), count), bool)
+    sizes = np.zeros((len(games), count), np.int16)
+    lanes = np.zeros((len(games), count), np.int16)
+    offsets = np.zeros((len(games), count), np.int16)
+    for n, game in enumerate(games):
+        if game['width'] != width or game['height'] != height:
+            raise ValueError("every board of a batch must have the same size")
+        for i, ((x, y), orientation, size) in enumerate(game['cars']):
+            horizontal[n, i] = orientation == 'h'
+            sizes[n, i] = size
+            lanes[n, i] = y if orientation == 'h' else x
+            offsets[n, i] = x if orientation == 'h' else y
+    return {'width': width, 'height': height, 'horizontal': horizontal, 'sizes': sizes, 'lanes': lanes, 'offsets': offsets}
+
+def get_rows_cols(batch: dict, along) -> tuple:
+    """Row and column of the cell at position along on each car's lane."""
+    horizontal, lanes = batch['horizontal'], batch['lanes']
+    return np.where(horizontal, lanes, along), np.where(horizontal, along, lanes)
+
+def get_occupancy_tensor(batch: dict):
+    """(N, H, W) array holding car index + 1 in every occupied cell, like build_occupancy."""
+    sizes, offsets = batch['sizes'], batch['offsets']
+    occupancy = np.zeros((len(offsets), batch['height'], batch['width']), np.int16)
+    for j in range(int(sizes.max(initial=0))):
+        boards, cars = np.nonzero(sizes > j)
+        rows, cols = get_rows_cols(batch, offsets + j)
+        occupancy[boards, rows[boards, cars], cols[boards, cars]] = cars + 1
+    return occupancy
+
+def get_legal_moves(batch: dict, occupancy=None):
+    """(N, C, 4) mask of the single-cell moves move_car would accept, directions as in DIRECTIONS."""
+    if occupancy is None:
+        occupancy = get_occupancy_tensor(batch)
+    horizontal, sizes, offsets = batch['horizontal'], batch['sizes'], batch['offsets']
+    present = sizes > 0
+    limits = np.where(horizontal, batch['width'], batch['height']) - sizes
+    boards = np.arange(len(offsets))[:, None]
+
+    def is_free(along, inside):
+        # cells outside the board are read at offset 0 and discarded by inside
+        rows, cols = get_rows_cols(batch, np.where(inside, along, 0))
+        return inside & (occupancy[boards, rows, cols] == 0)
+
+    backward = is_free(offsets - 1, present & (offsets > 0))
+    forward = is_free(offsets + sizes, present & (offsets < limits))
+    vertical = ~horizontal
+    return np.stack([backward & vertical, forward & vertical, backward & horizontal, forward & horizontal], axis=-1)
+
+def apply_moves(batch: dict, boards, cars, directions) -> dict:
+    """New batch where board boards[k] has moved car cars[k] one cell in DIRECTIONS[directions[k]]."""
+    boards, cars, directions = np.asarray(boards), np.asarray(cars), np.asarray(directions)
+    moved = {key: value[boards] for key, value in batch.items() if key not in ('width', 'height')}
+    moved['width'], moved['height'] = batch['width'], batch['height']
+    # DOWN and RIGHT (odd indices) move forward along the lane
+    moved['offsets'][np.arange(len(boards)), cars] += np.where(directions & 1, 1, -1).astype(np.int16)
+    return moved
+
+def get_winning_boards(batch: dict):
+    """(N,) mask of the boards where car A touches the right edge, as is_win."""
+    horizontal, sizes, offsets = batch['horizontal'], batch['sizes'], batch['offsets']
+    return horizontal[:, 0] & (offsets[:, 0] + sizes[:, 0] >= batch['width'])
+
+def get_batch_games(batch: dict, max_moves: int = 0) -> list[dict]:
+    """Return the boards of a batch as game dicts (padding cars dropped)."""
+    games = []
+    for n in range(len(batch['offsets'])):
+        cars = []
+        for i in np.nonzero(batch['sizes'][n])[0]:
+            lane, off = int(batch['lanes'][n, i]), int(batch['offsets'][n, i])
+            if batch['horizontal'][n, i]:
+                cars.append([(off, lane), 'h', int(batch['sizes'][n, i])])
+            else:
+                cars.append([(lane, off), 'v', int(batch['sizes'][n, i])])
+        games.append({'width': batch['width'], 'height': batch['height'], 'max_moves': max_moves, 'cars': cars})
+    return games
+
+# Packed states (see solver.py) of a single layout, as a uint64 array.
+
+def get_shifts(layout: dict):
+    if layout['shift'] * layout['count'] > 64:
+        raise ValueError("states of this board don't fit in 64 bits")
+    return np.arange(layout['count'], dtype=np.uint64) * np.uint64(layout['shift'])
+
+def from_states(layout: dict, states) -> dict:
+    """Batch of the boards described by packed states of layout."""
+    require_numpy()
+    states = np.asarray(states, dtype=np.uint64)
+    shape = (len(states), layout['count'])
+    offsets = (states[:, None] >> get_shifts(layout)) & np.uint64(layout['mask'])
+    return {
+        'width': layout['width'],
+        'height': layout['height'],
+        # read only views, every board shares the layout
+        'horizontal': np.broadcast_to(np.array([o == 'h' for o in layout['orientations']]), shape),
+        'sizes': np.broadcast_to(np.array(layout['sizes'], np.int16), shape),
+        'lanes': np.broadcast_to(np.array(layout['lanes'], np.int16), shape),
+        'offsets': offsets.astype(np.int16),
+    }
+
+def expand_states(layout: dict, states) -> tuple:
+    """Every legal single-cell move from states, as arrays (parent index, car index, direction, next state)."""
+    states = np.asarray(states, dtype=np.uint64)
+    units = np.uint64(1) << get_shifts(layout)
+    parents, cars, directions = np.nonzero(get_legal_moves(from_states(layout, states)))
+    steps = units[cars]
+    next_states = np.where(directions & 1, states[parents] + steps, states[parents] - steps)
+    return parents, cars, directions, next_states
+
+def get_winning_states(layout: dict, states):
+    """Mask of the winning states, as is_win_state."""
+    if not layout['count'] or layout['orientations'][0] != 'h':
+        return np.zeros(len(states), bool)
+    return np.asarray(states, dtype=np.uint64) & np.uint64(layout['mask']) == layout['limits'][0]
+
+def get_batch_optimal_length(game: dict, max_states: int = None) -> int | None:
+    """Optimal solution length by a BFS expanding a whole level per step, None if unsolvable or too big."""
+    require_numpy()
+    layout = get_layout(game)
+    previous = np.zeros(0, np.uint64)
+    frontier = np.array([pack_state(layout, game['cars'])], np.uint64)
+    explored = 1
+    depth = 0
+    while len(frontier):
+        if get_winning_states(layout, frontier).any():
+            return depth
+        next_states = np.unique(expand_states(layout, frontier)[3])
+        # every move can be undone: a neighbour of level d is on level d - 1, d or d + 1
+        next_states = next_states[~np.isin(next_states, previous) & ~np.isin(next_states, frontier)]
+        explored += len(next_states)
+        if max_states is not None and explored > max_states:
+            return None
+        previous, frontier = frontier, next_states
+        depth += 1
+    return None
@@ -0,0 +1,304 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from copy import deepcopy
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from ulbloque import parse_game, move_car, get_occupancy, get_game_str, get_game_file_str, is_win, MAX_CARS
+from solver import search, STRATEGIES
+from generator import random_game, get_optimal_length
+import batch
+
+def move_car_sets(game: dict, car_index: int, direction: str) -> bool:
+    """Previous move_car, builds a set of cells for every other car (kept as reference)."""
+    pos, orientation, size = game['cars'][car_index]
+    x, y = pos
+    if orientation == 'h' and direction not in ['LEFT', 'RIGHT']:
+        return False
+    if orientation == 'v' and direction not in ['UP', 'DOWN']:
+        return False
+    new_x, new_y = x, y
+    if direction == 'LEFT':
+        new_x -= 1
+    elif direction == 'RIGHT':
+        new_x += 1
+    elif direction == 'UP':
+        new_y -= 1
+    else:
+        new_y += 1
+    if orientation == 'h':
+        if new_x < 0 or new_x + size > game['width']:
+            return False
+    else:
+        if new_y < 0 or new_y + size > game['height']:
+            return False
+    for i, other_car in enumerate(game['cars']):
+        if i == car_index:
+            continue
+        other_pos, other_orientation, other_size = other_car
+        other_x, other_y = other_pos
+        if orientation == 'h':
+            new_car_positions = {(new_x + j, y) for j in range(size)}
+        else:
+            new_car_positions = {(x, new_y + j) for j in range(size)}
+        if other_orientation == 'h':
+            other_car_positions = {(other_x + j, other_y) for j in range(other_size)}
+        else:
+            other_car_positions = {(other_x, other_y + j) for j in range(other_size)}
+        if new_car_positions & other_car_positions:
+            return False
+    game['cars'][car_index][0] = (new_x, new_y)
+    return True
+
+def get_move_sequence(game: dict) -> list[tuple[int, str]]:
+    """Every car tries both of its directions, a mix of legal and blocked moves."""
+    sequence = []
+    for i, (pos, orientation, size) in enumerate(game['cars']):
+        if orientation == 'h':
+            sequence += [(i, 'RIGHT'), (i, 'LEFT')]
+        else:
+            sequence += [(i, 'DOWN'), (i, 'UP')]
+    return sequence
+
+def bench_moves(game: dict, move, duration: float = 0.5) -> float:
+    """Returns the number of move calls per second over the sequence of get_move_sequence."""
+    game = deepcopy(game)
+    sequence = get_move_sequence(game)
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        for car_index, direction in sequence:
+            move(game, car_index, direction)
+        calls += len(sequence)
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+def get_legal_moves_scalar(game: dict) -> list[tuple[int, str]]:
+    """Legal single-cell moves found with move_car, each one undone right away."""
+    moves = []
+    for i, (pos, orientation, size) in enumerate(game['cars']):
+        for direction, back in (('UP', 'DOWN'), ('DOWN', 'UP')) if orientation == 'v' else (('LEFT', 'RIGHT'), ('RIGHT', 'LEFT')):
+            if move_car(game, i, direction):
+                move_car(game, i, back)
+                moves.append((i, direction))
+    return moves
+
+def bench_legal_moves(games: list[dict], duration: float = 0.5) -> tuple[float, float]:
+    """Returns the boards per second evaluated by move_car and by batch.get_legal_moves.
+
+    The batch is built once beforehand: boards are meant to stay in batch form
+    (see batch.from_states) rather than be converted from dicts every time.
+    """
+    games = deepcopy(games)
+    for game in games:
+        get_occupancy(game)
+    boards = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for game in games:
+            get_legal_moves_scalar(game)
+        boards += len(games)
+    scalar = boards / (time.perf_counter() - start)
+
+    boards = 0
+    games_batch = batch.new_batch(games)
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        batch.get_legal_moves(games_batch)
+        boards += len(games)
+    return scalar, boards / (time.perf_counter() - start)
+
+def get_random_games(count: int, width: int = 6, height: int = 6, car_count: int = 10, seed: int = 0) -> list[dict]:
+    """count random boards from the generator (not necessarily solvable)."""
+    rng = random.Random(seed)
+    games = []
+    while len(games) < count:
+        game = random_game(rng, width, height, car_count)
+        if game is not None:
+            games.append(game)
+    return games
+
+
+# Generated boards of the suite: (side, number of cars), all with the same seed.
+# A game file holds at most MAX_CARS cars, the big boards are only emptier.
+BOARD_SIZES = [(6, 10), (8, 16), (10, 24), (12, MAX_CARS), (16, MAX_CARS), (20, MAX_CARS)]
+# Big random boards can have millions of states, their solve stops after this many.
+SOLVE_STATES = 5_000
+
+def time_op(func, calls: int = 1, repeat: int = 5, min_time: float = 0.05) -> dict:
+    """Calls func in rounds of at least min_time, returns the mean and standard deviation of ops/s over repeat rounds.
+
+    calls is the number of operations done by one call of func.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+    rates = [loops * calls / elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        rates.append(loops * calls / (time.perf_counter() - start))
+    return {'ops': statistics.mean(rates), 'stdev': statistics.stdev(rates) if len(rates) > 1 else 0.0, 'loops': loops}
+
+def get_suite_boards(directory: str, paths: list[str], sizes: list[tuple[int, int]], seed: int = 0):
+    """Yields (name, game file, generated) for the given game files, then one generated board per size written to directory."""
+    for path in paths:
+        yield os.path.basename(path), path, False
+    for side, car_count in sizes:
+        car_count = min(car_count, MAX_CARS)
+        game = get_random_games(1, side, side, car_count, seed)[0]
+        game['max_moves'] = 100
+        path = os.path.join(directory, f"bench_{side}x{side}.txt")
+        with open(path, 'w') as f:
+            f.write(get_game_file_str(game))
+        yield f"{side}x{side}/{car_count}", path, True
+
+def find_moves(game: dict) -> tuple:
+    """A legal move with the move undoing it, and a blocked move (collision or edge): (car, direction) or None."""
+    legal = back = blocked = None
+    for i, (pos, orientation, size) in enumerate(game['cars']):
+        for direction, opposite in (('UP', 'DOWN'), ('DOWN', 'UP')) if orientation == 'v' else (('LEFT', 'RIGHT'), ('RIGHT', 'LEFT')):
+            if move_car(game, i, direction):
+                move_car(game, i, opposite)
+                if legal is None:
+                    legal, back = (i, direction), (i, opposite)
+            elif blocked is None:
+                blocked = (i, direction)
+    return legal, back, blocked
+
+def run_suite(paths: list[str], sizes: list[tuple[int, int]] = BOARD_SIZES, repeat: int = 5, min_time: float = 0.05):
+    """Times every hot path on every board, yields (board name, operation, stats of time_op)."""
+    with tempfile.TemporaryDirectory() as directory:
+        for name, path, generated in get_suite_boards(directory, paths, sizes):
+            game = parse_game(path)
+            get_occupancy(game)
+            legal, back, blocked = find_moves(game)
+            ops = {'parse_game': (lambda: parse_game(path), 1)}
+            if legal is not None:
+                ops['move_car_legal'] = (lambda: (move_car(game, *legal), move_car(game, *back)), 2)
+            if blocked is not None:
+                ops['move_car_blocked'] = (lambda: move_car(game, *blocked), 1)
+            ops['get_game_str'] = (lambda: get_game_str(game, 0), 1)
+            ops['is_win'] = (lambda: is_win(game), 1)
+            if generated:
+                ops['solve'] = (lambda: get_optimal_length(game, 0, SOLVE_STATES), 1)
+            else:
+                ops['solve'] = (lambda: search(game), 1)
+            for op, (func, calls) in ops.items():
+                yield name, op, time_op(func, calls, repeat, min_time)
+
+def get_meta() -> dict:
+    """Where and when the results were measured."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def compare_results(results: dict, baseline: dict, threshold: float = 0.1) -> list[tuple]:
+    """(board, operation, baseline ops, new ops, change) of every operation more than threshold slower than in baseline."""
+    regressions = []
+    for name, ops in results.items():
+        for op, stats in ops.items():
+            old = baseline.get(name, {}).get(op)
+            if old is None:
+                continue
+            change = stats['ops'] / old['ops'] - 1
+            if change < -threshold:
+                regressions.append((name, op, old['ops'], stats['ops'], change))
+    return regressions
+
+def print_implementations(paths: list[str]):
+    """Tables comparing the implementations kept side by side (move_car, search strategies, numpy batches)."""
+    print(f"{'game':<12}{'sets (moves/s)':>18}{'occupancy (moves/s)':>22}{'speedup':>10}")
+    for path in paths:
+        game = parse_game(path)
+        before = bench_moves(game, move_car_sets)
+        after = bench_moves(game, move_car)
+        print(f"{path:<12}{before:>18,.0f}{after:>22,.0f}{after / before:>9.1f}x")
+
+    print()
+    print(f"{'game':<12}" + "".join(f"{name + ' (nodes, s)':>28}" for name in STRATEGIES))
+    for path in paths:
+        game = parse_game(path)
+        results = [STRATEGIES[name](game) for name in STRATEGIES]
+        print(f"{path:<12}" + "".join(f"{result['expanded']:>18,}{result['time']:>10.3f}" for result in results))
+
+    if batch.np is None:
+        print("numpy is not installed, skipping the batch benchmarks")
+        return
+    print()
+    print(f"{'boards':<12}{'move_car (boards/s)':>22}{'batch (boards/s)':>20}{'speedup':>10}")
+    for count in [10, 1000, 10000]:
+        scalar, vectorised = bench_legal_moves(get_random_games(count))
+        print(f"{count:<12}{scalar:>22,.0f}{vectorised:>20,.0f}{vectorised / scalar:>9.1f}x")
+    print()
+    print(f"{'game':<12}{'search (s)':>14}{'batch BFS (s)':>16}")
+    for path in paths:
+        game = parse_game(path)
+        start = time.perf_counter()
+        search(game)
+        scalar = time.perf_counter() - start
+        start = time.perf_counter()
+        batch.get_batch_optimal_length(game)
+        print(f"{path:<12}{scalar:>14.3f}{time.perf_counter() - start:>16.3f}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Time the hot paths of ulbloque on the shipped and generated boards.")
+    parser.add_argument('paths', nargs='*', default=['game1.txt', 'game2.txt', 'game3.txt'], help="game files (default: game1-3.txt)")
+    parser.add_argument('--quick', action='store_true', help="fewer rounds and boards up to 10x10")
+    parser.add_argument('--save', metavar='FILE', help="write the results as JSON")
+    parser.add_argument('--baseline', metavar='FILE', help="compare with results saved earlier, exit 1 on a regression")
+    parser.add_argument('--threshold', type=float, default=0.1, help="slowdown counted as a regression (default: 0.1, 10%%)")
+    parser.add_argument('--implementations', action='store_true', help="print the tables comparing old and new implementations instead")
+    args = parser.parse_args()
+
+    if args.implementations:
+        print_implementations(args.paths)
+        sys.exit()
+
+    sizes = [size for size in BOARD_SIZES if size[0] <= 10] if args.quick else BOARD_SIZES
+    repeat, min_time = (3, 0.02) if args.quick else (5, 0.05)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    print(f"{'board':<14}{'operation':<18}{'ops/s':>14}{'stdev':>9}" + (f"{'baseline':>10}" if baseline else ""))
+    for name, op, stats in run_suite(args.paths, sizes, repeat, min_time):
+        results.setdefault(name, {})[op] = stats
+        line = f"{name:<14}{op:<18}{stats['ops']:>14,.0f}{stats['stdev'] / stats['ops']:>8.1%}"
+        old = baseline.get(name, {}).get(op) if baseline else None
+        if old is not None:
+            line += f"{stats['ops'] / old['ops'] - 1:>+10.1%}"
+        print(line, flush=True)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'meta': get_meta(), 'results': results}, f, indent=2)
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        for name, op, old, new, change in regressions:
+            print(f"REGRESSION {name} {op}: {old:,.0f} -> {new:,.0f} ops/s ({change:+.1%})", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
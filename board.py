@@ -0,0 +1,135 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+
+class Board:
+    """Compact game state, same rules as move_car/is_win on the game dict.
+
+    What never changes (orientation, size and lane of each car) is kept in
+    bytes shared by every clone. What changes (each car's offset on its lane
+    and the occupancy grid) lives in two bytearrays, so cloning a board is two
+    buffer copies. Use Board.from_game and to_game to go from/to the dict
+    returned by parse_game.
+    """
+    __slots__ = ('width', 'height', 'max_moves', 'horizontal', 'sizes', 'lanes', 'offsets', 'occupancy')
+
+    def __init__(self, width: int, height: int, max_moves: int, horizontal: bytes, sizes: bytes, lanes: bytes, offsets: bytearray):
+        self.width = width
+        self.height = height
+        self.max_moves = max_moves
+        self.horizontal = horizontal
+        self.sizes = sizes
+        self.lanes = lanes
+        self.offsets = offsets
+        # one byte per cell: car index + 1, 0 if empty
+        self.occupancy = bytearray(width * height)
+        for i in range(len(sizes)):
+            head, step = self.get_head(i)
+            for j in range(sizes[i]):
+                self.occupancy[head + j * step] = i + 1
+
+    @classmethod
+    def from_game(cls, game: dict) -> 'Board':
+        """Builds a board from a game dict."""
+        horizontal, sizes, lanes, offsets = bytearray(), bytearray(), bytearray(), bytearray()
+        for (x, y), orientation, size in game['cars']:
+            horizontal.append(orientation == 'h')
+            sizes.append(size)
+            lanes.append(y if orientation == 'h' else x)
+            offsets.append(x if orientation == 'h' else y)
+        return cls(game['width'], game['height'], game['max_moves'], bytes(horizontal), bytes(sizes), bytes(lanes), offsets)
+
+    def to_game(self) -> dict:
+        """Return the board as a game dict, like parse_game does."""
+        return {
+            'width': self.width,
+            'height': self.height,
+            'max_moves': self.max_moves,
+            'cars': [[self.get_pos(i), 'h' if self.horizontal[i] else 'v', self.sizes[i]] for i in range(len(self.sizes))]
+        }
+
+    def clone(self) -> 'Board':
+        """Return an independent copy of the board."""
+        board = Board.__new__(Board)
+        board.width, board.height, board.max_moves = self.width, self.height, self.max_moves
+        board.horizontal, board.sizes, board.lanes = self.horizontal, self.sizes, self.lanes
+        board.offsets = self.offsets[:]
+        board.occupancy = self.occupancy[:]
+        return board
+
+    def key(self) -> bytes:
+        """Hashable snapshot of the car positions."""
+        return bytes(self.offsets)
+
+    def get_pos(self, car_index: int) -> tuple[int, int]:
+        """Return the (x, y) position of a car, as in game['cars']."""
+        if self.horizontal[car_index]:
+            return self.offsets[car_index], self.lanes[car_index]
+        return self.lanes[car_index], self.offsets[car_index]
+
+    def get_head(self, car_index: int) -> tuple[int, int]:
+        """Return the cell index of a car's first cell and the step to its next cell."""
+        if self.horizontal[car_index]:
+            return self.lanes[car_index] * self.width + self.offsets[car_index], 1
+        return self.offsets[car_index] * self.width + self.lanes[car_index], self.width
+
+    def move(self, car_index: int, direction: str, distance: int = 1) -> bool:
+        """Move a car distance cells in the specified direction if possible (see move_car)."""
+        if not 0 <= car_index < len(self.sizes) or distance < 1:
+            return False
+        if self.horizontal[car_index]:
+            if direction not in ['LEFT', 'RIGHT']:
+                return False
+            forward, limit = direction == 'RIGHT', self.width - self.sizes[car_index]
+        else:
+            if direction not in ['UP', 'DOWN']:
+                return False
+            forward, limit = direction == 'DOWN', self.height - self.sizes[car_index]
+
+        # check boundaries
+        offset = self.offsets[car_index] + (distance if forward else -distance)
+        if not 0 <= offset <= limit:
+            return False
+
+        occupancy = self.occupancy
+        size = self.sizes[car_index]
+        head, step = self.get_head(car_index)
+
+        # a one cell move enters a single cell and leaves a single cell
+        if distance == 1:
+            if forward:
+                entered, left = head + size * step, head
+            else:
+                entered, left = head - step, head + (size - 1) * step
+            if occupancy[entered]:
+                return False
+            occupancy[entered] = car_index + 1
+            occupancy[left] = 0
+            self.offsets[car_index] = offset
+            return True
+
+        # check for collisions on the cells crossed
+        if forward:
+            path = range(head + size * step, head + (size + distance) * step, step)
+            new_head = head + distance * step
+        else:
+            path = range(head - distance * step, head, step)
+            new_head = head - distance * step
+        for cell in path:
+            if occupancy[cell]:
+                return False
+
+        # move valid, update position
+        for j in range(size):
+            occupancy[head + j * step] = 0
+        for j in range(size):
+            occupancy[new_head + j * step] = car_index + 1
+        self.offsets[car_index] = offset
+        return True
+
+    def is_win(self) -> bool:
+        """Check if the game is won (car A has reached the right edge), as is_win."""
+        if not self.sizes or not self.horizontal[0]:
+            return False
+        return self.offsets[0] + self.sizes[0] >= self.width
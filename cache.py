@@ -0,0 +1,174 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from collections import OrderedDict
+import hashlib
+import os
+import sqlite3
+import time
+
+from solver import get_layout, pack_state, unpack_state, get_successors, search
+
+CACHE_FILE_NAME = ".ulbloque_cache.sqlite"
+
+def get_cars_key(layout: dict, offsets: list[int], mirrored: bool = False) -> str:
+    """Every car's shape, lane and offset, A first and the others sorted so that their order in the file doesn't matter."""
+    cars = []
+    for i, off in enumerate(offsets):
+        orientation, size, lane = layout['orientations'][i], layout['sizes'][i], layout['lanes'][i]
+        if mirrored and orientation == 'h':
+            lane = layout['height'] - 1 - lane
+        elif mirrored:
+            off = layout['limits'][i] - off
+        cars.append(f"{orientation}{size}@{lane}:{off}")
+    return ";".join(cars[:1] + sorted(cars[1:]))
+
+def get_fingerprint(layout: dict, state: int) -> str:
+    """Canonical hash of a board: its size and its cars, the same for every equivalent board (see solver.canonical_state)."""
+    offsets = unpack_state(layout, state)
+    cars = get_cars_key(layout, offsets)
+    if layout['mirror'] is not None:
+        cars = min(cars, get_cars_key(layout, offsets, mirrored=True))
+    return hashlib.sha1(f"{layout['width']}x{layout['height']}|{cars}".encode()).hexdigest()
+
+def get_game_fingerprint(game: dict) -> str:
+    """Fingerprint of the current position of game."""
+    layout = get_layout(game)
+    return get_fingerprint(layout, pack_state(layout, game['cars']))
+
+def get_cache_path(game_file_path: str) -> str:
+    """Return the path of the disk cache shared by the games of the same directory."""
+    return os.path.join(os.path.dirname(os.path.abspath(game_file_path)), CACHE_FILE_NAME)
+
+def step_state(layout: dict, state: int, move: tuple[str, str]) -> int:
+    """Return the state reached by playing move, which must be legal."""
+    letter, direction = move
+    unit = layout['units'][ord(letter) - 65]
+    return state + unit if direction in ['RIGHT', 'DOWN'] else state - unit
+
+
+class SolutionCache:
+    """Maps a board fingerprint to (distance to goal, next best move).
+
+    An unsolvable board is stored with a distance of None. The most recently
+    used entries stay in memory (at most max_entries), everything is also kept
+    in an sqlite file when path is given.
+    """
+    def __init__(self, path: str = None, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path, timeout=30)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (fingerprint TEXT PRIMARY KEY, distance INTEGER, move TEXT)")
+            self.db.commit()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc_info): self.close()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def remember(self, fingerprint: str, entry: tuple):
+        """Puts entry in the memory tier, dropping the least recently used one if full."""
+        self.entries[fingerprint] = entry
+        self.entries.move_to_end(fingerprint)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, fingerprint: str) -> tuple | None:
+        """Return (distance, move) for fingerprint, None if it was never stored."""
+        entry = self.entries.get(fingerprint)
+        if entry is not None:
+            self.entries.move_to_end(fingerprint)
+            return entry
+        if self.db is None:
+            return None
+        row = self.db.execute("SELECT distance, move FROM solutions WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        if row is None:
+            return None
+        distance, move = row
+        entry = (distance, tuple(move.split()) if move else None)
+        self.remember(fingerprint, entry)
+        return entry
+
+    def put_many(self, entries: list[tuple[str, tuple]]):
+        """Stores a list of (fingerprint, (distance, move)), in a single transaction on disk."""
+        for fingerprint, entry in entries:
+            self.remember(fingerprint, entry)
+        if self.db is not None:
+            rows = [(fp, distance, " ".join(move) if move else None) for fp, (distance, move) in entries]
+            self.db.executemany("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)", rows)
+            self.db.commit()
+
+    def store_solution(self, layout: dict, state: int, moves: list[tuple[str, str]] | None):
+        """Stores every position along a shortest solution starting from state."""
+        if moves is None:
+            self.put_many([(get_fingerprint(layout, state), (None, None))])
+            return
+        entries = []
+        for i, move in enumerate(moves):
+            entries.append((get_fingerprint(layout, state), (len(moves) - i, move)))
+            state = step_state(layout, state, move)
+        entries.append((get_fingerprint(layout, state), (0, None)))
+        self.put_many(entries)
+
+    def get_next_move(self, layout: dict, state: int, distance: int, move: tuple[str, str]) -> tuple[str, str] | None:
+        """The move from state to a cached position distance - 1 moves away, trying the cached move first.
+
+        The cached move was stored for an equivalent board, whose cars may be
+        listed in another order or turned upside down.
+        """
+        successors = {(chr(65 + i), direction): next_state for i, direction, next_state in get_successors(layout, state)}
+        if move in successors:
+            successors = {move: successors.pop(move), **successors}
+        for next_move, next_state in successors.items():
+            entry = self.get(get_fingerprint(layout, next_state))
+            if entry is not None and entry[0] == distance - 1:
+                return next_move
+        return None
+
+    def get_solution(self, layout: dict, state: int) -> tuple[bool, list | None]:
+        """Follows the cached next moves from state, returns (found, moves)."""
+        moves = []
+        while True:
+            entry = self.get(get_fingerprint(layout, state))
+            if entry is None:
+                return False, None
+            distance, move = entry
+            if distance is None:
+                return True, None
+            if distance == 0:
+                return True, moves
+            move = self.get_next_move(layout, state, distance, move)
+            if move is None:
+                return False, None
+            moves.append(move)
+            state = step_state(layout, state, move)
+
+
+def search_cached(game: dict, cache: SolutionCache) -> dict:
+    """Same as solver.search but answers from cache when the position is known."""
+    start_time = time.perf_counter()
+    layout = get_layout(game)
+    state = pack_state(layout, game['cars'])
+    found, moves = cache.get_solution(layout, state)
+    if found:
+        return {'moves': moves, 'explored': 0, 'time': time.perf_counter() - start_time, 'cached': True}
+    result = search(game)
+    cache.store_solution(layout, state, result['moves'])
+    result['cached'] = False
+    return result
+
+def solve_cached(game: dict, cache: SolutionCache) -> list[tuple[str, str]] | None:
+    """Same as solver.solve but answers from cache when the position is known."""
+    return search_cached(game, cache)['moves']
+
+def get_hint(game: dict, cache: SolutionCache) -> tuple | None:
+    """Return the next best (car letter, direction) from the current position, None if there is none."""
+    moves = solve_cached(game, cache)
+    return moves[0] if moves else None
@@ -0,0 +1,159 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+import csv
+import fnmatch
+import functools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import sys
+import threading
+
+from ulbloque import parse_game, iter_games
+from solver import search
+from cache import SolutionCache, get_cache_path, search_cached
+
+REPORT_FIELDS = ['file', 'status', 'width', 'height', 'cars', 'max_moves', 'optimal', 'explored', 'time', 'cached']
+
+def find_levels(directory: str, pattern: str = 'game*.txt'):
+    """Yields the paths of the game files of directory, in name order."""
+    for name in sorted(os.listdir(directory)):
+        if fnmatch.fnmatch(name, pattern):
+            yield os.path.join(directory, name)
+
+# Solution caches opened by this process, by path: kept open from one level to
+# the next so that the memory tier is reused, closed when the process ends.
+_caches = {}
+
+def get_open_cache(path: str) -> SolutionCache:
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = SolutionCache(path)
+    return cache
+
+def close_caches():
+    for cache in _caches.values():
+        cache.close()
+    _caches.clear()
+
+def start_worker():
+    """Pool initializer: closes the worker's caches when the pool shuts it down."""
+    multiprocessing.util.Finalize(None, close_caches, exitpriority=10)
+
+def check_game(name: str, game: dict, cache_path: str = None) -> dict:
+    """Solves a parsed game and checks that it can be won within its max_moves."""
+    row = dict.fromkeys(REPORT_FIELDS)
+    row.update(file=name, width=game['width'], height=game['height'], cars=len(game['cars']), max_moves=game['max_moves'])
+    if cache_path is not None:
+        result = search_cached(game, get_open_cache(cache_path))
+    else:
+        result = search(game)
+    row.update(explored=result['explored'], time=round(result['time'], 6), cached=result.get('cached', False))
+    if result['moves'] is None:
+        row['status'] = 'unsolvable'
+    else:
+        row['optimal'] = len(result['moves'])
+        row['status'] = 'ok' if row['optimal'] <= game['max_moves'] else 'too_long'
+    return row
+
+def check_level(path: str, use_cache: bool = False) -> dict:
+    """Solves one game file and checks that it can be won within its max_moves."""
+    try:
+        game = parse_game(path)
+    except Exception as e:
+        row = dict.fromkeys(REPORT_FIELDS)
+        row.update(file=path, status=f"error: {e}")
+        return row
+    return check_game(path, game, get_cache_path(path) if use_cache else None)
+
+def check_pack_entry(entry: tuple, cache_path: str = None) -> dict:
+    """check_game for a (name, game) entry of a puzzle pack, an error row when the game couldn't be read."""
+    name, game = entry
+    if isinstance(game, ValueError):
+        row = dict.fromkeys(REPORT_FIELDS)
+        row.update(file=name, status=f"error: {game}")
+        return row
+    return check_game(name, game, cache_path)
+
+def run_checks(check, tasks, jobs: int = 1, chunksize: int = 4):
+    """Yields check(task) for every task as soon as it is done (in any order)."""
+    if jobs <= 1:
+        try:
+            yield from map(check, tasks)
+        finally:
+            close_caches()
+        return
+    # the pool reads its input eagerly, only let a few chunks per worker wait
+    # in its queue so that huge inputs are streamed
+    slots = threading.Semaphore(jobs * chunksize * 4)
+    stopped = False
+
+    def feed():
+        for task in tasks:
+            slots.acquire()
+            if stopped:
+                return
+            yield task
+
+    # small chunks handed out on demand: a hard board only holds back its own chunk
+    with multiprocessing.Pool(jobs, initializer=start_worker) as pool:
+        try:
+            for row in pool.imap_unordered(check, feed(), chunksize):
+                slots.release()
+                yield row
+            # let the workers exit on their own and run start_worker's finalizer,
+            # leaving the with block terminates them
+            pool.close()
+            pool.join()
+        finally:
+            stopped = True
+            slots.release()
+
+def iter_checks(paths, jobs: int = 1, chunksize: int = 4, use_cache: bool = False):
+    """Yields the check_level rows of paths as soon as they are done (in any order)."""
+    yield from run_checks(functools.partial(check_level, use_cache=use_cache), paths, jobs, chunksize)
+
+def iter_pack_checks(pack_path: str, jobs: int = 1, chunksize: int = 4, use_cache: bool = False):
+    """Yields a check row for every game of a puzzle pack, read lazily, named <pack>:<number>."""
+    entries = ((f"{pack_path}:{i + 1}", game) for i, game in enumerate(iter_games(pack_path, skip_errors=True)))
+    check = functools.partial(check_pack_entry, cache_path=get_cache_path(pack_path) if use_cache else None)
+    yield from run_checks(check, entries, jobs, chunksize)
+
+def write_report(rows, out, report_format: str = 'csv'):
+    """Writes rows to out one at a time (csv or json), returns how many rows had each status."""
+    counts = {}
+    if report_format == 'csv':
+        writer = csv.DictWriter(out, REPORT_FIELDS)
+        writer.writeheader()
+    else:
+        out.write('[')
+    for i, row in enumerate(rows):
+        if report_format == 'csv':
+            writer.writerow(row)
+        else:
+            out.write((',\n ' if i else '\n ') + json.dumps(row))
+        out.flush()
+        status = row['status'] if not row['status'].startswith('error') else 'error'
+        counts[status] = counts.get(status, 0) + 1
+    if report_format != 'csv':
+        out.write('\n]\n')
+    return counts
+
+def check_levels(source: str, jobs: int = 1, report_path: str = None, use_cache: bool = False) -> bool:
+    """Checks every game of a directory or a puzzle pack and writes the report, True if all are fine."""
+    report_format = 'json' if report_path and report_path.endswith('.json') else 'csv'
+    if os.path.isdir(source):
+        rows = iter_checks(find_levels(source), jobs, use_cache=use_cache)
+    else:
+        rows = iter_pack_checks(source, jobs, use_cache=use_cache)
+    if report_path is None:
+        counts = write_report(rows, sys.stdout, report_format)
+    else:
+        with open(report_path, 'w', newline='') as out:
+            counts = write_report(rows, out, report_format)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Checked {sum(counts.values())} levels: {summary or 'nothing found'}", file=sys.stderr)
+    return set(counts) <= {'ok'}
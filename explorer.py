@@ -0,0 +1,168 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from array import array
+from bisect import bisect_left
+from copy import deepcopy
+import struct
+import time
+
+from ulbloque import get_game_file_str
+from solver import get_layout, pack_state, canonical_state, canonical_successor, apply_state, get_successors, is_win_state
+
+# Binary graph file: header, then the sorted states, then the adjacency in CSR
+# form (offsets[i]:offsets[i+1] is the slice of targets holding i's neighbours).
+GRAPH_MAGIC = b'ULBG'
+GRAPH_HEADER = struct.Struct('<4sHHQQ')  # magic, version, bytes per state, states, edges
+
+def new_state_array(layout: dict, states=()) -> array | list:
+    """An array('Q') of states when they fit in 64 bits, a plain list otherwise."""
+    if layout['shift'] * layout['count'] <= 64:
+        return array('Q', states)
+    return list(states)
+
+def enumerate_states(layout: dict, start: int) -> array | list:
+    """Every (canonical) state connected to start, sorted so that a state's index is found by bisection."""
+    seen = {canonical_state(layout, start)}
+    queue = list(seen)
+    head = 0
+    while head < len(queue):
+        state = queue[head]
+        head += 1
+        for _, _, next_state in get_successors(layout, state):
+            if layout['mirror'] is not None:
+                next_state = canonical_successor(layout, next_state)
+            if next_state not in seen:
+                seen.add(next_state)
+                queue.append(next_state)
+    del queue
+    return new_state_array(layout, sorted(seen))
+
+def get_index(states, state: int) -> int:
+    """Index of state in the sorted states, which must contain it."""
+    return bisect_left(states, state)
+
+def get_neighbours(layout: dict, states, index: int):
+    """Yields the indices of the states one move away from states[index]."""
+    for _, _, next_state in get_successors(layout, states[index]):
+        yield bisect_left(states, canonical_successor(layout, next_state))
+
+def bfs_distances(layout: dict, states, sources: list[int]) -> array:
+    """Distance of every state (by index) to the closest source, -1 when not connected."""
+    distances = array('i', [-1]) * len(states)
+    queue = array('I', sources)
+    for index in sources:
+        distances[index] = 0
+    head = 0
+    while head < len(queue):
+        index = queue[head]
+        head += 1
+        distance = distances[index] + 1
+        for next_index in get_neighbours(layout, states, index):
+            if distances[next_index] < 0:
+                distances[next_index] = distance
+                queue.append(next_index)
+    return distances
+
+def get_farthest(distances: array) -> tuple[int, int]:
+    """Return (index, distance) of the farthest state."""
+    distance = max(distances)
+    return distances.index(distance), distance
+
+def get_diameter_bound(layout: dict, states, start_index: int, sweeps: int = 2) -> int:
+    """Lower bound of the graph diameter by repeated double sweeps (usually exact on these graphs)."""
+    index, _ = get_farthest(bfs_distances(layout, states, [start_index]))
+    best = 0
+    for _ in range(sweeps):
+        index, eccentricity = get_farthest(bfs_distances(layout, states, [index]))
+        if eccentricity <= best:
+            break
+        best = eccentricity
+    return best
+
+def write_graph(layout: dict, states, path: str) -> int:
+    """Writes the configuration graph of states to path, returns the number of (directed) edges."""
+    state_bytes = max(1, (layout['shift'] * layout['count'] + 7) // 8)
+    offsets = array('Q', [0])
+    targets = array('I')
+    for index in range(len(states)):
+        targets.extend(get_neighbours(layout, states, index))
+        offsets.append(len(targets))
+    with open(path, 'wb') as f:
+        f.write(GRAPH_HEADER.pack(GRAPH_MAGIC, 1, state_bytes, len(states), len(targets)))
+        for state in states:
+            f.write(state.to_bytes(state_bytes, 'little'))
+        offsets.tofile(f)
+        targets.tofile(f)
+    return len(targets)
+
+def read_graph(path: str) -> dict:
+    """Reads a file written by write_graph, returns its states, offsets and targets."""
+    with open(path, 'rb') as f:
+        magic, version, state_bytes, count, edges = GRAPH_HEADER.unpack(f.read(GRAPH_HEADER.size))
+        if magic != GRAPH_MAGIC or version != 1:
+            raise ValueError(f"{path} is not a ulbloque graph file")
+        data = f.read(count * state_bytes)
+        states = [int.from_bytes(data[i:i + state_bytes], 'little') for i in range(0, len(data), state_bytes)]
+        offsets = array('Q')
+        offsets.fromfile(f, count + 1)
+        targets = array('I')
+        targets.fromfile(f, edges)
+    return {'states': states, 'offsets': offsets, 'targets': targets}
+
+def explore(game: dict, graph_path: str = None, raw_count: bool = False) -> dict:
+    """Enumerates every configuration reachable from game and returns statistics about the graph.
+
+    raw_states is the number of states before merging equivalent ones. Only a
+    mirror makes it differ (cars of a class share a lane and can't swap), and
+    then it takes a second enumeration without merging: it is None unless
+    raw_count is set.
+    """
+    start_time = time.perf_counter()
+    layout = get_layout(game)
+    start = pack_state(layout, game['cars'])
+    states = enumerate_states(layout, start)
+    start_index = get_index(states, canonical_state(layout, start))
+
+    wins = [index for index, state in enumerate(states) if is_win_state(layout, state)]
+    stats = {
+        'states': len(states),
+        'raw_states': len(states),
+        'winning_states': len(wins),
+        'start_distance': None,
+        'hardest_distance': None,
+        'hardest_state': None,
+    }
+    if layout['mirror'] is not None:
+        stats['raw_states'] = len(enumerate_states(dict(layout, canonical=False, mirror=None), start)) if raw_count else None
+    if wins:
+        # distance to the closest win, the farthest state is the hardest starting position
+        distances = bfs_distances(layout, states, wins)
+        hardest_index, hardest_distance = get_farthest(distances)
+        stats['start_distance'] = distances[start_index]
+        stats['hardest_distance'] = hardest_distance
+        stats['hardest_state'] = states[hardest_index]
+        del distances
+    stats['diameter'] = get_diameter_bound(layout, states, start_index)
+    if graph_path is not None:
+        stats['edges'] = write_graph(layout, states, graph_path)
+    stats['time'] = time.perf_counter() - start_time
+    stats['layout'] = layout
+    return stats
+
+def get_exploration_str(game: dict, stats: dict) -> str:
+    """Return a printable report of explore's statistics."""
+    lines = [
+        f"States:         {stats['states']}" + (f" ({stats['raw_states']} before merging equivalent states)" if stats['raw_states'] not in (None, stats['states']) else ""),
+        f"Winning states: {stats['winning_states']}",
+        f"Diameter:       {stats['diameter']} (lower bound)",
+        f"Start distance: {stats['start_distance'] if stats['start_distance'] is not None else 'unsolvable'}",
+        f"Explored in {stats['time']:.3f}s",
+    ]
+    if stats['hardest_state'] is not None:
+        hardest = deepcopy(game)
+        apply_state(stats['layout'], hardest, stats['hardest_state'])
+        hardest['max_moves'] = stats['hardest_distance']
+        lines += [f"Hardest position ({stats['hardest_distance']} moves):", get_game_file_str(hardest).rstrip()]
+    return "\n".join(lines)
@@ -0,0 +1,189 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import math
+import os
+import random
+import sys
+import time
+
+from ulbloque import get_game_file_str
+from solver import get_layout, pack_state, canonical_state, canonical_successor, get_successors, is_win_state
+from cache import get_fingerprint
+
+def random_game(rng: random.Random, width: int, height: int, car_count: int) -> dict | None:
+    """Places car A and car_count - 1 random cars (sizes 2 or 3), None if they don't fit."""
+    a_y = rng.randrange(height)
+    a_x = rng.randrange(width - 2)  # never already won
+    cars = [[(a_x, a_y), 'h', 2]]
+    occupied = {(a_x, a_y), (a_x + 1, a_y)}
+    attempts = 0
+    while len(cars) < car_count:
+        attempts += 1
+        if attempts > car_count * 50:
+            return None
+        orientation = rng.choice('hv')
+        size = rng.choice((2, 2, 3))
+        if orientation == 'h':
+            if size > width:
+                continue
+            x, y = rng.randrange(width - size + 1), rng.randrange(height)
+            # a horizontal car in front of A could never get out of its way
+            if y == a_y and x > a_x:
+                continue
+            cells = {(x + j, y) for j in range(size)}
+        else:
+            if size > height:
+                continue
+            x, y = rng.randrange(width), rng.randrange(height - size + 1)
+            cells = {(x, y + j) for j in range(size)}
+        if cells & occupied:
+            continue
+        occupied |= cells
+        cars.append([(x, y), orientation, size])
+    return {'width': width, 'height': height, 'max_moves': 0, 'cars': cars}
+
+def count_blockers(game: dict) -> int:
+    """Number of cars standing between car A and the exit."""
+    (a_x, a_y), _, a_size = game['cars'][0]
+    blockers = 0
+    for (x, y), orientation, size in game['cars'][1:]:
+        if orientation == 'v' and x >= a_x + a_size and y <= a_y < y + size:
+            blockers += 1
+    return blockers
+
+def has_stuck_blocker(game: dict) -> bool:
+    """True if a car in A's way is too long to ever leave A's row (the board can't be won)."""
+    (a_x, a_y), _, a_size = game['cars'][0]
+    for (x, y), orientation, size in game['cars'][1:]:
+        if orientation == 'v' and x >= a_x + a_size and y <= a_y < y + size:
+            if a_y < size and game['height'] - a_y - 1 < size:
+                return True
+    return False
+
+def get_optimal_length(game: dict, min_length: int, max_states: int) -> int | None:
+    """Optimal length of game, None as soon as it is known to be below min_length, unsolvable or too big."""
+    layout = get_layout(game)
+    seen = {canonical_state(layout, pack_state(layout, game['cars']))}
+    frontier = list(seen)
+    depth = 0
+    # level by level, so a win found too early stops the search right away
+    while frontier:
+        for state in frontier:
+            if is_win_state(layout, state):
+                return depth if depth >= min_length else None
+        next_frontier = []
+        for state in frontier:
+            for _, _, next_state in get_successors(layout, state):
+                if layout['mirror'] is not None:
+                    next_state = canonical_successor(layout, next_state)
+                if next_state not in seen:
+                    seen.add(next_state)
+                    next_frontier.append(next_state)
+        if len(seen) > max_states:
+            return None
+        frontier = next_frontier
+        depth += 1
+    return None
+
+def search_batch(task: tuple) -> dict:
+    """Tries batch_size random candidates, returns the accepted ones and rejection counts."""
+    seed, batch_size, width, height, car_count, min_length, max_states, slack = task
+    rng = random.Random(seed)
+    stats = {'tried': 0, 'placement': 0, 'too_easy': 0, 'stuck': 0, 'search': 0}
+    accepted = []
+    for _ in range(batch_size):
+        stats['tried'] += 1
+        game = random_game(rng, width, height, car_count)
+        if game is None:
+            stats['placement'] += 1
+            continue
+        # nothing in A's way: the optimal length is just A's distance to the exit
+        if count_blockers(game) == 0 and width - game['cars'][0][0][0] - 2 < min_length:
+            stats['too_easy'] += 1
+            continue
+        if has_stuck_blocker(game):
+            stats['stuck'] += 1
+            continue
+        length = get_optimal_length(game, min_length, max_states)
+        if length is None:
+            stats['search'] += 1
+            continue
+        game['max_moves'] = math.ceil(length * slack)
+        layout = get_layout(game)
+        fingerprint = get_fingerprint(layout, pack_state(layout, game['cars']))
+        accepted.append((fingerprint, length, get_game_file_str(game)))
+    stats['accepted'] = len(accepted)
+    return {'accepted': accepted, 'stats': stats}
+
+def generate(out_dir: str, count: int, width: int = 6, height: int = 6, car_count: int = 10,
+             min_length: int = 10, jobs: int = 1, seed: int = None, batch_size: int = 50,
+             max_states: int = 200_000, slack: float = 1.5, prefix: str = 'game', stats: dict = None):
+    """Writes count new puzzles of optimal length >= min_length to out_dir, yields (path, length).
+
+    max_moves is the optimal length times slack. Candidate and rejection counts
+    are added up in stats when given.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    seen = set()
+    written = 0
+    next_task = 0
+
+    def submit(executor):
+        nonlocal next_task
+        task = (seed * 1_000_003 + next_task, batch_size, width, height, car_count, min_length, max_states, slack)
+        next_task += 1
+        return executor.submit(search_batch, task)
+
+    # a couple of batches per worker in flight, results are written as they come back
+    with ProcessPoolExecutor(max(1, jobs)) as executor:
+        pending = {submit(executor) for _ in range(max(1, jobs) * 2)}
+        while written < count:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if stats is not None:
+                    for key, value in result['stats'].items():
+                        stats[key] = stats.get(key, 0) + value
+                for fingerprint, length, text in result['accepted']:
+                    if written >= count or fingerprint in seen:
+                        continue
+                    seen.add(fingerprint)
+                    path = os.path.join(out_dir, f"{prefix}{written + 1:05d}.txt")
+                    with open(path, 'w') as f:
+                        f.write(text)
+                    written += 1
+                    yield path, length
+                if written < count:
+                    pending.add(submit(executor))
+        for future in pending:
+            future.cancel()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate random ULBloque puzzles.")
+    parser.add_argument('out_dir', help="directory receiving the game files")
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--width', type=int, default=6)
+    parser.add_argument('--height', type=int, default=6)
+    parser.add_argument('--cars', type=int, default=10, help="number of cars, A included")
+    parser.add_argument('--min-length', type=int, default=10, help="minimum optimal solution length")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = {}
+    written = 0
+    for path, length in generate(args.out_dir, args.count, args.width, args.height, args.cars,
+                                 args.min_length, args.jobs, args.seed, stats=stats):
+        written += 1
+        print(f"{path}: {length} moves")
+    elapsed = time.perf_counter() - start
+    print(f"{written} puzzles in {elapsed:.1f}s ({written / elapsed * 60:.0f}/min), candidates: {stats}", file=sys.stderr)
@@ -1,4 +1,6 @@
 # source : https://code.activestate.com/recipes/134892/
+import codecs
+import os
 import os.path
 
 SEQUENCE_FILE_NAME = "sequence.txt"
@@ -22,15 +24,76 @@ class _Getch:
 class _GetchTest:
     def __init__(self):
         with open(SEQUENCE_FILE_NAME, 'r') as f:
-            self.sequence = f.read().splitlines()
+            # an iterator, popping the head of a list is O(n) per key
+            self.sequence = iter(f.read().splitlines())
 
     def __call__(self):
         try:
-            return self.sequence.pop(0)
-        except IndexError:
+            return next(self.sequence)
+        except StopIteration:
             raise IOError("Sequence file is empty")
 
 
+ARROWS = {'A': 'UP', 'B': 'DOWN', 'C': 'RIGHT', 'D': 'LEFT'}
+
+def decode_key(read) -> str:
+    """Reads one key with read(n), arrows and SHIFT+arrows decoded from their escape sequences.
+
+    Other escape sequences (Home, F1...) are read whole and give an empty key.
+    """
+    ch1 = read(1)
+    if ch1 != '\x1b':  # ESC
+        return ch1
+    ch2 = read(1)
+    if ch2 != '[':
+        return 'ESCAPE'
+    # CSI: parameter and intermediate characters up to a final one in @-~ (0x40-0x7E)
+    params = ''
+    while True:
+        ch = read(1)
+        if not ch:
+            return ''
+        if '\x40' <= ch <= '\x7e':
+            break
+        params += ch
+    if ch in ARROWS:
+        # Shift + arrow keys: ESC [ 1 ; 2 <letter>
+        if params == '':
+            return ARROWS[ch]
+        if params == '1;2':
+            return 'SHIFT+' + ARROWS[ch]
+    return ''
+
+# An ESC with nothing after it is the escape key only if the rest of an arrow
+# key's sequence doesn't come within this many seconds.
+ESCAPE_DELAY = 0.1
+
+def decode_keys(text: str, final: bool = False) -> tuple[list[str], str]:
+    """Keys of text as getkey returns them, and an escape sequence cut short at the end, left for the next read.
+
+    With final, nothing is left: an ESC alone at the end is the escape key.
+    """
+    keys = []
+    i = 0
+    while i < len(text):
+        start = i
+        short = False
+
+        def read(n):
+            nonlocal i, short
+            chars = text[i:i + n]
+            i += len(chars)
+            short = short or len(chars) < n
+            return chars
+        key = decode_key(read)
+        if short and not final and text[start] == '\x1b':
+            return keys, text[start:]
+        # telnet sends CR LF or CR NUL for Enter, other escape sequences give no key
+        if key and key not in '\r\n\0':
+            keys.append(key)
+    return keys, ''
+
+
 class _GetchUnix:
     def __init__(self):
         import tty, sys
@@ -41,25 +104,9 @@ class _GetchUnix:
         old_settings = termios.tcgetattr(fd)
         try:
             tty.setraw(sys.stdin.fileno())
-            ch1 = sys.stdin.read(1)
-            # Handle the arrow keys
-            if ch1 == '\x1b':  # ESC
-                ch2 = sys.stdin.read(1)
-                if ch2 == '[':
-                    ch3 = sys.stdin.read(1)
-                    if ch3 == 'A':
-                        return 'UP'
-                    if ch3 == 'B':
-                        return 'DOWN'
-                    if ch3 == 'C':
-                        return 'RIGHT'
-                    if ch3 == 'D':
-                        return 'LEFT'
-                else:
-                    return 'ESCAPE'
+            return decode_key(sys.stdin.read)
         finally:
             termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch1
 
 
 class _GetchWindows:
@@ -85,4 +132,68 @@ class _GetchWindows:
         return str(ch1, 'utf-8')
 
 
-getkey = _Getch()
+class _KeysTerminal:
+    # a class rather than contextlib.contextmanager, contextlib alone doubles the import time of this module
+    def __enter__(self):
+        import sys, tty, termios
+        self.fd = sys.stdin.fileno()
+        self.old_settings = termios.tcgetattr(self.fd)
+        tty.setcbreak(self.fd)
+        return self.fd
+
+    def __exit__(self, *exc_info):
+        import termios
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.old_settings)
+
+
+def keys_terminal():
+    """Unix only: keys are read one by one without echo until the block ends (set once, not per key).
+
+    Unlike _GetchUnix's raw mode, output processing stays on so that print
+    still starts new lines at the left edge.
+    """
+    return _KeysTerminal()
+
+
+def start_key_reader(loop, fd: int):
+    """Unix only: decodes the keys typed on fd into an asyncio queue from the event loop, never blocking.
+
+    Stop it with loop.remove_reader(fd).
+    """
+    import asyncio
+    queue = asyncio.Queue()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    # an escape sequence cut at the end of a read, and the timer ending it
+    pending = {'text': '', 'timer': None}
+
+    def put_keys(text, final=False):
+        keys, pending['text'] = decode_keys(text, final)
+        for key in keys:
+            queue.put_nowait(key)
+
+    def on_timeout():
+        pending['timer'] = None
+        put_keys(pending['text'], final=True)
+
+    def on_readable():
+        if pending['timer'] is not None:
+            pending['timer'].cancel()
+            pending['timer'] = None
+        put_keys(pending['text'] + decoder.decode(os.read(fd, 1024)))
+        if pending['text']:
+            pending['timer'] = loop.call_later(ESCAPE_DELAY, on_timeout)
+
+    loop.add_reader(fd, on_readable)
+    return queue
+
+
+# Picked on the first key read, not at import: importing the game logic must
+# not look for sequence.txt, load a terminal module or print the test banner.
+_backend = None
+
+def getkey():
+    """Reads one key: from sequence.txt when it exists, else from the Windows console or the Unix terminal."""
+    global _backend
+    if _backend is None:
+        _backend = _Getch()
+    return _backend()
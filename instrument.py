@@ -0,0 +1,121 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+import builtins
+import inspect
+import json
+import sys
+import time
+
+# Set to 1 to print a summary at the end of the game, or to a .json path to export it.
+ENV_VAR = 'ULBLOQUE_PROFILE'
+
+# Functions wrapped by enable when the module has them. The --live game reads
+# keys with read_key (the wait for a key) and decode_keys (the decoding).
+WRAPPED = ['getkey', 'read_key', 'decode_keys', 'move_car', 'slide_car', 'get_game_str', 'get_move_update_str']
+
+# Histogram bucket b counts the calls that took less than 2**b microseconds
+# (and at least 2**(b-1)), the last one everything slower.
+BUCKETS = 32
+
+# Nothing is wrapped until enable is called, so a disabled session runs the
+# plain functions. The originals are kept here to put them back.
+_originals = {}
+
+def new_stats() -> dict:
+    """Empty counters: one timer per wrapped function, plus the output of print."""
+    return {'timers': {}, 'bytes_written': 0, 'prints': 0}
+
+def record(stats: dict, name: str, elapsed_ns: int):
+    """Adds one call of elapsed_ns nanoseconds to the timer of name."""
+    timer = stats['timers'].get(name)
+    if timer is None:
+        timer = stats['timers'][name] = {'count': 0, 'total_ns': 0, 'max_ns': 0, 'histogram': [0] * BUCKETS}
+    timer['count'] += 1
+    timer['total_ns'] += elapsed_ns
+    if elapsed_ns > timer['max_ns']:
+        timer['max_ns'] = elapsed_ns
+    timer['histogram'][min((elapsed_ns // 1000).bit_length(), BUCKETS - 1)] += 1
+
+def timed(stats: dict, name: str, func):
+    """func, with each call timed in stats under name (until the awaited result for a coroutine function)."""
+    clock = time.perf_counter_ns
+
+    if inspect.iscoroutinefunction(func):
+        async def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(stats, name, clock() - start)
+    else:
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stats, name, clock() - start)
+    wrapper.__wrapped__ = func
+    return wrapper
+
+def counted_print(stats: dict):
+    """print, with its time and the bytes it writes counted in stats."""
+    clock = time.perf_counter_ns
+
+    def wrapper(*args, sep=' ', end='\n', **kwargs):
+        start = clock()
+        # looked up on every call, tests replace builtins.print
+        builtins.print(*args, sep=sep, end=end, **kwargs)
+        record(stats, 'print', clock() - start)
+        stats['prints'] += 1
+        stats['bytes_written'] += len((sep.join(map(str, args)) + end).encode())
+    return wrapper
+
+def enable(module, stats: dict = None) -> dict:
+    """Wraps the functions of module (ulbloque, async_game, getkey) listed in WRAPPED and its print calls, returns the stats."""
+    if stats is None:
+        stats = new_stats()
+    saved = _originals.setdefault(module.__name__, {})
+    for name in WRAPPED:
+        if hasattr(module, name) and name not in saved:
+            saved[name] = getattr(module, name)
+            setattr(module, name, timed(stats, name, saved[name]))
+    # a module global shadows the builtin for the code of that module only
+    module.print = counted_print(stats)
+    return stats
+
+def disable(module):
+    """Puts back the functions wrapped by enable."""
+    for name, func in _originals.pop(module.__name__, {}).items():
+        setattr(module, name, func)
+    if 'print' in vars(module):
+        del module.print
+
+def get_percentile(timer: dict, fraction: float) -> int:
+    """Upper bound in microseconds of the bucket holding the given fraction of the calls."""
+    wanted = fraction * timer['count']
+    seen = 0
+    for bucket, count in enumerate(timer['histogram']):
+        seen += count
+        if seen >= wanted:
+            return 1 << bucket
+    return 1 << (BUCKETS - 1)
+
+def get_summary_str(stats: dict) -> str:
+    """Return a printable table of the timers, percentiles read from the histograms."""
+    lines = [f"{'function':<22}{'calls':>8}{'total ms':>11}{'mean us':>10}{'p50 us':>9}{'p99 us':>9}{'max us':>10}"]
+    for name, timer in sorted(stats['timers'].items(), key=lambda item: -item[1]['total_ns']):
+        mean = timer['total_ns'] / timer['count'] / 1000
+        lines.append(f"{name:<22}{timer['count']:>8}{timer['total_ns'] / 1e6:>11.2f}{mean:>10.1f}"
+                     f"{'<' + str(get_percentile(timer, 0.5)):>9}{'<' + str(get_percentile(timer, 0.99)):>9}{timer['max_ns'] / 1000:>10.1f}")
+    lines.append(f"{stats['bytes_written']} bytes written to the terminal in {stats['prints']} prints")
+    return "\n".join(lines)
+
+def report(stats: dict, destination: str):
+    """Writes the stats as JSON to destination, or prints the summary on stderr when it is '1'."""
+    if destination in ['1', '']:
+        print(get_summary_str(stats), file=sys.stderr)
+        return
+    with open(destination, 'w') as f:
+        json.dump(stats, f, indent=2)
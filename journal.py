@@ -0,0 +1,85 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+# A journal is the list of moves played as (car_index, delta), delta being the
+# signed number of cells the car moved along its lane. Undoing a move is moving
+# the car back by -delta, no copy of the game is needed. Every
+# checkpoint_interval moves, the car positions are saved so that jumping to a
+# move far away replays at most checkpoint_interval / 2 moves.
+
+def new_journal(game: dict, checkpoint_interval: int = 32) -> dict:
+    """Empty journal starting from the current position of game."""
+    return {
+        'entries': [],
+        'totals': [0],      # totals[i]: number of cells moved by the first i entries
+        'position': 0,      # entries before it are played, the ones after can be redone
+        'checkpoints': {0: [car[0] for car in game['cars']]},
+        'interval': checkpoint_interval,
+    }
+
+def shift_car(game: dict, car_index: int, delta: int) -> tuple:
+    """Moves a car delta cells along its lane without any check, returns its old position."""
+    car = game['cars'][car_index]
+    (x, y), orientation, size = car
+    new_x, new_y = (x + delta, y) if orientation == 'h' else (x, y + delta)
+    occupancy = game.get('occupancy')
+    if occupancy is not None:
+        width = game['width']
+        step = 1 if orientation == 'h' else width
+        for j in range(size):
+            occupancy[y * width + x + j * step] = 0
+        for j in range(size):
+            occupancy[new_y * width + new_x + j * step] = car_index + 1
+    car[0] = (new_x, new_y)
+    return (x, y)
+
+def record_move(journal: dict, game: dict, car_index: int, delta: int):
+    """Adds a move that was just played on game, the moves that could be redone are dropped."""
+    position = journal['position']
+    if position < len(journal['entries']):
+        del journal['entries'][position:]
+        del journal['totals'][position + 1:]
+        for index in [index for index in journal['checkpoints'] if index > position]:
+            del journal['checkpoints'][index]
+    journal['entries'].append((car_index, delta))
+    journal['totals'].append(journal['totals'][-1] + abs(delta))
+    journal['position'] = position + 1
+    if journal['position'] % journal['interval'] == 0:
+        journal['checkpoints'][journal['position']] = [car[0] for car in game['cars']]
+
+def get_journal_moves(journal: dict) -> int:
+    """Number of moves of the current position (undone moves don't count)."""
+    return journal['totals'][journal['position']]
+
+def undo_move(journal: dict, game: dict) -> tuple | None:
+    """Takes back the last move, returns (car_index, old_pos) of the car moved or None if there is none."""
+    if journal['position'] == 0:
+        return None
+    journal['position'] -= 1
+    car_index, delta = journal['entries'][journal['position']]
+    return car_index, shift_car(game, car_index, -delta)
+
+def redo_move(journal: dict, game: dict) -> tuple | None:
+    """Plays the last undone move again, returns (car_index, old_pos) of the car moved or None if there is none."""
+    if journal['position'] == len(journal['entries']):
+        return None
+    car_index, delta = journal['entries'][journal['position']]
+    journal['position'] += 1
+    return car_index, shift_car(game, car_index, delta)
+
+def goto_move(journal: dict, game: dict, index: int):
+    """Puts game in the position after the first index entries, from the closest checkpoint or the current position."""
+    if not 0 <= index <= len(journal['entries']):
+        raise IndexError(f"no move {index} in the journal")
+    start = min(journal['checkpoints'], key=lambda checkpoint: abs(checkpoint - index))
+    if abs(start - index) < abs(journal['position'] - index):
+        for car, pos in zip(game['cars'], journal['checkpoints'][start]):
+            car[0] = pos
+        # cars were moved behind move_car's back
+        game.pop('occupancy', None)
+        journal['position'] = start
+    while journal['position'] < index:
+        redo_move(journal, game)
+    while journal['position'] > index:
+        undo_move(journal, game)
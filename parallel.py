@@ -0,0 +1,331 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from array import array
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import os
+import time
+import traceback
+
+from solver import get_layout, pack_state, canonical_state, canonical_successor, get_successors, is_win_state, get_chain_moves, search
+
+# Level-synchronous BFS over worker processes. Every state belongs to the
+# worker picked by its hash, which keeps the visited states it owns in an
+# open-addressing table in shared memory. A level is two steps:
+#   expand: each worker reads its frontier and writes the successors to its
+#           outbox, grouped by owner
+#   merge:  each worker reads its part of every outbox, adds the new states
+#           to its table and writes them as its next frontier
+# Only segment names and counts go through the pipes, never states.
+
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+# A table is at most half full, it starts with room for this many states.
+MIN_CAPACITY = 1 << 12
+
+def get_hash(state: int) -> int:
+    """64-bit mix of state, the high bits pick the owner and the low ones the slot."""
+    h = (state * HASH_MULTIPLIER) & HASH_MASK
+    return h ^ (h >> 29)
+
+def get_owner(state: int, workers: int) -> int:
+    """Index of the worker holding state."""
+    return (get_hash(state) >> 40) % workers
+
+def new_segment(count: int) -> SharedMemory:
+    """Shared memory for count 64-bit integers."""
+    return SharedMemory(create=True, size=max(8, count * 8))
+
+def free_segment(segment: SharedMemory):
+    segment.close()
+    segment.unlink()
+
+def get_table_views(segment: SharedMemory, capacity: int) -> tuple[memoryview, memoryview]:
+    """Keys (state + 1, 0 for an empty slot) and BFS levels of a table segment."""
+    return segment.buf[:capacity * 8].cast('Q'), segment.buf[capacity * 8:capacity * 10].cast('H')
+
+def get_slot(keys: memoryview, state: int) -> int:
+    """Slot holding state in keys, or the empty slot where it would go (linear probing)."""
+    mask = len(keys) - 1
+    key = state + 1
+    slot = get_hash(state) & mask
+    while keys[slot] != 0 and keys[slot] != key:
+        slot = (slot + 1) & mask
+    return slot
+
+def new_shard(index: int, workers: int, layout: dict) -> dict:
+    """What a worker keeps between commands, every array is a shared memory segment."""
+    shard = {'index': index, 'workers': workers, 'layout': layout, 'size': 0, 'capacity': MIN_CAPACITY,
+             'frontier': new_segment(1), 'outbox': new_segment(workers + 1)}
+    shard['table'] = SharedMemory(create=True, size=MIN_CAPACITY * 10)
+    shard['frontier'].buf[:8] = bytes(8)
+    return shard
+
+def free_shard(shard: dict):
+    for name in ['table', 'frontier', 'outbox']:
+        free_segment(shard[name])
+
+def grow_table(shard: dict, wanted: int):
+    """Rehashes the table into a bigger segment so that wanted states fit at most half full."""
+    capacity = shard['capacity']
+    while wanted * 2 > capacity:
+        capacity *= 2
+    if capacity == shard['capacity']:
+        return
+    table = SharedMemory(create=True, size=capacity * 10)
+    old_keys, old_levels = get_table_views(shard['table'], shard['capacity'])
+    keys, levels = get_table_views(table, capacity)
+    for slot, key in enumerate(old_keys):
+        if key:
+            new_slot = get_slot(keys, key - 1)
+            keys[new_slot] = key
+            levels[new_slot] = old_levels[slot]
+    for view in [old_keys, old_levels, keys, levels]:
+        view.release()
+    free_segment(shard['table'])
+    shard['table'], shard['capacity'] = table, capacity
+
+def write_states(shard: dict, name: str, header: list[int], states: list[int]):
+    """Writes header then states to the segment shard[name], replaced by a bigger one when needed."""
+    count = len(header) + len(states)
+    if shard[name].size < count * 8:
+        free_segment(shard[name])
+        shard[name] = new_segment(count * 2)
+    data = array('Q', header)
+    data.extend(states)
+    with shard[name].buf.cast('Q') as view, memoryview(data) as source:
+        view[:count] = source
+
+def add_states(shard: dict, states, level: int) -> list[int]:
+    """Adds states to the table with the given level, returns the ones that were not there yet."""
+    grow_table(shard, shard['size'] + len(states))
+    keys, levels = get_table_views(shard['table'], shard['capacity'])
+    mask = shard['capacity'] - 1
+    added = []
+    # get_slot inlined, this is the inner loop of the merge
+    for state in states:
+        key = state + 1
+        h = (state * HASH_MULTIPLIER) & HASH_MASK
+        slot = (h ^ (h >> 29)) & mask
+        while True:
+            found = keys[slot]
+            if found == 0:
+                keys[slot] = key
+                levels[slot] = level
+                added.append(state)
+                break
+            if found == key:
+                break
+            slot = (slot + 1) & mask
+    keys.release()
+    levels.release()
+    shard['size'] += len(added)
+    return added
+
+def seed(shard: dict, state: int) -> int:
+    """Puts the root of the search in the table and the frontier."""
+    add_states(shard, [state], 0)
+    write_states(shard, 'frontier', [1], [state])
+    return shard['table'].name
+
+def expand(shard: dict) -> tuple[str, int]:
+    """Writes the successors of the frontier to the outbox grouped by owner, returns (outbox name, count)."""
+    layout, workers = shard['layout'], shard['workers']
+    symmetric = layout['mirror'] is not None
+    with shard['frontier'].buf.cast('Q') as view:
+        frontier = view[1:1 + view[0]].tolist()
+    boxes = [[] for _ in range(workers)]
+    for state in frontier:
+        for _, _, next_state in get_successors(layout, state):
+            if symmetric:
+                next_state = canonical_successor(layout, next_state)
+            # get_owner inlined
+            h = (next_state * HASH_MULTIPLIER) & HASH_MASK
+            boxes[((h ^ (h >> 29)) >> 40) % workers].append(next_state)
+    offsets = [workers + 1]
+    for box in boxes:
+        offsets.append(offsets[-1] + len(box))
+    write_states(shard, 'outbox', offsets, [state for box in boxes for state in box])
+    return shard['outbox'].name, offsets[-1] - offsets[0]
+
+def merge(shard: dict, level: int, outbox_names: list[str]) -> tuple[int, int | None, str, int]:
+    """Adds this worker's part of every outbox to its table and makes the new states the next frontier.
+
+    Returns (new states, a winning state among them or None, table name, table capacity).
+    """
+    index = shard['index']
+    incoming = []
+    for name in outbox_names:
+        outbox = SharedMemory(name)
+        with outbox.buf.cast('Q') as view:
+            incoming += view[view[index]:view[index + 1]].tolist()
+        outbox.close()
+    added = add_states(shard, incoming, level)
+    write_states(shard, 'frontier', [len(added)], added)
+    win = next((state for state in added if is_win_state(shard['layout'], state)), None)
+    return len(added), win, shard['table'].name, shard['capacity']
+
+COMMANDS = {
+    'seed': seed,
+    'expand': expand,
+    'merge': merge,
+}
+
+def run_worker(index: int, workers: int, layout: dict, conn):
+    """Worker process: runs the commands received on conn until 'stop', then frees its segments."""
+    shard = new_shard(index, workers, layout)
+    try:
+        while True:
+            command, *args = conn.recv()
+            if command == 'stop':
+                break
+            try:
+                conn.send(('ok', COMMANDS[command](shard, *args)))
+            except Exception:
+                conn.send(('error', traceback.format_exc()))
+    finally:
+        free_shard(shard)
+        conn.close()
+
+def call_all(connections: list, commands: list) -> list:
+    """Sends one command to every worker, then waits for all the answers."""
+    for conn, command in zip(connections, commands):
+        conn.send(command)
+    results = []
+    for conn in connections:
+        status, result = conn.recv()
+        if status == 'error':
+            raise RuntimeError(f"parallel search worker failed:\n{result}")
+        results.append(result)
+    return results
+
+def get_level(tables: list, workers: int, state: int) -> int | None:
+    """BFS level of state read from its owner's table, None if it was never reached."""
+    keys, levels = tables[get_owner(state, workers)]
+    slot = get_slot(keys, state)
+    return levels[slot] if keys[slot] else None
+
+def get_parallel_chain(layout: dict, tables: list, workers: int, win: int, depth: int) -> list[int]:
+    """States from the root to win, going back one level at a time (every move can be undone)."""
+    symmetric = layout['mirror'] is not None
+    chain = [win]
+    for level in range(depth - 1, -1, -1):
+        for _, _, state in get_successors(layout, chain[-1]):
+            if symmetric:
+                state = canonical_successor(layout, state)
+            if get_level(tables, workers, state) == level:
+                chain.append(state)
+                break
+    chain.reverse()
+    return chain
+
+def search_parallel(game: dict, workers: int = None) -> dict:
+    """Breadth-first search sharded over worker processes, same result as solver.search.
+
+    Falls back to solver.search for boards whose states don't fit in 64 bits.
+    """
+    start_time = time.perf_counter()
+    workers = workers or os.cpu_count()
+    layout = get_layout(game)
+    if layout['shift'] * layout['count'] > 64:
+        return search(game)
+    start = pack_state(layout, game['cars'])
+    root = canonical_state(layout, start)
+    result = {'moves': None, 'explored': 1, 'expanded': 0, 'workers': workers}
+    if is_win_state(layout, root):
+        result.update(moves=[], time=time.perf_counter() - start_time)
+        return result
+    # one tracker for the whole family, the workers free what they create
+    resource_tracker.ensure_running()
+    connections, processes = [], []
+    for index in range(workers):
+        conn, worker_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=run_worker, args=(index, workers, layout, worker_conn), daemon=True)
+        process.start()
+        worker_conn.close()
+        connections.append(conn)
+        processes.append(process)
+    try:
+        owner = get_owner(root, workers)
+        call_all([connections[owner]], [('seed', root)])
+        level = 0
+        frontier_size = 1
+        win = None
+        while win is None and frontier_size:
+            expanded = call_all(connections, [('expand',)] * workers)
+            result['expanded'] += frontier_size
+            level += 1
+            names = [name for name, _ in expanded]
+            merged = call_all(connections, [('merge', level, names)] * workers)
+            frontier_size = sum(count for count, _, _, _ in merged)
+            result['explored'] += frontier_size
+            win = next((state for _, state, _, _ in merged if state is not None), None)
+        if win is not None:
+            segments = [SharedMemory(name) for _, _, name, _ in merged]
+            tables = [get_table_views(segment, capacity) for segment, (_, _, _, capacity) in zip(segments, merged)]
+            try:
+                chain = get_parallel_chain(layout, tables, workers, win, level)
+            finally:
+                for keys, levels in tables:
+                    keys.release()
+                    levels.release()
+                for segment in segments:
+                    segment.close()
+            result['moves'] = get_chain_moves(layout, chain, start)
+    finally:
+        for conn in connections:
+            conn.send(('stop',))
+        for process in processes:
+            process.join()
+    result['time'] = time.perf_counter() - start_time
+    return result
+
+def get_scaling(game: dict, worker_counts: list[int]) -> list[dict]:
+    """Times search_parallel for each worker count, efficiency is relative to the first count."""
+    rows = []
+    for workers in worker_counts:
+        result = search_parallel(game, workers)
+        rows.append({'workers': workers, 'time': result['time'], 'explored': result['explored'],
+                     'length': None if result['moves'] is None else len(result['moves'])})
+    base = rows[0]
+    for row in rows:
+        row['speedup'] = base['time'] / row['time']
+        row['efficiency'] = row['speedup'] * base['workers'] / row['workers']
+    return rows
+
+def get_scaling_str(rows: list[dict]) -> str:
+    """Return a printable table of get_scaling."""
+    lines = [f"{'workers':>8}{'time s':>10}{'speedup':>9}{'efficiency':>12}{'states':>12}{'moves':>7}"]
+    for row in rows:
+        lines.append(f"{row['workers']:>8}{row['time']:>10.3f}{row['speedup']:>9.2f}{row['efficiency']:>11.0%} "
+                     f"{row['explored']:>11}{row['length'] if row['length'] is not None else '-':>7}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    from ulbloque import parse_game
+
+    parser = argparse.ArgumentParser(description="Solve a ULBloque game with a BFS spread over several processes.")
+    parser.add_argument('game_file')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count()],
+                        help="worker counts to time, the scaling efficiency is relative to the first one")
+    parser.add_argument('--check', action='store_true', help="also solve with the single-process search and compare")
+    args = parser.parse_args()
+
+    game = parse_game(args.game_file)
+    rows = get_scaling(game, sorted(set(args.workers)))
+    print(get_scaling_str(rows))
+    if args.check:
+        reference = search(game)
+        length = None if reference['moves'] is None else len(reference['moves'])
+        print(f"single process: {reference['time']:.3f}s, {length if length is not None else 'no solution'}")
+        if any(row['length'] != length for row in rows):
+            print("Move counts differ from the single-process search!", file=sys.stderr)
+            sys.exit(1)
@@ -0,0 +1,235 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from bisect import bisect_left
+import mmap
+import os
+import random
+import struct
+
+from ulbloque import parse_game, iter_games, get_game_file_str
+from solver import get_layout, pack_state, search
+from explorer import enumerate_states
+from checker import find_levels, run_checks
+
+# Puzzle database file: header, then one fixed-size record per puzzle, then
+# the index: (width, height, optimal, record number) sorted, so that the
+# puzzles of a size and a range of optimal lengths are a slice found by
+# bisection. Everything is read in place through mmap.
+DB_MAGIC = b'ULBP'
+DB_VERSION = 1
+DB_HEADER = struct.Struct('<4sHHQQ')  # magic, version, record size, records, offset of the index
+
+# Record: width, height, car count, max_moves, optimal length, reachable states,
+# then MAX_CARS cars of (x, y, size) with the high bit of size set for a vertical car.
+MAX_CARS = 26
+RECORD_HEAD = struct.Struct('<BBBxHHI')
+CAR = struct.Struct('<BBB')
+RECORD_SIZE = RECORD_HEAD.size + MAX_CARS * CAR.size
+VERTICAL = 0x80
+
+INDEX_ENTRY = struct.Struct('<BBHI')
+
+# optimal length stored for a puzzle that can't be won
+NO_SOLUTION = 0xFFFF
+
+def pack_record(game: dict, optimal: int | None, states: int) -> bytes:
+    """Fixed-size record of a game and its metadata."""
+    if len(game['cars']) > MAX_CARS:
+        raise ValueError(f"at most {MAX_CARS} cars fit in a record")
+    record = bytearray(RECORD_SIZE)
+    RECORD_HEAD.pack_into(record, 0, game['width'], game['height'], len(game['cars']), game['max_moves'],
+                          NO_SOLUTION if optimal is None else optimal, states)
+    for i, ((x, y), orientation, size) in enumerate(game['cars']):
+        CAR.pack_into(record, RECORD_HEAD.size + i * CAR.size, x, y, size | (VERTICAL if orientation == 'v' else 0))
+    return bytes(record)
+
+def unpack_record(buffer, offset: int = 0) -> dict:
+    """Metadata and game of the record at offset of buffer."""
+    width, height, car_count, max_moves, optimal, states = RECORD_HEAD.unpack_from(buffer, offset)
+    cars = []
+    for i in range(car_count):
+        x, y, size = CAR.unpack_from(buffer, offset + RECORD_HEAD.size + i * CAR.size)
+        cars.append([(x, y), 'v' if size & VERTICAL else 'h', size & ~VERTICAL])
+    return {
+        'optimal': None if optimal == NO_SOLUTION else optimal,
+        'states': states,
+        'cars': car_count,
+        'game': {'width': width, 'height': height, 'max_moves': max_moves, 'cars': cars},
+    }
+
+def get_metadata(entry: tuple) -> tuple:
+    """(n, record) of an (n, game) entry: solves the game and counts its reachable states."""
+    n, game = entry
+    layout = get_layout(game)
+    result = search(game)
+    optimal = None if result['moves'] is None else len(result['moves'])
+    return n, pack_record(game, optimal, len(enumerate_states(layout, pack_state(layout, game['cars']))))
+
+def iter_entries(source: str):
+    """Yields the (name, game) of every game*.txt of a directory, or of every game of a puzzle pack."""
+    if os.path.isdir(source):
+        for path in find_levels(source):
+            yield path, parse_game(path)
+    else:
+        for i, game in enumerate(iter_games(source)):
+            yield f"{source}:{i + 1}", game
+
+def write_database(records, db_path: str) -> int:
+    """Writes (n, record) pairs, in any order, as record n of db_path, then the index; returns the record count.
+
+    Records go to the file as they come, only the index is kept in memory.
+    """
+    index = []
+    with open(db_path, 'wb') as f:
+        for n, record in records:
+            width, height, _, _, optimal, _ = RECORD_HEAD.unpack_from(record)
+            index.append((width, height, optimal, n))
+            f.seek(DB_HEADER.size + n * RECORD_SIZE)
+            f.write(record)
+        index.sort()
+        index_offset = DB_HEADER.size + len(index) * RECORD_SIZE
+        f.seek(index_offset)
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.seek(0)
+        f.write(DB_HEADER.pack(DB_MAGIC, DB_VERSION, RECORD_SIZE, len(index), index_offset))
+    return len(index)
+
+def build_database(sources: list[str], db_path: str, jobs: int = 1) -> int:
+    """Solves every game of sources (directories or puzzle packs) and writes the database, returns the puzzle count.
+
+    Games are read as the workers need them. Records are in source order,
+    whatever order the workers finish in.
+    """
+    games = (game for source in sources for _, game in iter_entries(source))
+    return write_database(run_checks(get_metadata, enumerate(games), jobs), db_path)
+
+class IndexView:
+    """The index of a database as a read-only sequence of (width, height, optimal, record) for bisect."""
+    def __init__(self, buffer, offset: int, count: int):
+        self.buffer, self.offset, self.count = buffer, offset, count
+
+    def __len__(self): return self.count
+
+    def __getitem__(self, i: int) -> tuple:
+        return INDEX_ENTRY.unpack_from(self.buffer, self.offset + i * INDEX_ENTRY.size)
+
+
+class PuzzleDatabase:
+    """A puzzle database file opened with mmap, nothing is read until a record is asked for."""
+    def __init__(self, path: str):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, self.count, index_offset = DB_HEADER.unpack_from(self.map)
+        if magic != DB_MAGIC or version != DB_VERSION or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a ulbloque puzzle database")
+        self.index = IndexView(self.map, index_offset, self.count)
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc_info): self.close()
+
+    def __len__(self): return self.count
+
+    def close(self):
+        if self.file is not None:
+            self.map.close()
+            self.file.close()
+            self.file = None
+
+    def get_record(self, n: int) -> dict:
+        """Metadata and game of record n."""
+        if not 0 <= n < self.count:
+            raise IndexError(f"no record {n} in a database of {self.count}")
+        return unpack_record(self.map, DB_HEADER.size + n * RECORD_SIZE)
+
+    def get_game(self, n: int) -> dict:
+        return self.get_record(n)['game']
+
+    def find(self, width: int, height: int, min_length: int = 0, max_length: int = NO_SOLUTION - 1) -> range:
+        """Positions in the index of the puzzles of that size with an optimal length in [min_length, max_length]."""
+        start = bisect_left(self.index, (width, height, min_length, 0))
+        stop = bisect_left(self.index, (width, height, max_length + 1, 0))
+        return range(start, stop)
+
+    def get_random_record(self, width: int, height: int, min_length: int = 0, max_length: int = NO_SOLUTION - 1,
+                          rng: random.Random = random) -> dict | None:
+        """A random record of that size and range of optimal lengths, None if there is none."""
+        found = self.find(width, height, min_length, max_length)
+        if not found:
+            return None
+        return self.get_record(self.index[rng.choice(found)][3])
+
+    def get_sizes(self) -> dict[tuple[int, int], int]:
+        """Number of puzzles of each (width, height), one bisection per size."""
+        sizes = {}
+        i = 0
+        while i < self.count:
+            width, height, _, _ = self.index[i]
+            stop = bisect_left(self.index, (width, height + 1, 0, 0))
+            sizes[width, height] = stop - i
+            i = stop
+        return sizes
+
+
+def export_database(db_path: str, out_dir: str, prefix: str = 'game') -> int:
+    """Writes every record back as a game*.txt file of out_dir, returns how many."""
+    os.makedirs(out_dir, exist_ok=True)
+    with PuzzleDatabase(db_path) as db:
+        for n in range(len(db)):
+            with open(os.path.join(out_dir, f"{prefix}{n + 1:05d}.txt"), 'w') as f:
+                f.write(get_game_file_str(db.get_game(n)))
+        return len(db)
+
+def parse_range(text: str) -> tuple[int, int]:
+    """'25-30' -> (25, 30), '25' -> (25, 25)."""
+    low, _, high = text.partition('-')
+    return int(low), int(high or low)
+
+def parse_size(text: str) -> tuple[int, int]:
+    """'6x6' -> (6, 6)."""
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Build and query ULBloque puzzle databases.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="solve game files and write a database")
+    build.add_argument('db')
+    build.add_argument('sources', nargs='+', help="directories of game*.txt or puzzle packs")
+    build.add_argument('--jobs', type=int, default=os.cpu_count())
+    export = commands.add_parser('export', help="write every puzzle back as game*.txt files")
+    export.add_argument('db')
+    export.add_argument('out_dir')
+    export.add_argument('--prefix', default='game')
+    pick = commands.add_parser('random', help="print a random puzzle of a size and range of optimal lengths")
+    pick.add_argument('db')
+    pick.add_argument('--size', type=parse_size, default=(6, 6), help="WxH")
+    pick.add_argument('--length', type=parse_range, default=(0, NO_SOLUTION - 1), help="MIN-MAX optimal length")
+    pick.add_argument('--seed', type=int)
+    info = commands.add_parser('info', help="number of puzzles of each size")
+    info.add_argument('db')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        print(f"{build_database(args.sources, args.db, args.jobs)} puzzles written to {args.db}")
+    elif args.command == 'export':
+        print(f"{export_database(args.db, args.out_dir, args.prefix)} games written to {args.out_dir}")
+    elif args.command == 'random':
+        with PuzzleDatabase(args.db) as db:
+            record = db.get_random_record(*args.size, *args.length, rng=random.Random(args.seed))
+        if record is None:
+            print("No puzzle matches.", file=sys.stderr)
+            sys.exit(1)
+        print(get_game_file_str(record['game']), end="")
+    else:
+        with PuzzleDatabase(args.db) as db:
+            for (width, height), count in sorted(db.get_sizes().items()):
+                print(f"{width}x{height}: {count} puzzles")
@@ -0,0 +1,278 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+import os
+import time
+
+import instrument
+from ulbloque import ARROW_KEYS, SLIDE_KEYS, UNDO_KEY, REDO_KEY
+
+# Session log: files of LOG_MAGIC followed by sessions, each a varint length
+# and that many bytes. A session is kept in memory while it is played (a few
+# bytes per key) and written in one piece when it ends, so that a file never
+# holds half a session, even with many sessions played at once.
+#
+# Session: started (varint unix seconds), width, height (bytes), max_moves
+# (varint), car count (byte), then per car x, y, size with the high bit set for
+# a vertical car, then the events.
+#
+# Event: one byte, code in the low 5 bits, arg in the next 2, accepted in the
+# high bit, then the time since the previous event (or the start) as a varint
+# of TICK seconds. The END event is followed by the moves played (varint).
+LOG_MAGIC = b'ULBS\x01'
+VERTICAL = 0x80
+TICK = 0.01
+
+# codes 0-25 are the selection of that car, arg unused
+STEP, SLIDE, UNDO, REDO, HINT, END = 26, 27, 28, 29, 30, 31
+# arg of STEP and SLIDE; END's arg is play_game's return value
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+
+MAX_LOG_BYTES = 64 << 20
+BUFFER_SIZE = 1 << 16
+
+def write_varint(data: bytearray, value: int):
+    while value >= 0x80:
+        data.append(value & 0x7F | 0x80)
+        value >>= 7
+    data.append(value)
+
+def read_varint(data, offset: int) -> tuple[int, int]:
+    """(value, offset after it) of the varint at offset, IndexError if data ends in the middle."""
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def new_recording(game: dict, clock=time.monotonic) -> dict:
+    """Recording of a game about to be played, starting with its header."""
+    data = bytearray()
+    write_varint(data, int(time.time()))
+    data += bytes([game['width'], game['height']])
+    write_varint(data, game['max_moves'])
+    data.append(len(game['cars']))
+    for (x, y), orientation, size in game['cars']:
+        data += bytes([x, y, size | (VERTICAL if orientation == 'v' else 0)])
+    return {'data': data, 'clock': clock, 'last': clock()}
+
+def add_event(recording: dict, code: int, arg: int = 0, accepted: bool = True):
+    now = recording['clock']()
+    data = recording['data']
+    data.append(code | arg << 5 | accepted << 7)
+    write_varint(data, round((now - recording['last']) / TICK))
+    recording['last'] = now
+
+def record_key(recording: dict, game: dict, session: dict, key: str, moved: tuple | None):
+    """Adds the event of a key play_game has just handled, moved being what apply_key returned."""
+    key = key.upper()
+    if key in ARROW_KEYS:
+        add_event(recording, STEP, DIRECTIONS.index(key), moved is not None)
+    elif key in SLIDE_KEYS:
+        add_event(recording, SLIDE, DIRECTIONS.index(SLIDE_KEYS[key]), moved is not None)
+    elif key in [UNDO_KEY, REDO_KEY]:
+        add_event(recording, UNDO if key == UNDO_KEY else REDO, 0, moved is not None)
+    elif key == '?':
+        add_event(recording, HINT)
+    elif len(key) == 1 and key.isalpha() and session['selected_car'] == ord(key) - ord('A'):
+        add_event(recording, session['selected_car'])
+    # any other key does nothing in the game and isn't recorded
+
+def record_end(recording: dict, outcome: int, moves: int):
+    add_event(recording, END, outcome)
+    write_varint(recording['data'], moves)
+
+
+class SessionLog:
+    """Appends finished recordings to prefix-NNNNN.ulog files of directory.
+
+    Writes go through a BUFFER_SIZE buffer, a new file is started before one
+    would grow past max_bytes.
+    """
+    def __init__(self, directory: str, max_bytes: int = MAX_LOG_BYTES, prefix: str = 'sessions'):
+        os.makedirs(directory, exist_ok=True)
+        self.directory, self.max_bytes, self.prefix = directory, max_bytes, prefix
+        numbers = [int(name[len(prefix) + 1:-5]) for name in os.listdir(directory)
+                   if name.startswith(prefix + '-') and name.endswith('.ulog') and name[len(prefix) + 1:-5].isdigit()]
+        self.number = max(numbers, default=1)
+        self.file = None
+        self.open()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc_info): self.close()
+
+    def get_path(self) -> str:
+        return os.path.join(self.directory, f"{self.prefix}-{self.number:05d}.ulog")
+
+    def open(self):
+        self.file = open(self.get_path(), 'ab', buffering=BUFFER_SIZE)
+        # in append mode, tell starts at the end of the file
+        self.size = self.file.tell()
+        if self.size == 0:
+            self.file.write(LOG_MAGIC)
+            self.size = len(LOG_MAGIC)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def write(self, recording: dict):
+        data = recording['data']
+        record = bytearray()
+        write_varint(record, len(data))
+        record += data
+        if self.size + len(record) > self.max_bytes and self.size > len(LOG_MAGIC):
+            self.close()
+            self.number += 1
+            self.open()
+        self.file.write(record)
+        self.size += len(record)
+
+# Reading: find_logs -> iter_records -> iter_sessions -> get_statistics, every
+# step a generator, so only one chunk of a file and one session are in memory.
+
+def find_logs(directory: str, prefix: str = 'sessions') -> list[str]:
+    """Log files of directory, oldest first."""
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.startswith(prefix + '-') and name.endswith('.ulog')]
+
+def iter_records(path: str, chunk_size: int = 1 << 20):
+    """Yields the bytes of every session of a log file, reading chunk_size bytes at a time."""
+    with open(path, 'rb') as f:
+        if f.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            raise ValueError(f"{path} is not a ulbloque session log")
+        buffer = b''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                # a session cut short (the game was killed while writing) is dropped
+                return
+            buffer += chunk
+            offset = 0
+            while True:
+                try:
+                    length, start = read_varint(buffer, offset)
+                except IndexError:
+                    break
+                if start + length > len(buffer):
+                    break
+                yield buffer[start:start + length]
+                offset = start + length
+            buffer = buffer[offset:]
+
+def decode_session(data: bytes) -> dict:
+    """Game, outcome, moves and events of a recorded session.
+
+    An event is (code, car, arg, accepted, delay in seconds), car being the car
+    selected when the key was pressed (None if there was none).
+    """
+    started, offset = read_varint(data, 0)
+    width, height = data[offset], data[offset + 1]
+    max_moves, offset = read_varint(data, offset + 2)
+    car_count = data[offset]
+    cars = []
+    for i in range(offset + 1, offset + 1 + 3 * car_count, 3):
+        x, y, size = data[i], data[i + 1], data[i + 2]
+        cars.append([(x, y), 'v' if size & VERTICAL else 'h', size & ~VERTICAL])
+    offset += 1 + 3 * car_count
+    events = []
+    selected = None
+    outcome = moves = None
+    while offset < len(data):
+        byte = data[offset]
+        code, arg, accepted = byte & 0x1F, byte >> 5 & 3, byte >> 7
+        delay, offset = read_varint(data, offset + 1)
+        if code < STEP:
+            selected = code
+        events.append((code, selected, arg, bool(accepted), delay * TICK))
+        if code == END:
+            outcome = arg
+            moves, offset = read_varint(data, offset)
+    return {
+        'started': started,
+        'game': {'width': width, 'height': height, 'max_moves': max_moves, 'cars': cars},
+        'outcome': outcome,
+        'moves': moves,
+        'events': events,
+        'bytes': len(data),
+    }
+
+def iter_sessions(paths):
+    """Yields the decoded sessions of every log file of paths."""
+    for path in paths:
+        for data in iter_records(path):
+            yield decode_session(data)
+
+def get_statistics(sessions) -> dict:
+    """Aggregates sessions (any iterable, read once): outcomes, selections and blocked moves by car, time per move, abandon points."""
+    stats = {
+        'sessions': 0, 'events': 0, 'bytes': 0, 'outcomes': [0, 0, 0],
+        'selected': [0] * STEP, 'accepted': [0] * STEP, 'blocked': [0] * STEP,
+        'undos': 0, 'hints': 0, 'abandoned_at': {}, 'timers': {},
+    }
+    for session in sessions:
+        stats['sessions'] += 1
+        stats['bytes'] += session['bytes']
+        events = session['events']
+        stats['events'] += len(events)
+        since_move = 0.0
+        for code, car, arg, accepted, delay in events:
+            since_move += delay
+            if code < STEP:
+                stats['selected'][code] += 1
+            elif code in (STEP, SLIDE):
+                if car is None:
+                    continue
+                stats['accepted' if accepted else 'blocked'][car] += 1
+            elif code == HINT:
+                stats['hints'] += 1
+            elif code == UNDO:
+                stats['undos'] += accepted
+            if accepted and STEP <= code <= REDO:
+                instrument.record(stats, 'move', int(since_move * 1e9))
+                since_move = 0.0
+        outcome = session['outcome']
+        if outcome is not None:
+            stats['outcomes'][outcome] += 1
+            if outcome == 2:
+                abandoned_at = stats['abandoned_at']
+                abandoned_at[session['moves']] = abandoned_at.get(session['moves'], 0) + 1
+    return stats
+
+def get_statistics_str(stats: dict) -> str:
+    """Return a printable summary of get_statistics."""
+    sessions = stats['sessions']
+    won, lost, left = stats['outcomes']
+    lines = [f"{sessions} sessions: {won} won, {lost} out of moves, {left} left",
+             f"{stats['events']} events in {stats['bytes']} bytes ({stats['bytes'] / max(stats['events'], 1):.2f} bytes per event)"]
+    accepted, blocked = sum(stats['accepted']), sum(stats['blocked'])
+    lines.append(f"moves: {accepted} played, {blocked} blocked ({100 * blocked / max(accepted + blocked, 1):.1f}%), "
+                 f"{stats['undos']} undone, {stats['hints']} hints")
+    timer = stats['timers'].get('move')
+    if timer:
+        lines.append(f"time per move: mean {timer['total_ns'] / timer['count'] / 1e6:.0f} ms, "
+                     f"p50 <{instrument.get_percentile(timer, 0.5) // 1000} ms, p90 <{instrument.get_percentile(timer, 0.9) // 1000} ms")
+    cars = [i for i in range(STEP) if stats['selected'][i] or stats['blocked'][i]]
+    lines.append("car  selected  moved  blocked")
+    for i in cars:
+        lines.append(f"{chr(65 + i):<5}{stats['selected'][i]:>8}{stats['accepted'][i]:>7}{stats['blocked'][i]:>9}")
+    if stats['abandoned_at']:
+        counts = sorted(stats['abandoned_at'].items())
+        lines.append("left after N moves: " + ", ".join(f"{moves}: {count}" for moves, count in counts))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Statistics of the games recorded with ulbloque.py --record.")
+    parser.add_argument('paths', nargs='+', help="session log directories or .ulog files")
+    args = parser.parse_args()
+    paths = [path for source in args.paths for path in (find_logs(source) if os.path.isdir(source) else [source])]
+    print(get_statistics_str(get_statistics(iter_sessions(paths))))
@@ -0,0 +1,123 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+import csv
+import fnmatch
+import os
+import sys
+
+from ulbloque import parse_game, new_session, apply_key, is_win
+from checker import run_checks
+
+# A replay is a key file (one key per line, as getkey returns them, like
+# sequence.txt) next to the game it was recorded on: name.keys and name.txt.
+REPLAY_FIELDS = ['file', 'outcome', 'moves', 'keys']
+
+def read_keys(path: str):
+    """Yields the keys of a key file one by one, without loading the whole file."""
+    with open(path, 'r') as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+def replay(game: dict, keys) -> dict:
+    """Plays keys on a copy of game with the rules of play_game, without drawing anything.
+
+    outcome is what play_game would return (0 won, 1 out of moves, 2 left with
+    ESCAPE), None if the keys ran out before the game ended.
+    """
+    game = {
+        'width': game['width'],
+        'height': game['height'],
+        'max_moves': game['max_moves'],
+        'cars': [list(car) for car in game['cars']]
+    }
+    session = new_session(game)
+    count = 0
+    outcome = None
+    keys = iter(keys)
+    # only a move can win, play_game still waits for a key on a board won from the start
+    won = is_win(game)
+    while session['moves'] < game['max_moves']:
+        key = next(keys, None)
+        if key is None:
+            break
+        count += 1
+        if key.upper() == 'ESCAPE':
+            outcome = 2
+            break
+        if apply_key(game, session, key) is not None:
+            won = is_win(game)
+        if won:
+            outcome = 0
+            break
+    else:
+        outcome = 1
+    return {'game': game, 'moves': session['moves'], 'keys': count, 'outcome': outcome}
+
+def find_replays(directory: str, pattern: str = '*.keys'):
+    """Yields the key files of directory, in name order."""
+    for name in sorted(os.listdir(directory)):
+        if fnmatch.fnmatch(name, pattern):
+            yield os.path.join(directory, name)
+
+def replay_file(keys_path: str, game_path: str = None) -> dict:
+    """Replays a key file on its game (same name, .txt) and returns a report row."""
+    if game_path is None:
+        game_path = os.path.splitext(keys_path)[0] + '.txt'
+    row = dict.fromkeys(REPLAY_FIELDS)
+    row['file'] = keys_path
+    try:
+        result = replay(parse_game(game_path), read_keys(keys_path))
+    except Exception as e:
+        row['outcome'] = f"error: {e}"
+        return row
+    row.update(outcome=result['outcome'], moves=result['moves'], keys=result['keys'])
+    return row
+
+def replay_directory(directory: str, jobs: int = 1):
+    """Yields the report row of every replay of directory (in any order when jobs > 1)."""
+    yield from run_checks(replay_file, find_replays(directory), jobs, chunksize=1)
+
+def read_report(path: str) -> dict:
+    """Rows of a report written by this module's CLI, by file."""
+    with open(path, newline='') as f:
+        return {row['file']: row for row in csv.DictReader(f)}
+
+def get_differences(rows, expected: dict) -> list[str]:
+    """Describes every row whose outcome or move count differs from the expected report."""
+    differences = []
+    for row in rows:
+        old = expected.get(row['file'])
+        if old is None:
+            differences.append(f"{row['file']}: not in the expected report")
+            continue
+        for field in ['outcome', 'moves']:
+            if str(row[field] if row[field] is not None else '') != old[field]:
+                differences.append(f"{row['file']}: {field} {old[field] or None} -> {row[field]}")
+    return differences
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded key sequences without drawing the game.")
+    parser.add_argument('path', help="key file, or directory of name.keys files next to their name.txt game")
+    parser.add_argument('--game', help="game file of a single key file (default: same name, .txt)")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes for a directory")
+    parser.add_argument('--expect', metavar='REPORT', help="compare the outcomes with a report written earlier, exit 1 on any change")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.path):
+        rows = replay_directory(args.path, args.jobs)
+    else:
+        rows = [replay_file(args.path, args.game)]
+    rows = sorted(rows, key=lambda row: row['file'])
+    writer = csv.DictWriter(sys.stdout, REPLAY_FIELDS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    if args.expect:
+        differences = get_differences(rows, read_report(args.expect))
+        for line in differences:
+            print(line, file=sys.stderr)
+        exit(1 if differences else 0)
@@ -0,0 +1,317 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+import asyncio
+import itertools
+import random
+import time
+
+from getkey import decode_keys, ESCAPE_DELAY
+from ulbloque import (parse_game, get_controls_str, get_game_str, get_move_update_str, get_message_update_str, new_session,
+                      apply_key, is_win, start_hint_table, new_shown_hint, get_show_hint_str, get_hide_hint_str,
+                      get_unwinnable_str, get_dead_position_str, get_table_ready_str)
+
+# Telnet bytes (RFC 854). The server asks a telnet client for character mode
+# with server-side echo, and answers IAC AYT with IAC NOP: the load test
+# appends AYT to each key to know when the server is done with it.
+IAC, SB, SE, NOP, AYT = 255, 250, 240, 241, 246
+WILL, WONT, DO, DONT = 251, 252, 253, 254
+ECHO, SUPPRESS_GO_AHEAD = 1, 3
+TELNET_SETUP = bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD])
+PONG = bytes([IAC, NOP])
+PING = bytes([IAC, AYT])
+
+def strip_telnet(data: bytes) -> tuple[bytes, int, bytes]:
+    """Splits data into (the keys typed, the number of AYT, an incomplete command left for the next read)."""
+    if IAC not in data:
+        return data, 0, b''
+    text = bytearray()
+    pings = 0
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != IAC:
+            text.append(byte)
+            i += 1
+            continue
+        if i + 1 >= len(data):
+            return bytes(text), pings, data[i:]
+        command = data[i + 1]
+        if command == IAC:
+            text.append(IAC)
+            i += 2
+        elif command in (WILL, WONT, DO, DONT):
+            if i + 2 >= len(data):
+                return bytes(text), pings, data[i:]
+            i += 3
+        elif command == SB:
+            end = data.find(bytes([IAC, SE]), i + 2)
+            if end < 0:
+                return bytes(text), pings, data[i:]
+            i = end + 2
+        else:
+            pings += command == AYT
+            i += 2
+    return bytes(text), pings, b''
+
+def to_network(text: str) -> bytes:
+    """ANSI text for a socket: no terminal driver turns the line feeds into CR LF there."""
+    return text.replace("\n", "\r\n").encode()
+
+def load_template(path: str) -> dict:
+    """A parsed game shared by every session playing it, with its first frame already encoded.
+
+    The hint table is built by the first session that needs it.
+    """
+    game = parse_game(path)
+    controls = get_controls_str()
+    return {
+        'name': path,
+        'game': game,
+        'top': len(controls.splitlines()),
+        'frame': to_network("\033[H\033[J" + controls + "\n" + get_game_str(game, 0) + "\n"),
+        'warning': get_unwinnable_str(game),
+        'hints': None,
+    }
+
+def new_game(template: dict) -> dict:
+    """A copy of the template's game that a session can move cars in (only the cars are copied)."""
+    game = template['game']
+    return {'width': game['width'], 'height': game['height'], 'max_moves': game['max_moves'],
+            'cars': [list(car) for car in game['cars']]}
+
+def new_player(template: dict) -> dict:
+    """One connection's game: everything play_game keeps in local variables."""
+    if template['hints'] is None:
+        template['hints'] = start_hint_table(template['game'])
+    game = new_game(template)
+    return {'template': template, 'game': game, 'session': new_session(game), 'shown_hint': new_shown_hint()}
+
+def get_warning_str(player: dict, warning: str) -> str:
+    if not warning:
+        return ""
+    player['shown_hint']['message'] = True
+    return get_message_update_str(player['game'], warning, player['template']['top'])
+
+def get_start_str(player: dict) -> str:
+    """ANSI text drawn after the first frame: the unwinnable warning, or the dead position one if the hint table is ready."""
+    template = player['template']
+    if template['warning']:
+        player['session']['checked'] = True
+        return get_warning_str(player, template['warning'])
+    return get_warning_str(player, get_table_ready_str(player['game'], template['hints'], player['session']))
+
+def get_end_str(player: dict, message: str) -> str:
+    game, session = player['game'], player['session']
+    return "\033[H\033[J" + get_game_str(game, session['moves']) + "\n" + message + "\n"
+
+def handle_key(player: dict, key: str) -> tuple[str, int | None]:
+    """play_game's loop body for one key: returns the ANSI updates and the outcome, None while the game goes on."""
+    game, session, shown_hint = player['game'], player['session'], player['shown_hint']
+    template = player['template']
+    hints, top = template['hints'], template['top']
+    key = key.upper()
+    if key == 'ESCAPE':
+        return "Leaving Game! See you soon!\n", 2
+    # the table may have got ready since the last key, like in play_game
+    updates = get_warning_str(player, get_table_ready_str(game, hints, session))
+    if key == '?':
+        updates += get_show_hint_str(game, hints, shown_hint, top)
+    else:
+        moved = apply_key(game, session, key)
+        if moved is not None:
+            car_index, old_pos = moved
+            updates += get_hide_hint_str(game, shown_hint, top)
+            updates += get_move_update_str(game, car_index, old_pos, session['moves'], top)
+            updates += get_warning_str(player, get_dead_position_str(game, hints, session['moves']))
+    if is_win(game):
+        return get_end_str(player, f"\nCongratulations! You've won in {session['moves']} moves!"), 0
+    if session['moves'] >= game['max_moves']:
+        return get_end_str(player, "\nGame Over! You've run out of moves."), 1
+    return updates, None
+
+def new_stats() -> dict:
+    return {'sessions': 0, 'peak': 0, 'started': 0, 'keys': 0, 'outcomes': [0, 0, 0]}
+
+
+class GameProtocol(asyncio.Protocol):
+    """One connection. No task and no buffer of its own: keys are handled in data_received as they come."""
+    def __init__(self, templates, stats: dict):
+        self.templates = templates
+        self.stats = stats
+        self.player = None
+        self.pending = b''
+        self.partial_key = ''
+        self.escape_timer = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.player = new_player(next(self.templates))
+        stats = self.stats
+        stats['started'] += 1
+        stats['sessions'] += 1
+        stats['peak'] = max(stats['peak'], stats['sessions'])
+        transport.write(TELNET_SETUP + self.player['template']['frame'] + to_network(get_start_str(self.player)))
+
+    def data_received(self, data: bytes):
+        if self.player is None:
+            return
+        text, pings, self.pending = strip_telnet(self.pending + data)
+        if self.escape_timer is not None:
+            self.escape_timer.cancel()
+            self.escape_timer = None
+        keys, self.partial_key = decode_keys(self.partial_key + text.decode('utf-8', 'replace'))
+        if self.partial_key:
+            self.escape_timer = asyncio.get_running_loop().call_later(ESCAPE_DELAY, self.end_escape)
+        self.play_keys(keys, pings)
+
+    def end_escape(self):
+        """No more bytes came after an ESC: what is left is the escape key."""
+        self.escape_timer = None
+        keys, self.partial_key = decode_keys(self.partial_key, final=True)
+        if self.player is not None:
+            self.play_keys(keys, 0)
+
+    def play_keys(self, keys: list[str], pings: int):
+        updates = []
+        outcome = None
+        for key in keys:
+            self.stats['keys'] += 1
+            update, outcome = handle_key(self.player, key)
+            updates.append(update)
+            if outcome is not None:
+                break
+        self.transport.write(to_network("".join(updates)) + PONG * pings)
+        if outcome is not None:
+            self.stats['outcomes'][outcome] += 1
+            self.player = None
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        self.stats['sessions'] -= 1
+        self.player = None
+        if self.escape_timer is not None:
+            self.escape_timer.cancel()
+
+
+async def start_server(paths: list[str], host: str = '127.0.0.1', port: int = 2323, stats: dict = None) -> asyncio.Server:
+    """Listens for players, each new connection plays the next game of paths (in turn)."""
+    templates = itertools.cycle([load_template(path) for path in paths])
+    if stats is None:
+        stats = new_stats()
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(lambda: GameProtocol(templates, stats), host, port)
+
+# Load test: every simulated player sends random keys, each followed by an
+# AYT, and times the round trip until the server's NOP comes back.
+
+LOAD_KEYS = ['UP', 'DOWN', 'LEFT', 'RIGHT', 'UP', 'DOWN', 'LEFT', 'RIGHT', 'SHIFT+RIGHT', '-', '+', '?']
+KEY_BYTES = {'UP': '\033[A', 'DOWN': '\033[B', 'RIGHT': '\033[C', 'LEFT': '\033[D', 'SHIFT+RIGHT': '\033[1;2C'}
+
+def encode_key(key: str) -> bytes:
+    """The bytes a terminal sends for key, as read back by decode_key."""
+    return KEY_BYTES.get(key, key).encode()
+
+async def play_randomly(host: str, port: int, key_count: int, think: float, rng: random.Random, latencies: list) -> int:
+    """One simulated player: selects random cars and presses random keys, returns the keys answered."""
+    reader, writer = await asyncio.open_connection(host, port)
+    answered = 0
+    try:
+        for _ in range(key_count):
+            if think:
+                await asyncio.sleep(rng.random() * think)
+            key = rng.choice(LOAD_KEYS) if rng.random() < 0.7 else chr(65 + rng.randrange(4))
+            start = time.perf_counter()
+            writer.write(encode_key(key) + PING)
+            try:
+                await reader.readuntil(PONG)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break  # won or out of moves, the server closed the connection
+            latencies.append(time.perf_counter() - start)
+            answered += 1
+    finally:
+        writer.close()
+    return answered
+
+def get_latency_percentiles(latencies: list[float]) -> dict:
+    """p50, p90, p99 and max of latencies, in milliseconds."""
+    ordered = sorted(latencies)
+    if not ordered:
+        return {}
+    pick = lambda fraction: ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+    return {'p50': pick(0.5), 'p90': pick(0.9), 'p99': pick(0.99), 'max': ordered[-1] * 1000}
+
+async def run_load_test(host: str, port: int, players: int = 1000, key_count: int = 50, think: float = 0.05,
+                        ramp: float = 1.0, seed: int = None) -> dict:
+    """Connects players simulated players over ramp seconds, returns the latency percentiles and counts."""
+    rng = random.Random(seed)
+    latencies = []
+
+    async def player(i):
+        await asyncio.sleep(ramp * i / players)
+        return await play_randomly(host, port, key_count, think, random.Random(rng.random()), latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(player(i) for i in range(players)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    errors = [result for result in results if isinstance(result, BaseException)]
+    report = {
+        'players': players,
+        'errors': len(errors),
+        'keys': len(latencies),
+        'time': elapsed,
+        'keys_per_second': len(latencies) / elapsed,
+    }
+    report.update(get_latency_percentiles(latencies))
+    return report
+
+def get_load_report_str(report: dict) -> str:
+    lines = [f"{report['players']} players, {report['errors']} failed, {report['keys']} keys in {report['time']:.1f}s "
+             f"({report['keys_per_second']:.0f} keys/s)"]
+    if 'p50' in report:
+        lines.append(f"latency ms: p50 {report['p50']:.2f}  p90 {report['p90']:.2f}  p99 {report['p99']:.2f}  max {report['max']:.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Serve ULBloque over telnet, or load test a server.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="play the games over telnet: telnet HOST PORT")
+    serve.add_argument('games', nargs='+', help="game*.txt files, or directories of them, handed out in turn")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=2323)
+    load = commands.add_parser('load', help="simulate players against a running server")
+    load.add_argument('--host', default='127.0.0.1')
+    load.add_argument('--port', type=int, default=2323)
+    load.add_argument('--players', type=int, default=1000)
+    load.add_argument('--keys', type=int, default=50, help="keys per player")
+    load.add_argument('--think', type=float, default=0.05, help="longest pause before a key, in seconds")
+    load.add_argument('--ramp', type=float, default=1.0, help="seconds over which the players connect")
+    load.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    if args.command == 'load':
+        report = asyncio.run(run_load_test(args.host, args.port, args.players, args.keys, args.think, args.ramp, args.seed))
+        print(get_load_report_str(report))
+    else:
+        from checker import find_levels
+
+        async def main():
+            paths = [path for source in args.games for path in (find_levels(source) if os.path.isdir(source) else [source])]
+            stats = new_stats()
+            server = await start_server(paths, args.host, args.port, stats)
+            print(f"Serving {len(paths)} games on {args.host}:{args.port}")
+            async with server:
+                while True:
+                    await asyncio.sleep(10)
+                    print(f"{stats['sessions']} sessions (peak {stats['peak']}), {stats['keys']} keys, "
+                          f"won/lost/left {stats['outcomes']}")
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
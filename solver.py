@@ -0,0 +1,538 @@
+# Daher Ahmed
+# Waberi
+# 000353308
+
+from collections import deque
+import heapq
+import time
+
+# A car only ever slides along its lane, so its offset on that lane is all we
+# need to describe it. A board state is every car's offset packed into one int:
+# car i lives in bits [i*shift, (i+1)*shift).
+#
+# Cars other than A with the same orientation, size and lane are
+# interchangeable, and a board whose A is on the middle row looks the same
+# upside down. Searches key their states by canonical_state so that
+# equivalent boards are only visited once.
+
+def get_layout(game: dict, locked=()) -> dict:
+    """Precompute everything the search needs that never changes between states.
+
+    Cars in locked are never moved (see analysis.get_locked_cars).
+    """
+    width, height = game['width'], game['height']
+    shift = max(width, height).bit_length()
+    layout = {
+        'width': width,
+        'height': height,
+        'shift': shift,
+        'mask': (1 << shift) - 1,
+        'count': len(game['cars']),
+        'orientations': [],
+        'sizes': [],
+        'lanes': [],     # row of a horizontal car, column of a vertical one
+        'limits': [],    # biggest offset a car can reach
+        'units': [],     # value to add to the state to move a car one cell forward
+        'cells': [],     # cells[i][off]: bitmask of cells covered by car i at offset off
+        'back': [],      # back[i][off]: bit of the cell entered when moving backward
+        'front': [],     # front[i][off]: bit of the cell entered when moving forward
+        'movable': [i for i in range(len(game['cars'])) if i not in locked],  # cars get_successors tries to move
+    }
+    for i, (pos, orientation, size) in enumerate(game['cars']):
+        x, y = pos
+        if orientation == 'h':
+            limit = width - size
+            bit = lambda off, y=y: 1 << (y * width + off)
+        else:
+            limit = height - size
+            bit = lambda off, x=x: 1 << (off * width + x)
+        cells = []
+        for off in range(limit + 1):
+            mask = 0
+            for j in range(size):
+                mask |= bit(off + j)
+            cells.append(mask)
+        layout['orientations'].append(orientation)
+        layout['sizes'].append(size)
+        layout['lanes'].append(y if orientation == 'h' else x)
+        layout['limits'].append(limit)
+        layout['units'].append(1 << (shift * i))
+        layout['cells'].append(cells)
+        layout['back'].append([bit(off - 1) if off > 0 else 0 for off in range(limit + 1)])
+        layout['front'].append([bit(off + size) if off < limit else 0 for off in range(limit + 1)])
+    layout['classes'] = get_classes(layout, locked)
+    layout['mirror'] = None if locked else get_mirror(layout)
+    layout['canonical'] = bool(layout['classes']) or layout['mirror'] is not None
+    return layout
+
+def get_classes(layout: dict, locked=()) -> list[list[int]]:
+    """Groups of interchangeable cars: same orientation, size and lane, never A or a locked car."""
+    classes = {}
+    for i in range(1, layout['count']):
+        if i not in locked:
+            classes.setdefault((layout['orientations'][i], layout['sizes'][i], layout['lanes'][i]), []).append(i)
+    return [cars for cars in classes.values() if len(cars) > 1]
+
+def get_mirror(layout: dict) -> dict | None:
+    """How to turn a state upside down, None if that changes the board (A off the middle row, a car with no counterpart).
+
+    Interchangeable cars are paired so that a state whose classes are sorted
+    stays sorted: in order between a row and its mirror, reversed in a column.
+    """
+    count, height, shift, mask = layout['count'], layout['height'], layout['shift'], layout['mask']
+    if not count or layout['orientations'][0] != 'h' or 2 * layout['lanes'][0] != height - 1:
+        return None
+    groups = {}
+    for i in range(1, count):
+        groups.setdefault((layout['orientations'][i], layout['sizes'][i], layout['lanes'][i]), []).append(i)
+    # A and the cars staying in place are done with masks, the others one by one
+    mirror = {'keep': mask, 'flip': 0, 'limits': 0, 'moves': []}
+    for (orientation, size, lane), cars in groups.items():
+        if orientation == 'h':
+            partners = groups.get(('h', size, height - 1 - lane))
+            if partners is None or len(partners) != len(cars):
+                return None
+        else:
+            partners = cars[::-1]
+        for i, j in zip(cars, partners):
+            limit = layout['limits'][i] if orientation == 'v' else None
+            if i != j:
+                mirror['moves'].append((shift * i, shift * j, limit))
+            elif limit is None:
+                mirror['keep'] |= mask << (shift * i)
+            else:
+                mirror['flip'] |= mask << (shift * i)
+                mirror['limits'] |= limit << (shift * i)
+    return mirror
+
+def pack_state(layout: dict, cars) -> int:
+    """Packs the current car positions into a single int."""
+    state = 0
+    for i, (pos, orientation, size) in enumerate(cars):
+        off = pos[0] if orientation == 'h' else pos[1]
+        state |= off << (layout['shift'] * i)
+    return state
+
+def pack_offsets(layout: dict, offsets: list[int]) -> int:
+    """Packs a list of car offsets, the reverse of unpack_state."""
+    state = 0
+    for i, off in enumerate(offsets):
+        state |= off << (layout['shift'] * i)
+    return state
+
+def unpack_state(layout: dict, state: int) -> list[int]:
+    """Returns the offset of each car on its lane."""
+    shift, mask = layout['shift'], layout['mask']
+    return [(state >> (shift * i)) & mask for i in range(layout['count'])]
+
+def sort_classes(layout: dict, offsets: list[int]) -> int:
+    """Packs offsets with each class of interchangeable cars in increasing offset order."""
+    offsets = offsets[:]
+    for cars in layout['classes']:
+        for i, off in zip(cars, sorted(offsets[i] for i in cars)):
+            offsets[i] = off
+    return pack_offsets(layout, offsets)
+
+def mirror_state(layout: dict, state: int) -> int:
+    """state turned upside down, a vertical car's offset is then counted from the bottom."""
+    mirror, mask = layout['mirror'], layout['mask']
+    # limit - off for every flipped car at once, no field can borrow from the next one
+    mirrored = state & mirror['keep'] | mirror['limits'] - (state & mirror['flip'])
+    for src, dst, limit in mirror['moves']:
+        off = state >> src & mask
+        mirrored |= (off if limit is None else limit - off) << dst
+    return mirrored
+
+def canonical_state(layout: dict, state: int) -> int:
+    """The smallest state equivalent to state, state itself when the layout has no symmetry."""
+    if not layout['canonical']:
+        return state
+    state = sort_classes(layout, unpack_state(layout, state))
+    if layout['mirror'] is not None:
+        state = min(state, mirror_state(layout, state))
+    return state
+
+def canonical_successor(layout: dict, state: int) -> int:
+    """canonical_state of a successor of a canonical state.
+
+    Cars on the same lane can't pass each other, so the classes are still
+    sorted and only the mirror is left to try.
+    """
+    if layout['mirror'] is None:
+        return state
+    return min(state, mirror_state(layout, state))
+
+def apply_state(layout: dict, game: dict, state: int):
+    """Moves every car of game to the positions described by state."""
+    for car, off in zip(game['cars'], unpack_state(layout, state)):
+        x, y = car[0]
+        car[0] = (off, y) if car[1] == 'h' else (x, off)
+    # cars were moved behind move_car's back
+    game.pop('occupancy', None)
+
+def get_successors(layout: dict, state: int):
+    """Yields (car_index, direction, next_state) for every legal single-cell move."""
+    offsets = unpack_state(layout, state)
+    cells, back, front = layout['cells'], layout['back'], layout['front']
+    occupied = 0
+    for i, off in enumerate(offsets):
+        occupied |= cells[i][off]
+    for i in layout['movable']:
+        off = offsets[i]
+        horizontal = layout['orientations'][i] == 'h'
+        if off > 0 and not occupied & back[i][off]:
+            yield i, 'LEFT' if horizontal else 'UP', state - layout['units'][i]
+        if off < layout['limits'][i] and not occupied & front[i][off]:
+            yield i, 'RIGHT' if horizontal else 'DOWN', state + layout['units'][i]
+
+def is_win_state(layout: dict, state: int) -> bool:
+    """Same rule as is_win: car A is horizontal and touches the right edge."""
+    if not layout['count'] or layout['orientations'][0] != 'h':
+        return False
+    return state & layout['mask'] == layout['limits'][0]
+
+def get_move(layout: dict, state: int, next_state: int) -> tuple[str, str]:
+    """Returns the (car letter, direction) that leads from state to next_state."""
+    diff = next_state - state
+    car_index = (abs(diff).bit_length() - 1) // layout['shift']
+    if layout['orientations'][car_index] == 'h':
+        direction = 'RIGHT' if diff > 0 else 'LEFT'
+    else:
+        direction = 'DOWN' if diff > 0 else 'UP'
+    return chr(65 + car_index), direction
+
+def get_chain(parents: dict, state: int) -> list[int]:
+    """Walks the parent links back from state, returns the states from the search's root to state."""
+    chain = [state]
+    while parents[chain[-1]] is not None:
+        chain.append(parents[chain[-1]])
+    chain.reverse()
+    return chain
+
+def get_chain_moves(layout: dict, chain: list[int], start: int = None) -> list[tuple[str, str]]:
+    """Moves following a chain of (canonical) states, played from the actual start position (the chain's first state by default)."""
+    if start is None or start == chain[0] and layout['mirror'] is None:
+        return [get_move(layout, state, next_state) for state, next_state in zip(chain, chain[1:])]
+    # two canonical states may not be one move apart, look for the move among the real ones
+    moves = []
+    state = start
+    for key in chain[1:]:
+        for car_index, direction, next_state in get_successors(layout, state):
+            if canonical_state(layout, next_state) == key:
+                moves.append((chr(65 + car_index), direction))
+                state = next_state
+                break
+    return moves
+
+def get_path(layout: dict, parents: dict, state: int, start: int = None) -> list[tuple[str, str]]:
+    """Walks the parent links back from state and returns the moves in play order from start."""
+    return get_chain_moves(layout, get_chain(parents, state), start)
+
+def search(game: dict) -> dict:
+    """Breadth-first search from the current position, returns moves and stats."""
+    start_time = time.perf_counter()
+    layout = get_layout(game)
+    start = pack_state(layout, game['cars'])
+    parents = {canonical_state(layout, start): None}
+    queue = deque(parents)
+    moves = None
+    expanded = 0
+    while queue:
+        state = queue.popleft()
+        if is_win_state(layout, state):
+            moves = get_path(layout, parents, state, start)
+            break
+        expanded += 1
+        for _, _, next_state in get_successors(layout, state):
+            if layout['mirror'] is not None:
+                next_state = canonical_successor(layout, next_state)
+            if next_state not in parents:
+                parents[next_state] = state
+                queue.append(next_state)
+    return {
+        'moves': moves,
+        'explored': len(parents),
+        'expanded': expanded,
+        'time': time.perf_counter() - start_time,
+    }
+
+# Heuristics for search_astar. Both are admissible: car A still has to cover
+# its distance to the exit, and every car counted has to move at least once.
+
+def get_owners(layout: dict, offsets: list[int]) -> list[int]:
+    """Index of the car covering each cell, -1 when empty."""
+    width = layout['width']
+    owners = [-1] * (width * layout['height'])
+    for i, off in enumerate(offsets):
+        lane, size = layout['lanes'][i], layout['sizes'][i]
+        if layout['orientations'][i] == 'h':
+            owners[lane * width + off:lane * width + off + size] = [i] * size
+        else:
+            owners[off * width + lane:(off + size) * width + lane:width] = [i] * size
+    return owners
+
+def get_blockers(layout: dict, offsets: list[int], owners: list[int]) -> list[int]:
+    """Cars standing between car A and the exit, in order."""
+    width = layout['width']
+    row = layout['lanes'][0] * width
+    blockers = []
+    for cell in range(row + offsets[0] + layout['sizes'][0], row + width):
+        if owners[cell] >= 0 and owners[cell] not in blockers:
+            blockers.append(owners[cell])
+    return blockers
+
+def get_escape_blockers(layout: dict, offsets: list[int], owners: list[int], car_index: int) -> set[int]:
+    """Cars that must move for a (vertical) car to leave car A's row, whichever way it goes."""
+    if layout['orientations'][car_index] == 'h':
+        return set()
+    width, height = layout['width'], layout['height']
+    lane, size, off = layout['lanes'][car_index], layout['sizes'][car_index], offsets[car_index]
+    row = layout['lanes'][0]
+    ways = []
+    # up: its last cell ends right above the row, down: its first cell right below
+    if row - size >= 0:
+        ways.append({owners[y * width + lane] for y in range(row - size, off)})
+    if row + 1 + size <= height:
+        ways.append({owners[y * width + lane] for y in range(off + size, row + 1 + size)})
+    if not ways:
+        return set()
+    return set.intersection(*ways) - {-1}
+
+def heuristic_blockers(layout: dict, state: int) -> int:
+    """Distance of car A to the exit plus the number of cars in its way."""
+    if not layout['count'] or layout['orientations'][0] != 'h':
+        return 0
+    offsets = unpack_state(layout, state)
+    blockers = get_blockers(layout, offsets, get_owners(layout, offsets))
+    return layout['limits'][0] - offsets[0] + len(blockers)
+
+def heuristic_blocker_chains(layout: dict, state: int) -> int:
+    """heuristic_blockers plus the cars that must move to let each blocker out of the way."""
+    if not layout['count'] or layout['orientations'][0] != 'h':
+        return 0
+    offsets = unpack_state(layout, state)
+    owners = get_owners(layout, offsets)
+    blockers = get_blockers(layout, offsets, owners)
+    second = set()
+    for car_index in blockers:
+        second |= get_escape_blockers(layout, offsets, owners, car_index)
+    return layout['limits'][0] - offsets[0] + len(blockers) + len(second.difference(blockers))
+
+HEURISTICS = {
+    'blockers': heuristic_blockers,
+    'chains': heuristic_blocker_chains,
+}
+
+def search_astar(game: dict, heuristic: str = 'chains', max_cost: int = None, max_expanded: int = None, locked=()) -> dict:
+    """A* search from the current position, same result as search with fewer states expanded.
+
+    With max_cost, only solutions of at most max_cost moves are looked for
+    and states that can't reach a win in time are never pushed. Cars in
+    locked are never tried (see analysis.get_locked_cars). 'complete' is
+    False when the search stopped after max_expanded states without an answer.
+    """
+    start_time = time.perf_counter()
+    layout = get_layout(game, locked)
+    estimate = HEURISTICS[heuristic]
+    start = pack_state(layout, game['cars'])
+    root = canonical_state(layout, start)
+    parents = {root: None}
+    costs = {root: 0}
+    heap = [(estimate(layout, root), 0, root)]
+    if max_cost is not None and heap[0][0] > max_cost:
+        heap = []
+    moves = None
+    expanded = 0
+    complete = True
+    while heap:
+        _, cost, state = heapq.heappop(heap)
+        if cost > costs[state]:
+            continue  # reached again with a lower cost since it was pushed
+        if is_win_state(layout, state):
+            moves = get_path(layout, parents, state, start)
+            break
+        if max_expanded is not None and expanded >= max_expanded:
+            complete = False
+            break
+        expanded += 1
+        cost += 1
+        for _, _, next_state in get_successors(layout, state):
+            if layout['mirror'] is not None:
+                next_state = canonical_successor(layout, next_state)
+            # the heuristics are not consistent, a state can be found again with a lower cost
+            if cost < costs.get(next_state, cost + 1):
+                total = cost + estimate(layout, next_state)
+                if max_cost is not None and total > max_cost:
+                    continue
+                costs[next_state] = cost
+                parents[next_state] = state
+                heapq.heappush(heap, (total, cost, next_state))
+    return {
+        'moves': moves,
+        'explored': len(parents),
+        'expanded': expanded,
+        'complete': complete,
+        'time': time.perf_counter() - start_time,
+    }
+
+def get_winning_states(layout: dict, max_states: int = None) -> list[int] | None:
+    """Every position where car A is at the exit and no cars overlap, reachable or not.
+
+    None when there are more than max_states of them.
+    """
+    if not layout['count'] or layout['orientations'][0] != 'h':
+        return []
+    cells, units = layout['cells'], layout['units']
+    states = []
+    # place the cars one by one, skipping offsets that overlap the cars already placed
+    stack = [(1, cells[0][layout['limits'][0]], layout['limits'][0] * units[0])]
+    while stack:
+        i, occupied, state = stack.pop()
+        if i == layout['count']:
+            states.append(state)
+            if max_states is not None and len(states) > max_states:
+                return None
+            continue
+        for off in range(layout['limits'][i] + 1):
+            if not occupied & cells[i][off]:
+                stack.append((i + 1, occupied | cells[i][off], state + off * units[i]))
+    return states
+
+def search_bidirectional(game: dict, max_winning_states: int = 100_000) -> dict:
+    """Breadth-first search from the current position and from every winning position at once.
+
+    Boards with more than max_winning_states winning positions (many small
+    cars far from A) fall back to search.
+    """
+    start_time = time.perf_counter()
+    layout = get_layout(game)
+    start = pack_state(layout, game['cars'])
+    wins = get_winning_states(layout, max_winning_states)
+    if wins is None:
+        return search(game)
+    root = canonical_state(layout, start)
+    # forward parents point toward the start, backward ones toward a win
+    forward, backward = {root: None}, dict.fromkeys(canonical_state(layout, state) for state in wins)
+    forward_frontier, backward_frontier = [root], list(backward)
+    expanded = 0
+    meeting = root if root in backward else None
+    best = None
+    # a whole level is expanded before checking, the shortest meeting may not be the first one
+    while meeting is None and forward_frontier and backward_frontier:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parents, others = forward_frontier, forward, backward
+        else:
+            frontier, parents, others = backward_frontier, backward, forward
+        next_frontier = []
+        for state in frontier:
+            # the game stops on a win, paths never go through one
+            if expand_forward and is_win_state(layout, state):
+                continue
+            expanded += 1
+            for _, _, next_state in get_successors(layout, state):
+                if layout['mirror'] is not None:
+                    next_state = canonical_successor(layout, next_state)
+                if next_state in parents:
+                    continue
+                parents[next_state] = state
+                next_frontier.append(next_state)
+                if next_state in others:
+                    length = get_depth(forward, next_state) + get_depth(backward, next_state)
+                    if best is None or length < best:
+                        meeting, best = next_state, length
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    moves = None
+    if meeting is not None:
+        chain = get_chain(forward, meeting) + get_chain(backward, meeting)[-2::-1]
+        moves = get_chain_moves(layout, chain, start)
+    return {
+        'moves': moves,
+        'explored': len(forward) + len(backward),
+        'expanded': expanded,
+        'time': time.perf_counter() - start_time,
+    }
+
+def get_depth(parents: dict, state: int) -> int:
+    """Number of parent links from state back to its search's root."""
+    depth = 0
+    while parents[state] is not None:
+        state = parents[state]
+        depth += 1
+    return depth
+
+STRATEGIES = {
+    'bfs': search,
+    'astar': search_astar,
+    'bidirectional': search_bidirectional,
+}
+
+def solve(game: dict, strategy: str = 'bfs') -> list[tuple[str, str]] | None:
+    """Returns a shortest list of (car letter, direction) moves, None if unsolvable."""
+    return STRATEGIES[strategy](game)['moves']
+
+def get_solution_str(moves: list[tuple[str, str]] | None) -> str:
+    """Return a printable version of a solution."""
+    if moves is None:
+        return "No solution found."
+    lines = [f"Solution in {len(moves)} moves:"]
+    for i, (letter, direction) in enumerate(moves):
+        lines.append(f"{i + 1:>4}. {letter} {direction}")
+    return "\n".join(lines)
+
+def get_reachable_states(layout: dict, start: int, max_states: int = None) -> set[int] | None:
+    """Every (canonical) state reachable from start, winning states are not expanded (the game stops there).
+
+    None when there are more than max_states of them.
+    """
+    seen = {canonical_state(layout, start)}
+    queue = deque(seen)
+    while queue:
+        state = queue.popleft()
+        if is_win_state(layout, state):
+            continue
+        for _, _, next_state in get_successors(layout, state):
+            if layout['mirror'] is not None:
+                next_state = canonical_successor(layout, next_state)
+            if next_state not in seen:
+                seen.add(next_state)
+                queue.append(next_state)
+        if max_states is not None and len(seen) > max_states:
+            return None
+    return seen
+
+def get_distance_table(layout: dict, start: int, max_states: int = None) -> dict[int, int] | None:
+    """Moves to the closest win for every reachable state that can still win (retrograde BFS), keyed by canonical state.
+
+    None when more than max_states states are reachable.
+    """
+    reachable = get_reachable_states(layout, start, max_states)
+    if reachable is None:
+        return None
+    # every move can be undone, so searching backward is searching forward from the wins
+    wins = [state for state in reachable if is_win_state(layout, state)]
+    distances = dict.fromkeys(wins, 0)
+    queue = deque(wins)
+    while queue:
+        state = queue.popleft()
+        distance = distances[state] + 1
+        for _, _, next_state in get_successors(layout, state):
+            if layout['mirror'] is not None:
+                next_state = canonical_successor(layout, next_state)
+            if next_state in reachable and next_state not in distances:
+                distances[next_state] = distance
+                queue.append(next_state)
+    return distances
+
+def get_best_move(layout: dict, distances: dict, state: int) -> tuple[str, str] | None:
+    """Return an optimal (car letter, direction) from state, None if won or unsolvable."""
+    distance = distances.get(canonical_state(layout, state))
+    if not distance:
+        return None
+    for car_index, direction, next_state in get_successors(layout, state):
+        if distances.get(canonical_state(layout, next_state)) == distance - 1:
+            return chr(65 + car_index), direction
+    return None
@@ -0,0 +1,133 @@
+from copy import deepcopy
+import unittest
+from unittest.mock import patch
+
+from ulbloque import *
+from solver import search, search_astar
+from analysis import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+LOCKED_GAME_GAME = {
+    'width': 7,
+    'height': 4,
+    'max_moves': 20,
+    'cars': (
+        [(0, 1), 'h', 2],  # Voiture A
+        [(3, 0), 'v', 2],  # Voiture B, tient toute la colonne avec C
+        [(3, 2), 'v', 2],  # Voiture C
+        [(4, 3), 'h', 2],  # Voiture D, coincée entre C et E
+        [(6, 0), 'v', 4],  # Voiture E, toute la colonne
+        [(5, 0), 'v', 2],  # Voiture F, peut descendre d'une case
+    )
+}
+
+PRUNED_GAME_GAME = {
+    'width': 6,
+    'height': 5,
+    'max_moves': 20,
+    'cars': (
+        [(0, 1), 'h', 2],  # Voiture A
+        [(0, 4), 'h', 3],  # Voiture B, la dernière ligne est pleine
+        [(3, 4), 'h', 3],  # Voiture C
+        [(3, 0), 'v', 2],  # Voiture D, doit descendre de deux cases
+    )
+}
+
+
+def start_hint_table_now(game: dict) -> dict:
+    """start_hint_table, but waits for the table to be ready"""
+    hints = start_hint_table(game)
+    hints['thread'].join()
+    return hints
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_locked_cars(self):
+        self.assertListEqual(get_locked_cars(deepcopy(TEST_GAME_GAME)), [])
+        self.assertListEqual(get_locked_cars(deepcopy(LOCKED_GAME_GAME)), [1, 2, 3, 4])
+
+    def test_exit_blockers(self):
+        game = deepcopy(LOCKED_GAME_GAME)
+        self.assertListEqual(get_exit_blockers(game, get_locked_cars(game)), [1, 4], "B et E sont bloquées sur la ligne de A")
+        game = deepcopy(TEST_GAME_GAME)
+        game['cars'] = [[(0, 2), 'h', 2], [(3, 2), 'h', 2], [(5, 0), 'v', 6]]
+        self.assertListEqual(get_exit_blockers(game, get_locked_cars(game)), [1, 2])
+        self.assertListEqual(get_exit_blockers(deepcopy(TEST_GAME_GAME), []), [])
+
+    def test_analyse_game(self):
+        analysis = analyse_game(deepcopy(TEST_GAME_GAME))
+        self.assertTrue(analysis['winnable'])
+        self.assertEqual(analysis['optimal'], 18)
+        game = deepcopy(TEST_GAME_GAME)
+        game['max_moves'] = 17
+        analysis = analyse_game(game)
+        self.assertFalse(analysis['winnable'], "Pas de solution en 17 coups")
+        self.assertLess(analysis['explored'], search(game)['explored'], "La recherche bornée doit explorer moins")
+        self.assertIsNone(analyse_game(deepcopy(TEST_GAME_GAME), max_expanded=10)['winnable'])
+        self.assertFalse(analyse_game(deepcopy(LOCKED_GAME_GAME))['winnable'])
+
+    def test_locked_cars_pruned(self):
+        game = deepcopy(PRUNED_GAME_GAME)
+        locked = get_locked_cars(game)
+        self.assertListEqual(locked, [1, 2])
+        pruned = search_astar(game, locked=locked)
+        self.assertEqual(len(pruned['moves']), 6)
+        self.assertEqual(analyse_game(game)['optimal'], 6)
+
+    def test_play_game_warning(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['max_moves'] = 19
+        with patch('ulbloque.start_hint_table', start_hint_table_now), patch('ulbloque.getkey', side_effect=['D', 'DOWN', 'UP', 'ESCAPE']), patch('builtins.print') as mock_print:
+            play_game(game)
+        output = "".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertIn("Can't win in the 17 moves left (18 needed)", output)
+        self.assertNotIn("18 moves left", output, "Après un coup, la partie peut encore être gagnée")
+        game = deepcopy(LOCKED_GAME_GAME)
+        with patch('ulbloque.start_hint_table', start_hint_table_now), patch('ulbloque.getkey', side_effect=['ESCAPE']), patch('builtins.print') as mock_print:
+            play_game(game)
+        output = "".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertIn("can't be won: B, E", output)
+        self.assertNotIn("No way to win from here", output, "L'avertissement du plateau suffit")
+
+    def test_play_game_start_warning(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['max_moves'] = 10
+        with patch('ulbloque.start_hint_table', start_hint_table_now), patch('ulbloque.getkey', side_effect=['A', 'B', 'ESCAPE']), patch('builtins.print') as mock_print:
+            play_game(game)
+        output = "".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertEqual(output.count("Can't win in the 10 moves left (18 needed)"), 1, "Dès le départ, une seule fois")
+        # table prête seulement après la première touche
+        game = deepcopy(TEST_GAME_GAME)
+        game['max_moves'] = 10
+        hints = {'distances': None}
+        def ready_after_first_key(*keys):
+            keys = iter(keys)
+            def getkey():
+                key = next(keys)
+                hints.update(start_hint_table_now(game))
+                return key
+            return getkey
+        with patch('ulbloque.start_hint_table', return_value=hints), patch('ulbloque.getkey', ready_after_first_key('A', 'ESCAPE')), patch('builtins.print') as mock_print:
+            play_game(game)
+        output = "".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertIn("Can't win in the 10 moves left (18 needed)", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
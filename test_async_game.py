@@ -0,0 +1,81 @@
+import asyncio
+from copy import deepcopy
+import io
+import os
+import unittest
+from unittest.mock import patch
+
+try:
+    import pty
+    import termios
+except ImportError:  # Windows
+    pty = None
+
+from ulbloque import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+@unittest.skipIf(pty is None, "pas de terminal virtuel")
+class TestAsyncGame(unittest.TestCase):
+    def play(self, game: dict, chunks: list[bytes]) -> tuple[int, str]:
+        """Plays game with chunks typed one by one in a virtual terminal, returns the outcome and the output"""
+        from async_game import play_game_async
+        master, slave = os.openpty()
+        output = io.StringIO()
+
+        async def type_keys():
+            for chunk in chunks:
+                await asyncio.sleep(0.05)
+                os.write(master, chunk)
+
+        async def main():
+            typing = asyncio.create_task(type_keys())
+            result = await play_game_async(game, tick=0.01)
+            await typing
+            return result
+
+        try:
+            with open(slave, 'r', closefd=False) as stdin, patch('sys.stdin', stdin), \
+                    patch('builtins.print', lambda *args, end="\n", **kwargs: output.write(" ".join(map(str, args)) + end)):
+                before = termios.tcgetattr(slave)
+                result = asyncio.run(main())
+                self.assertEqual(termios.tcgetattr(slave), before, "Le terminal doit être restauré")
+        finally:
+            os.close(master)
+            os.close(slave)
+        return result, output.getvalue()
+
+    def test_moves_and_escape(self):
+        game = deepcopy(TEST_GAME_GAME)
+        result, output = self.play(game, [b'd', b'\x1b[B', b'e\x1b[1;2D', b'\x1b'])
+        self.assertEqual(result, 2)
+        self.assertTupleEqual(game['cars'][3][0], (0, 4), "D doit être descendue")
+        self.assertTupleEqual(game['cars'][4][0], (0, 3), "E doit avoir glissé jusqu'au bord")
+        self.assertIn("Time: 0:00", output, "La ligne d'état doit être affichée sans attendre de touche")
+
+    def test_win(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['cars'] = [[(3, 2), 'h', 2]]
+        result, output = self.play(game, [b'A', b'\x1b[C'])
+        self.assertEqual(result, 0)
+        self.assertIn("won in 1 moves", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+from copy import deepcopy
+import random
+import unittest
+
+from ulbloque import *
+from solver import get_layout, pack_state, get_successors, solve
+from generator import random_game
+from batch import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+def get_random_games(count, seed=0):
+    rng = random.Random(seed)
+    games = [deepcopy(TEST_GAME_GAME)]
+    while len(games) < count:
+        game = random_game(rng, 6, 6, rng.randrange(2, 12))
+        if game is not None:
+            games.append(game)
+    return games
+
+
+@unittest.skipIf(np is None, "numpy n'est pas installé")
+class TestBatch(unittest.TestCase):
+    def test_occupancy(self):
+        games = get_random_games(50)
+        occupancy = get_occupancy_tensor(new_batch(games))
+        for n, game in enumerate(games):
+            self.assertEqual(bytes(occupancy[n].astype(np.uint8)), bytes(build_occupancy(game)), f"occupation du plateau {n} incorrecte")
+
+    def test_legal_moves_match_move_car(self):
+        games = get_random_games(200)
+        mask = get_legal_moves(new_batch(games))
+        for n, game in enumerate(games):
+            for i in range(mask.shape[1]):
+                for d, direction in enumerate(DIRECTIONS):
+                    expected = i < len(game['cars']) and move_car(deepcopy(game), i, direction)
+                    self.assertEqual(bool(mask[n, i, d]), expected, f"plateau {n}, voiture {i}, {direction}")
+
+    def test_apply_moves(self):
+        games = get_random_games(20)
+        batch = new_batch(games)
+        boards, cars, directions = np.nonzero(get_legal_moves(batch))
+        moved = get_batch_games(apply_moves(batch, boards, cars, directions))
+        for k in range(len(boards)):
+            game = deepcopy(games[boards[k]])
+            move_car(game, int(cars[k]), DIRECTIONS[directions[k]])
+            self.assertEqual(moved[k]['cars'], [list(car) for car in game['cars']], f"mouvement {k} mal appliqué")
+
+    def test_winning_boards(self):
+        game = deepcopy(TEST_GAME_GAME)
+        won = deepcopy(game)
+        won['cars'] = [[(4, 2), 'h', 2]]
+        self.assertListEqual(get_winning_boards(new_batch([game, won])).tolist(), [False, True])
+
+    def test_expand_states(self):
+        game = parse_game('game1.txt')
+        layout = get_layout(game)
+        states = [pack_state(layout, game['cars'])]
+        for _ in range(3):
+            states += [next_state for state in states for _, _, next_state in get_successors(layout, state)]
+        states = sorted(set(states))
+        parents, cars, directions, next_states = expand_states(layout, states)
+        expected = sorted((states.index(state), i, DIRECTIONS.index(d), s) for state in states for i, d, s in get_successors(layout, state))
+        found = sorted(zip(parents.tolist(), cars.tolist(), directions.tolist(), next_states.tolist()))
+        self.assertListEqual(found, expected)
+
+    def test_optimal_length(self):
+        for name in ['game1.txt', 'game2.txt', 'game3.txt']:
+            game = parse_game(name)
+            self.assertEqual(get_batch_optimal_length(game), len(solve(game)), f"longueur optimale de {name} incorrecte")
+        game = deepcopy(TEST_GAME_GAME)
+        game['cars'] = [[(0, 2), 'h', 2], [(3, 0), 'v', 6]]
+        self.assertIsNone(get_batch_optimal_length(game), "le plateau est insoluble")
+
+
+if __name__ == '__main__':
+    unittest.main()
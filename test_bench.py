@@ -0,0 +1,69 @@
+from copy import deepcopy
+import tempfile
+import unittest
+
+from ulbloque import *
+from bench import time_op, find_moves, compare_results, run_suite, get_suite_boards, BOARD_SIZES
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+class TestBench(unittest.TestCase):
+    def test_time_op(self):
+        stats = time_op(lambda: None, calls=2, repeat=3, min_time=0.001)
+        self.assertGreater(stats['ops'], 0)
+        self.assertGreaterEqual(stats['stdev'], 0)
+        self.assertGreaterEqual(stats['loops'], 1)
+
+    def test_find_moves(self):
+        game = deepcopy(TEST_GAME_GAME)
+        legal, back, blocked = find_moves(game)
+        self.assertEqual(game['cars'], TEST_GAME_GAME['cars'], "find_moves ne doit pas déplacer les voitures")
+        self.assertTrue(move_car(game, *legal))
+        self.assertTrue(move_car(game, *back))
+        self.assertFalse(move_car(game, *blocked))
+
+    def test_compare_results(self):
+        baseline = {'game1.txt': {'is_win': {'ops': 100.0}, 'solve': {'ops': 10.0}}}
+        results = {'game1.txt': {'is_win': {'ops': 95.0}, 'solve': {'ops': 8.0}, 'parse_game': {'ops': 1.0}}}
+        regressions = compare_results(results, baseline, 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0][:2], ('game1.txt', 'solve'))
+
+    def test_run_suite(self):
+        rows = list(run_suite(['game2.txt'], [(6, 10)], repeat=2, min_time=0.001))
+        self.assertEqual({name for name, _, _ in rows}, {'game2.txt', '6x6/10'})
+        self.assertIn('move_car_blocked', {op for _, op, _ in rows})
+
+    def test_suite_boards(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, path, _ in get_suite_boards(directory, [], BOARD_SIZES + [(20, 90)]):
+                car_count = int(name.split('/')[1])
+                self.assertLessEqual(car_count, MAX_CARS)
+                self.assertEqual(len(parse_game(path)['cars']), car_count, f"{name} relu avec un autre nombre de voitures")
+
+    def test_too_many_cars(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['width'] = 30
+        game['cars'] = [[(0, 2), 'h', 2]] + [[(2 + i, 0), 'v', 2] for i in range(26)]
+        with self.assertRaises(ValueError):
+            get_game_file_str(game)
+
+
+if __name__ == '__main__':
+    unittest.main()
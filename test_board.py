@@ -0,0 +1,65 @@
+from copy import deepcopy
+import random
+import unittest
+
+from ulbloque import *
+from board import Board
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+class TestBoard(unittest.TestCase):
+    def test_round_trip(self):
+        for name in ['game1.txt', 'game2.txt', 'game3.txt']:
+            game = parse_game(name)
+            self.assertEqual(Board.from_game(game).to_game(), game, f"{name} n'est pas reconstruit à l'identique")
+
+    def test_occupancy(self):
+        game = deepcopy(TEST_GAME_GAME)
+        self.assertEqual(Board.from_game(game).occupancy, build_occupancy(game))
+
+    def test_same_moves_as_move_car(self):
+        rng = random.Random(7)
+        game = deepcopy(TEST_GAME_GAME)
+        board = Board.from_game(game)
+        for _ in range(2000):
+            car_index = rng.randrange(-1, len(game['cars']) + 1)
+            direction = rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+            distance = rng.choice([1, 1, 1, 2, 3])
+            self.assertEqual(board.move(car_index, direction, distance), move_car(game, car_index, direction, distance))
+            self.assertEqual(board.is_win(), is_win(game))
+        self.assertListEqual(board.to_game()['cars'], list(game['cars']))
+        self.assertEqual(board.occupancy, game['occupancy'])
+
+    def test_clone(self):
+        board = Board.from_game(deepcopy(TEST_GAME_GAME))
+        clone = board.clone()
+        self.assertTrue(clone.move(1, 'DOWN'))
+        self.assertTupleEqual(board.get_pos(1), (2, 0), "Le clone partage ses positions avec l'original")
+        self.assertTupleEqual(clone.get_pos(1), (2, 1))
+        self.assertNotEqual(board.key(), clone.key())
+        self.assertNotEqual(board.occupancy, clone.occupancy)
+
+    def test_is_win(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['cars'][0][0] = (4, 2)
+        self.assertTrue(Board.from_game(game).is_win())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+from copy import deepcopy
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ulbloque import *
+from cache import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, CACHE_FILE_NAME)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fingerprint(self):
+        game = deepcopy(TEST_GAME_GAME)
+        fingerprint = get_game_fingerprint(game)
+        self.assertEqual(fingerprint, get_game_fingerprint(deepcopy(TEST_GAME_GAME)))
+        move_car(game, 1, 'DOWN')
+        self.assertNotEqual(fingerprint, get_game_fingerprint(game), "Deux positions différentes ont la même empreinte")
+
+    def test_equivalent_fingerprint(self):
+        game = deepcopy(TEST_GAME_GAME)
+        reordered = deepcopy(TEST_GAME_GAME)
+        reordered['cars'] = reordered['cars'][:1] + reordered['cars'][:0:-1]
+        self.assertEqual(get_game_fingerprint(game), get_game_fingerprint(reordered), "L'ordre des voitures ne compte pas")
+        with SolutionCache() as cache:
+            moves = solve_cached(game, cache)
+            result = search_cached(reordered, cache)
+        self.assertTrue(result['cached'])
+        self.assertEqual(len(result['moves']), len(moves))
+        for letter, direction in result['moves']:
+            self.assertTrue(move_car(reordered, ord(letter) - ord('A'), direction), "Les coups doivent être ceux de la partie réordonnée")
+        self.assertTrue(is_win(reordered))
+
+    def test_every_position_of_the_solution_is_stored(self):
+        game = deepcopy(TEST_GAME_GAME)
+        with SolutionCache() as cache:
+            moves = solve_cached(game, cache)
+            self.assertEqual(len(cache.entries), len(moves) + 1)
+            letter, direction = moves[0]
+            move_car(game, ord(letter) - ord('A'), direction)
+            result = search_cached(game, cache)
+            self.assertTrue(result['cached'], "La position suivante aurait dû être en cache")
+            self.assertListEqual(result['moves'], moves[1:])
+            self.assertTupleEqual(get_hint(game, cache), moves[1])
+
+    def test_unsolvable(self):
+        game = {'width': 4, 'height': 3, 'max_moves': 10, 'cars': ([(0, 1), 'h', 2], [(2, 0), 'v', 3])}
+        with SolutionCache() as cache:
+            self.assertIsNone(solve_cached(game, cache))
+            self.assertTrue(search_cached(game, cache)['cached'])
+            self.assertIsNone(get_hint(game, cache))
+
+    def test_lru_cap(self):
+        with SolutionCache(max_entries=5) as cache:
+            solve_cached(deepcopy(TEST_GAME_GAME), cache)
+            self.assertEqual(len(cache.entries), 5)
+            # sans disque, les premières positions sont perdues
+            self.assertFalse(search_cached(deepcopy(TEST_GAME_GAME), cache)['cached'])
+
+    def test_disk_tier(self):
+        with SolutionCache(self.path) as cache:
+            moves = solve_cached(deepcopy(TEST_GAME_GAME), cache)
+        with SolutionCache(self.path, max_entries=5) as cache, patch('cache.search') as mock_search:
+            result = search_cached(deepcopy(TEST_GAME_GAME), cache)
+            mock_search.assert_not_called()
+        self.assertListEqual(result['moves'], moves)
+
+
+if __name__ == '__main__':
+    unittest.main()
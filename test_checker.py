@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import checker
+from checker import *
+
+
+class TestChecker(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ['game1.txt', 'game2.txt', 'game3.txt']:
+            shutil.copy(name, self.directory)
+        with open(os.path.join(self.directory, 'game4.txt'), 'w') as f:
+            # game2 avec un max_moves trop petit
+            f.write(open('game2.txt').read().rsplit('\n', 2)[0] + '\n10\n')
+        with open(os.path.join(self.directory, 'notes.txt'), 'w') as f:
+            f.write("pas un niveau")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_find_levels(self):
+        names = [os.path.basename(path) for path in find_levels(self.directory)]
+        self.assertListEqual(names, ['game1.txt', 'game2.txt', 'game3.txt', 'game4.txt'])
+
+    def test_check_level(self):
+        row = check_level(os.path.join(self.directory, 'game1.txt'))
+        self.assertEqual(row['status'], 'ok')
+        self.assertEqual(row['optimal'], 18)
+        self.assertEqual(row['max_moves'], 40)
+        self.assertGreater(row['explored'], 0)
+        self.assertEqual(check_level(os.path.join(self.directory, 'game4.txt'))['status'], 'too_long')
+        self.assertTrue(check_level(os.path.join(self.directory, 'notes.txt'))['status'].startswith('error'))
+
+    def test_parallel_same_as_serial(self):
+        serial = sorted((row['file'], row['optimal']) for row in iter_checks(find_levels(self.directory)))
+        parallel = sorted((row['file'], row['optimal']) for row in iter_checks(find_levels(self.directory), jobs=2, chunksize=1))
+        self.assertListEqual(serial, parallel)
+
+    def test_pack(self):
+        pack = os.path.join(self.directory, 'pack.txt')
+        with open(pack, 'w') as f:
+            for name in ['game1.txt', 'game2.txt', 'game3.txt'] * 5:
+                f.write(open(name).read())
+        serial = list(iter_pack_checks(pack))
+        self.assertEqual(len(serial), 15)
+        self.assertEqual(serial[1]['file'], pack + ":2")
+        self.assertListEqual([row['optimal'] for row in serial[:3]], [18, 15, 19])
+        parallel = list(iter_pack_checks(pack, jobs=2, chunksize=1))
+        self.assertListEqual(sorted(row['file'] for row in parallel), sorted(row['file'] for row in serial))
+
+    def test_pack_with_bad_game(self):
+        pack = os.path.join(self.directory, 'pack.txt')
+        with open(pack, 'w') as f:
+            f.write(open('game1.txt').read() + "+---+\n|AA.|\n|.B..\n+---+\n5\n" + open('game2.txt').read())
+        for jobs in [1, 2]:
+            rows = sorted(iter_pack_checks(pack, jobs, chunksize=1), key=lambda row: row['file'])
+            self.assertListEqual([row['status'] for row in rows], ['ok', 'error: car B is a single cell', 'ok'])
+            self.assertEqual(rows[1]['file'], pack + ":2")
+
+    def test_one_cache_per_process(self):
+        with patch('checker.SolutionCache', wraps=SolutionCache) as mock_cache:
+            rows = list(iter_checks(find_levels(self.directory), use_cache=True))
+            self.assertEqual(mock_cache.call_count, 1, "Un seul cache pour tous les niveaux")
+            self.assertFalse(rows[0]['cached'])
+            # game4 est game2 avec un autre max_moves : déjà dans la mémoire du cache
+            self.assertTrue(rows[3]['cached'])
+        self.assertDictEqual(checker._caches, {}, "Les caches sont fermés à la fin")
+        parallel = list(iter_checks(find_levels(self.directory), jobs=2, chunksize=1, use_cache=True))
+        self.assertTrue(all(row['cached'] for row in parallel if row['optimal'] is not None), "Tout est déjà sur disque")
+
+    def test_write_report(self):
+        rows = list(iter_checks(find_levels(self.directory)))
+        out = io.StringIO()
+        counts = write_report(rows, out, 'json')
+        self.assertDictEqual(counts, {'ok': 3, 'too_long': 1})
+        self.assertEqual(len(json.loads(out.getvalue())), 4)
+        out = io.StringIO()
+        write_report(rows, out, 'csv')
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
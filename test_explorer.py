@@ -0,0 +1,99 @@
+from copy import deepcopy
+import os
+import tempfile
+import unittest
+
+from ulbloque import *
+from solver import get_layout, pack_state, get_distance_table
+from explorer import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+SYMMETRIC_GAME_GAME = {
+    'width': 6,
+    'height': 5,
+    'max_moves': 30,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A, sur la ligne du milieu
+        [(2, 3), 'v', 2],  # Voiture B, interchangeable avec C
+        [(2, 0), 'v', 2],  # Voiture C
+        [(3, 0), 'h', 2],  # Voiture D, symétrique de E
+        [(3, 4), 'h', 2],  # Voiture E
+        [(4, 2), 'v', 2],  # Voiture F
+    )
+}
+
+
+class TestExplorer(unittest.TestCase):
+    def test_explore(self):
+        stats = explore(deepcopy(TEST_GAME_GAME))
+        self.assertEqual(stats['states'], 3950)
+        self.assertEqual(stats['winning_states'], 306)
+        self.assertEqual(stats['start_distance'], 18)
+        self.assertEqual(stats['hardest_distance'], 26)
+        self.assertGreaterEqual(stats['diameter'], stats['hardest_distance'])
+
+    def test_hardest_state(self):
+        game = deepcopy(TEST_GAME_GAME)
+        stats = explore(game)
+        layout = stats['layout']
+        # la position la plus difficile est atteignable et à la bonne distance
+        distances = get_distance_table(layout, pack_state(layout, game['cars']))
+        self.assertEqual(distances[stats['hardest_state']], stats['hardest_distance'])
+
+    def test_equivalent_states(self):
+        game = deepcopy(SYMMETRIC_GAME_GAME)
+        stats = explore(game)
+        self.assertEqual(stats['states'], 114)
+        self.assertIsNone(stats['raw_states'], "Pas de deuxième énumération sans raw_count")
+        self.assertNotIn("before merging", get_exploration_str(game, stats))
+        stats = explore(game, raw_count=True)
+        self.assertEqual(stats['raw_states'], 228, "Une position et son symétrique comptent pour une")
+        self.assertEqual(stats['start_distance'], 10)
+        self.assertIn("228 before merging", get_exploration_str(game, stats))
+        self.assertEqual(explore(deepcopy(TEST_GAME_GAME))['raw_states'], 3950)
+
+    def test_single_state(self):
+        game = {'width': 4, 'height': 3, 'max_moves': 10, 'cars': ([(0, 1), 'h', 2], [(2, 0), 'v', 3])}
+        stats = explore(game)
+        self.assertEqual(stats['states'], 1)
+        self.assertEqual(stats['winning_states'], 0)
+        self.assertIsNone(stats['start_distance'])
+        self.assertEqual(stats['diameter'], 0)
+        self.assertIn("unsolvable", get_exploration_str(game, stats))
+
+    def test_graph_file(self):
+        game = parse_game('game2.txt')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game2.graph')
+            stats = explore(game, path)
+            graph = read_graph(path)
+        layout = get_layout(game)
+        self.assertEqual(len(graph['states']), stats['states'])
+        self.assertEqual(len(graph['targets']), stats['edges'])
+        self.assertListEqual(graph['states'], sorted(graph['states']))
+        # chaque arête correspond à un mouvement légal, dans les deux sens
+        for index in range(len(graph['states'])):
+            neighbours = graph['targets'][graph['offsets'][index]:graph['offsets'][index + 1]]
+            for next_index in neighbours:
+                back = graph['targets'][graph['offsets'][next_index]:graph['offsets'][next_index + 1]]
+                self.assertIn(index, back)
+
+
+if __name__ == '__main__':
+    unittest.main()
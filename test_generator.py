@@ -0,0 +1,49 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from ulbloque import *
+from solver import search
+from generator import *
+
+
+class TestGenerator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_random_game(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            game = random_game(rng, 6, 6, 10)
+            self.assertEqual(len(game['cars']), 10)
+            self.assertFalse(is_win(game), "Le plateau généré ne doit pas être déjà gagné")
+            cells = [cell for car in game['cars'] for cell in get_car_cells(*car)]
+            self.assertEqual(len(cells), len(set(cells)), "Deux voitures se chevauchent")
+
+    def test_random_game_does_not_fit(self):
+        self.assertIsNone(random_game(random.Random(1), 4, 4, 20))
+
+    def test_optimal_length(self):
+        game = parse_game('game1.txt')
+        self.assertEqual(get_optimal_length(game, 10, 100_000), 18)
+        self.assertIsNone(get_optimal_length(game, 19, 100_000), "La solution est plus courte que demandé")
+        self.assertIsNone(get_optimal_length(game, 10, 100), "La limite d'états n'est pas respectée")
+
+    def test_generate(self):
+        paths = list(generate(self.directory, 3, min_length=8, seed=4, batch_size=10))
+        self.assertEqual(len(paths), 3)
+        for path, length in paths:
+            self.assertTrue(os.path.isfile(path))
+            game = parse_game(path)
+            self.assertGreaterEqual(length, 8)
+            self.assertEqual(len(search(game)['moves']), length)
+            self.assertGreaterEqual(game['max_moves'], length)
+
+
+if __name__ == '__main__':
+    unittest.main()
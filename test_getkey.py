@@ -0,0 +1,76 @@
+import asyncio
+import io
+import os
+import unittest
+
+from getkey import *
+
+
+def decode_all(text: str) -> list[str]:
+    """Every key of text, decode_key called until nothing is left"""
+    stream = io.StringIO(text)
+    keys = []
+    while stream.tell() < len(text):
+        keys.append(decode_key(stream.read))
+    return keys
+
+
+class TestDecodeKey(unittest.TestCase):
+    def test_arrows(self):
+        self.assertListEqual(decode_all("\x1b[A\x1b[B\x1b[C\x1b[Da"), ['UP', 'DOWN', 'RIGHT', 'LEFT', 'a'])
+        self.assertListEqual(decode_all("\x1b[1;2A\x1b[1;2D"), ['SHIFT+UP', 'SHIFT+LEFT'])
+        self.assertListEqual(decode_all("\x1bx"), ['ESCAPE'])
+
+    def test_other_sequences(self):
+        self.assertListEqual(decode_all("\x1b[1~AB"), ['', 'A', 'B'], "Home ne doit pas avaler les touches suivantes")
+        self.assertListEqual(decode_all("\x1b[15~\x1b[1;5C\x1b[1;2Hb"), ['', '', '', 'b'], "Ni F5, ni Ctrl+droite, ni Shift+Home ne sont des déplacements")
+
+
+class TestDecodeKeys(unittest.TestCase):
+    def test_decode_keys(self):
+        text = "\x1b[A\x1b[1;2Ca-"
+        self.assertEqual(decode_keys(text + "\r\n"), (['UP', 'SHIFT+RIGHT', 'a', '-'], ''))
+        self.assertEqual(decode_keys("\x1b", final=True), (['ESCAPE'], ''))
+        for cut in ["\x1b", "\x1b[", "\x1b[1;", "\x1b[1;2"]:
+            self.assertEqual(decode_keys("a" + cut), (['a'], cut), "Une séquence coupée attend la lecture suivante")
+            keys, rest = decode_keys("a" + cut)
+            self.assertEqual(decode_keys(rest + "\x1b[1;2C"[len(cut):])[0], ['SHIFT+RIGHT'])
+
+    def test_other_sequences(self):
+        self.assertEqual(decode_keys("\x1b[1~ab\x1b[15~"), (['a', 'b'], ''))
+
+
+@unittest.skipIf(os.name != 'posix', "add_reader sur un tube")
+class TestKeyReader(unittest.TestCase):
+    def read_keys(self, chunks: list[bytes], wait: float) -> list[str]:
+        """Keys decoded by start_key_reader from chunks written one by one on a pipe, a short pause between them"""
+        read_fd, write_fd = os.pipe()
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            queue = start_key_reader(loop, read_fd)
+            try:
+                for chunk in chunks:
+                    os.write(write_fd, chunk)
+                    await asyncio.sleep(ESCAPE_DELAY / 5)
+                await asyncio.sleep(wait)
+            finally:
+                loop.remove_reader(read_fd)
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        try:
+            return asyncio.run(main())
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_sequence_split_across_reads(self):
+        self.assertListEqual(self.read_keys([b'd\x1b', b'[B', b'\x1b[1;', b'2C'], 0), ['d', 'DOWN', 'SHIFT+RIGHT'])
+
+    def test_escape_after_delay(self):
+        self.assertListEqual(self.read_keys([b'\x1b'], 0), [], "Pas encore : la suite peut arriver")
+        self.assertListEqual(self.read_keys([b'a\x1b'], ESCAPE_DELAY * 3), ['a', 'ESCAPE'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+from copy import deepcopy
+import os
+import unittest
+from unittest.mock import patch
+
+import getkey as getkey_module
+import ulbloque
+import instrument
+from ulbloque import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+class TestInstrument(unittest.TestCase):
+    def test_disable_restores(self):
+        move_car_before = ulbloque.move_car
+        instrument.enable(ulbloque)
+        self.assertIsNot(ulbloque.move_car, move_car_before)
+        instrument.disable(ulbloque)
+        self.assertIs(ulbloque.move_car, move_car_before, "move_car doit être remis tel quel")
+        self.assertNotIn('print', vars(ulbloque))
+
+    def test_play_game(self):
+        keys = ['D', 'DOWN', 'E', 'SHIFT+LEFT', 'B', 'UP', 'ESCAPE']
+        with patch('ulbloque.start_hint_table', return_value={'distances': None}), \
+                patch('ulbloque.getkey', side_effect=keys), patch('builtins.print') as mock_print:
+            stats = instrument.enable(ulbloque)
+            try:
+                self.assertEqual(ulbloque.play_game(deepcopy(TEST_GAME_GAME)), 2)
+            finally:
+                instrument.disable(ulbloque)
+        timers = stats['timers']
+        self.assertEqual(timers['getkey']['count'], len(keys))
+        self.assertEqual(timers['move_car']['count'], 2, "DOWN et UP")
+        self.assertEqual(timers['slide_car']['count'], 1)
+        self.assertEqual(timers['get_game_str']['count'], 1, "Un seul écran complet")
+        self.assertEqual(stats['prints'], mock_print.call_count)
+        self.assertGreater(stats['bytes_written'], 0)
+        self.assertIn('move_car', instrument.get_summary_str(stats))
+
+    @unittest.skipIf(os.name != 'posix', "add_reader sur un tube")
+    def test_live_key_reads(self):
+        import async_game
+        read_fd, write_fd = os.pipe()
+
+        async def read_keys():
+            loop = asyncio.get_running_loop()
+            keys = getkey_module.start_key_reader(loop, read_fd)
+            try:
+                os.write(write_fd, b'd\x1b[B')
+                return [await async_game.read_key(keys), await async_game.read_key(keys)]
+            finally:
+                loop.remove_reader(read_fd)
+
+        stats = instrument.new_stats()
+        for module in [async_game, getkey_module]:
+            instrument.enable(module, stats)
+        try:
+            self.assertListEqual(asyncio.run(read_keys()), ['d', 'DOWN'])
+        finally:
+            for module in [async_game, getkey_module]:
+                instrument.disable(module)
+            os.close(read_fd)
+            os.close(write_fd)
+        self.assertEqual(stats['timers']['read_key']['count'], 2, "L'attente de chaque touche")
+        self.assertEqual(stats['timers']['decode_keys']['count'], 1, "Un seul os.read")
+
+    def test_histogram(self):
+        stats = instrument.new_stats()
+        for elapsed_us in [1, 3, 3, 3, 100]:
+            instrument.record(stats, 'f', elapsed_us * 1000)
+        timer = stats['timers']['f']
+        self.assertEqual(timer['count'], 5)
+        self.assertEqual(timer['max_ns'], 100_000)
+        self.assertEqual(instrument.get_percentile(timer, 0.5), 4, "3 us est dans le seau [2, 4)")
+        self.assertEqual(instrument.get_percentile(timer, 0.99), 128)
+
+
+if __name__ == '__main__':
+    unittest.main()
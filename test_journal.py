@@ -0,0 +1,99 @@
+from copy import deepcopy
+import random
+import unittest
+
+from ulbloque import *
+from journal import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+def play_random_moves(game: dict, journal: dict, count: int, rng: random.Random) -> list:
+    """Plays count random legal moves, returns the car positions before each move and after the last one"""
+    positions = [[car[0] for car in game['cars']]]
+    while len(positions) <= count:
+        car_index = rng.randrange(len(game['cars']))
+        direction = rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+        if move_car(game, car_index, direction):
+            record_move(journal, game, car_index, 1 if direction in ['RIGHT', 'DOWN'] else -1)
+            positions.append([car[0] for car in game['cars']])
+    return positions
+
+
+class TestJournal(unittest.TestCase):
+    def assertSameOccupancy(self, game: dict):
+        self.assertEqual(get_occupancy(game), build_occupancy(deepcopy(game)), "La grille d'occupation n'est plus à jour")
+
+    def test_undo_redo(self):
+        game = deepcopy(TEST_GAME_GAME)
+        journal = new_journal(game)
+        positions = play_random_moves(game, journal, 100, random.Random(0))
+        for i in range(100, 0, -1):
+            self.assertIsNotNone(undo_move(journal, game))
+            self.assertListEqual([car[0] for car in game['cars']], positions[i - 1], f"Annulation du coup {i}")
+        self.assertIsNone(undo_move(journal, game), "Rien à annuler")
+        self.assertSameOccupancy(game)
+        for i in range(1, 101):
+            redo_move(journal, game)
+            self.assertListEqual([car[0] for car in game['cars']], positions[i], f"Rétablissement du coup {i}")
+        self.assertIsNone(redo_move(journal, game), "Rien à rétablir")
+        self.assertSameOccupancy(game)
+
+    def test_goto(self):
+        game = deepcopy(TEST_GAME_GAME)
+        journal = new_journal(game, checkpoint_interval=8)
+        positions = play_random_moves(game, journal, 100, random.Random(1))
+        rng = random.Random(2)
+        for _ in range(50):
+            index = rng.randrange(101)
+            goto_move(journal, game, index)
+            self.assertEqual(journal['position'], index)
+            self.assertListEqual([car[0] for car in game['cars']], positions[index], f"Saut au coup {index}")
+            self.assertSameOccupancy(game)
+        with self.assertRaises(IndexError):
+            goto_move(journal, game, 101)
+
+    def test_new_move_drops_redo(self):
+        game = deepcopy(TEST_GAME_GAME)
+        journal = new_journal(game, checkpoint_interval=4)
+        play_random_moves(game, journal, 20, random.Random(3))
+        goto_move(journal, game, 6)
+        positions = play_random_moves(game, journal, 10, random.Random(4))
+        self.assertEqual(len(journal['entries']), 16)
+        self.assertTrue(all(index <= 16 for index in journal['checkpoints']), "Points de reprise périmés")
+        goto_move(journal, game, 6)
+        goto_move(journal, game, 16)
+        self.assertListEqual([car[0] for car in game['cars']], positions[-1])
+
+    def test_undo_key(self):
+        game = deepcopy(TEST_GAME_GAME)
+        session = new_session(game)
+        for key in ['D', 'DOWN', 'E', 'SHIFT+LEFT']:
+            apply_key(game, session, key)
+        self.assertEqual(session['moves'], 4)
+        self.assertTupleEqual(apply_key(game, session, '-'), (4, (0, 3)), "E doit revenir en (3, 3)")
+        self.assertEqual(session['moves'], 1, "Un coup annulé ne compte plus")
+        self.assertTupleEqual(game['cars'][4][0], (3, 3))
+        apply_key(game, session, '+')
+        self.assertTupleEqual(game['cars'][4][0], (0, 3))
+        self.assertEqual(session['moves'], 4)
+        self.assertIsNone(apply_key(game, session, '+'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+from copy import deepcopy
+import os
+import unittest
+
+from ulbloque import *
+from solver import search
+from parallel import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+def list_segments() -> set:
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+class TestParallel(unittest.TestCase):
+    def assertSolves(self, game: dict, moves: list):
+        """Replays moves with move_car and checks that the game is won"""
+        game = deepcopy(game)
+        for i, (letter, direction) in enumerate(moves):
+            self.assertTrue(move_car(game, ord(letter) - ord('A'), direction), f"Le mouvement {i} ({letter} {direction}) est invalide")
+        self.assertTrue(is_win(game), "La solution ne mène pas à une victoire")
+
+    def test_same_length_as_search(self):
+        before = list_segments()
+        for game in [deepcopy(TEST_GAME_GAME), parse_game('game3.txt')]:
+            length = len(search(game)['moves'])
+            for workers in [1, 3]:
+                result = search_parallel(game, workers)
+                self.assertEqual(len(result['moves']), length, f"{workers} processus")
+                self.assertSolves(game, result['moves'])
+        self.assertSetEqual(list_segments() - before, set(), "La mémoire partagée doit être libérée")
+
+    def test_unsolvable_and_won(self):
+        game = {'width': 4, 'height': 3, 'max_moves': 10, 'cars': ([(0, 1), 'h', 2], [(2, 0), 'v', 3])}
+        self.assertIsNone(search_parallel(game, 2)['moves'])
+        game = {'width': 4, 'height': 3, 'max_moves': 10, 'cars': ([(2, 1), 'h', 2],)}
+        self.assertListEqual(search_parallel(game, 2)['moves'], [])
+
+    def test_table(self):
+        keys = memoryview(bytearray(8 * 8)).cast('Q')
+        for state in [0, 5, 1 << 40]:
+            slot = get_slot(keys, state)
+            self.assertEqual(keys[slot], 0)
+            keys[slot] = state + 1
+            self.assertEqual(get_slot(keys, state), slot)
+        self.assertEqual(sum(1 for key in keys if key), 3)
+
+    def test_scaling(self):
+        rows = get_scaling(deepcopy(TEST_GAME_GAME), [1, 2])
+        self.assertEqual([row['length'] for row in rows], [18, 18])
+        self.assertAlmostEqual(rows[0]['efficiency'], 1.0)
+        self.assertIn("efficiency", get_scaling_str(rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+from copy import deepcopy
+import os
+import random
+import tempfile
+import unittest
+
+from ulbloque import *
+from puzzledb import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+class TestPuzzleDatabase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'puzzles.db')
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def write_pack(self, games: list) -> str:
+        path = os.path.join(self.directory, 'pack.txt')
+        with open(path, 'w') as f:
+            f.write("\n".join(get_game_file_str(game) for game in games))
+        return path
+
+    def test_record(self):
+        record = unpack_record(pack_record(deepcopy(TEST_GAME_GAME), 18, 3950))
+        self.assertEqual(record['optimal'], 18)
+        self.assertEqual(record['states'], 3950)
+        self.assertEqual(record['cars'], 8)
+        self.assertEqual(get_game_file_str(record['game']), get_game_file_str(TEST_GAME_GAME))
+        self.assertIsNone(unpack_record(pack_record(deepcopy(TEST_GAME_GAME), None, 1))['optimal'])
+        game = deepcopy(TEST_GAME_GAME)
+        game['cars'] = [[(0, 0), 'h', 1]] * (MAX_CARS + 1)
+        with self.assertRaises(ValueError):
+            pack_record(game, None, 1)
+
+    def test_build_and_export(self):
+        self.assertEqual(build_database(['.'], self.path), 3)
+        out_dir = os.path.join(self.directory, 'out')
+        self.assertEqual(export_database(self.path, out_dir), 3)
+        for i, name in enumerate(['game1.txt', 'game2.txt', 'game3.txt']):
+            with open(os.path.join(out_dir, f"game{i + 1:05d}.txt")) as f:
+                self.assertEqual(f.read(), get_game_file_str(parse_game(name)), f"{name} doit revenir identique")
+            os.remove(os.path.join(out_dir, f"game{i + 1:05d}.txt"))
+        os.rmdir(out_dir)
+        with PuzzleDatabase(self.path) as db:
+            record = db.get_record(0)
+            self.assertEqual(record['optimal'], 18)
+            self.assertEqual(record['states'], 3950)
+
+    def test_find(self):
+        games = []
+        for length in range(10):
+            game = {'width': 6, 'height': 6, 'max_moves': 10, 'cars': [[(4 - length % 5, length // 5), 'h', 2]]}
+            games.append(game)
+        games.append({'width': 7, 'height': 6, 'max_moves': 10, 'cars': [[(0, 0), 'h', 2]]})
+        build_database([self.write_pack(games)], self.path)
+        with PuzzleDatabase(self.path) as db:
+            self.assertEqual(len(db), 11)
+            found = db.find(6, 6, 2, 3)
+            self.assertEqual(len(found), 4, "Deux puzzles de longueur 2 et deux de longueur 3")
+            self.assertTrue(all(2 <= db.get_record(db.index[i][3])['optimal'] <= 3 for i in found))
+            self.assertEqual(len(db.find(6, 6)), 10)
+            self.assertEqual(len(db.find(6, 6, 5, 9)), 0)
+            self.assertEqual(db.get_random_record(7, 6, rng=random.Random(1))['optimal'], 5)
+            self.assertIsNone(db.get_random_record(8, 8))
+            self.assertDictEqual(db.get_sizes(), {(6, 6): 10, (7, 6): 1})
+
+    def test_records_out_of_order(self):
+        games = [deepcopy(TEST_GAME_GAME) for _ in range(3)]
+        for i, game in enumerate(games):
+            game['max_moves'] = 20 + i
+        records = [(n, pack_record(games[n], 18, 3950)) for n in [2, 0, 1]]
+        self.assertEqual(write_database(iter(records), self.path), 3)
+        with PuzzleDatabase(self.path) as db:
+            self.assertListEqual([db.get_game(n)['max_moves'] for n in range(3)], [20, 21, 22], "Chaque record à sa place")
+        build_database(['.'], self.path, jobs=2)
+        with open(self.path, 'rb') as f:
+            parallel = f.read()
+        build_database(['.'], self.path)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), parallel, "Le même fichier quel que soit l'ordre des workers")
+
+    def test_not_a_database(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            PuzzleDatabase(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
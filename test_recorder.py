@@ -0,0 +1,140 @@
+from copy import deepcopy
+import itertools
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ulbloque import *
+from recorder import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+def play_recorded(log: SessionLog, keys: list[str]) -> int:
+    """play_game on TEST_GAME_GAME with keys, recorded in log"""
+    with patch('ulbloque.start_hint_table', return_value={'distances': None}), \
+            patch('ulbloque.getkey', side_effect=keys), patch('builtins.print'):
+        return play_game(deepcopy(TEST_GAME_GAME), log)
+
+def fake_recording(keys: int, seconds: float = 0.5) -> dict:
+    """Recording of keys moves of D up and down, one every seconds"""
+    clock = itertools.count(0, seconds).__next__
+    recording = new_recording(deepcopy(TEST_GAME_GAME), clock)
+    add_event(recording, 3)
+    for i in range(keys):
+        add_event(recording, STEP, 1 - i % 2, True)
+    record_end(recording, 2, keys)
+    return recording
+
+
+class TestRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_varint(self):
+        data = bytearray()
+        values = [0, 1, 127, 128, 300, 2 ** 35]
+        for value in values:
+            write_varint(data, value)
+        self.assertEqual(len(data), 1 + 1 + 1 + 2 + 2 + 6)
+        offset = 0
+        for value in values:
+            read, offset = read_varint(data, offset)
+            self.assertEqual(read, value)
+        with self.assertRaises(IndexError):
+            read_varint(b'\x80', 0)
+
+    def test_play_game(self):
+        keys = ['D', 'UP', 'DOWN', '?', '-', 'Z', 'ESCAPE']
+        with SessionLog(self.directory) as log:
+            self.assertEqual(play_recorded(log, keys), 2)
+        [session] = iter_sessions(find_logs(self.directory))
+        self.assertEqual(session['game'], {**TEST_GAME_GAME, 'cars': [list(car) for car in TEST_GAME_GAME['cars']]})
+        self.assertEqual(session['outcome'], 2)
+        self.assertEqual(session['moves'], 0, "Le coup a été annulé")
+        events = [event[:4] for event in session['events']]
+        self.assertListEqual(events, [(3, 3, 0, True), (STEP, 3, 0, False), (STEP, 3, 1, True), (HINT, 3, 0, True),
+                                      (UNDO, 3, 0, True), (END, 3, 2, True)], "Z n'est pas une voiture, rien n'est enregistré")
+
+    def test_won_and_lost(self):
+        with SessionLog(self.directory) as log:
+            self.assertEqual(play_recorded(log, ['A', 'SHIFT+RIGHT'] + ['D', 'DOWN', 'UP'] * 20), 1)
+        [session] = iter_sessions(find_logs(self.directory))
+        self.assertEqual(session['outcome'], 1)
+        self.assertEqual(session['moves'], 40)
+        self.assertEqual(session['events'][1][:4], (SLIDE, 0, 3, False), "A est bloquée par B")
+
+    def test_compact(self):
+        recording = fake_recording(100)
+        events = len(decode_session(bytes(recording['data']))['events'])
+        header = len(new_recording(deepcopy(TEST_GAME_GAME))['data'])
+        self.assertLessEqual(len(recording['data']) - header, 2 * events + 1, "Deux octets par événement")
+
+    def test_rotation(self):
+        with SessionLog(self.directory, max_bytes=200) as log:
+            for keys in range(10):
+                log.write(fake_recording(keys * 3))
+        paths = find_logs(self.directory)
+        self.assertGreater(len(paths), 1)
+        for path in paths[:-1]:
+            self.assertLessEqual(os.path.getsize(path), 200)
+        with SessionLog(self.directory, max_bytes=200) as log:
+            log.write(fake_recording(0))
+        self.assertEqual(find_logs(self.directory)[:len(paths)], paths, "Les anciens fichiers restent")
+        sessions = list(iter_sessions(find_logs(self.directory)))
+        self.assertListEqual([session['moves'] for session in sessions], [keys * 3 for keys in range(10)] + [0])
+
+    def test_streaming(self):
+        with SessionLog(self.directory) as log:
+            for keys in range(20):
+                log.write(fake_recording(keys))
+        [path] = find_logs(self.directory)
+        records = list(iter_records(path))
+        self.assertEqual(len(records), 20)
+        self.assertListEqual(list(iter_records(path, chunk_size=3)), records, "Les sessions coupées entre deux lectures")
+        with open(path, 'ab') as f:
+            f.write(bytes(fake_recording(5)['data'])[:10])
+        self.assertListEqual(list(iter_records(path)), records, "Une session incomplète est ignorée")
+
+    def test_statistics(self):
+        with SessionLog(self.directory) as log:
+            play_recorded(log, ['D', 'UP', 'DOWN', '?', '-', 'ESCAPE'])
+            play_recorded(log, ['UP', 'E', 'RIGHT', 'ESCAPE'])
+            log.write(fake_recording(4))
+        stats = get_statistics(iter_sessions(find_logs(self.directory)))
+        self.assertEqual(stats['sessions'], 3)
+        self.assertListEqual(stats['outcomes'], [0, 0, 3])
+        self.assertEqual(stats['selected'][3], 2)
+        self.assertEqual(stats['accepted'][3], 5)
+        self.assertEqual(stats['blocked'][3], 1, "UP sans voiture choisie ne compte pas")
+        self.assertEqual(stats['blocked'][4], 1, "F bloque E")
+        self.assertEqual(stats['undos'], 1)
+        self.assertEqual(stats['hints'], 1)
+        self.assertEqual(stats['abandoned_at'], {0: 2, 4: 1})
+        self.assertEqual(stats['timers']['move']['count'], 6, "Cinq déplacements et une annulation")
+        self.assertIn("3 left", get_statistics_str(stats))
+
+
+if __name__ == '__main__':
+    unittest.main()
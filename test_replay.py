@@ -0,0 +1,89 @@
+from copy import deepcopy
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from ulbloque import *
+from solver import solve
+from replay import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+KEYS = ['a', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'Z', '1', '?', 'UP', 'DOWN', 'LEFT', 'RIGHT',
+        'SHIFT+UP', 'SHIFT+DOWN', 'SHIFT+LEFT', 'SHIFT+RIGHT', '-', '+']
+
+
+class TestReplay(unittest.TestCase):
+    def test_same_as_play_game(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            keys = [rng.choice(KEYS) for _ in range(rng.randrange(1, 80))] + ['ESCAPE']
+            game = deepcopy(TEST_GAME_GAME)
+            # pas de table d'indices en arrière-plan, '?' ne change rien au jeu
+            with patch('ulbloque.start_hint_table', return_value={'distances': None}), \
+                    patch('ulbloque.getkey', side_effect=keys) as mock_getkey, patch('builtins.print'):
+                expected = play_game(game)
+            result = replay(TEST_GAME_GAME, keys)
+            self.assertEqual(result['outcome'], expected, f"Séquence: {keys}")
+            self.assertEqual(result['keys'], mock_getkey.call_count, "Nombre de touches lues différent")
+            self.assertListEqual(result['game']['cars'], [list(car) for car in game['cars']], f"Séquence: {keys}")
+
+    def test_outcomes(self):
+        moves = solve(deepcopy(TEST_GAME_GAME))
+        keys = [key for letter, direction in moves for key in (letter, direction)]
+        result = replay(TEST_GAME_GAME, keys + ['ESCAPE'])
+        self.assertEqual(result['outcome'], 0)
+        self.assertEqual(result['moves'], 18)
+        self.assertEqual(result['keys'], len(keys), "Les touches après la victoire ne sont pas lues")
+        self.assertIsNone(replay(TEST_GAME_GAME, keys[:-1])['outcome'], "La partie n'est pas finie")
+        self.assertEqual(replay(TEST_GAME_GAME, ['D', 'DOWN', 'UP'] * 20)['outcome'], 1)
+        self.assertEqual(replay(TEST_GAME_GAME, ['A', 'escape'])['outcome'], 2)
+        self.assertTupleEqual(TEST_GAME_GAME['cars'][3][0], (0, 3), "replay ne doit pas modifier le jeu")
+
+    def test_long_sequence(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['max_moves'] = 10 ** 9
+        keys = (key for _ in range(100_000) for key in ('D', 'DOWN', 'UP', 'B'))
+        result = replay(game, keys)
+        self.assertEqual(result['keys'], 400_000)
+        self.assertEqual(result['moves'], 200_000, "D descend puis remonte à chaque tour")
+
+    def test_directory(self):
+        directory = tempfile.mkdtemp()
+        try:
+            shutil.copy('game1.txt', directory)
+            moves = solve(parse_game('game1.txt'))
+            with open(os.path.join(directory, 'game1.keys'), 'w') as f:
+                f.write("\n".join(key for letter, direction in moves for key in (letter, direction)) + "\n")
+            with open(os.path.join(directory, 'lost.keys'), 'w') as f:
+                f.write("A\nRIGHT\n")
+            rows = sorted(replay_directory(directory), key=lambda row: row['file'])
+            self.assertEqual(rows[0]['outcome'], 0)
+            self.assertEqual(rows[0]['moves'], 18)
+            self.assertTrue(rows[1]['outcome'].startswith('error'), "lost.txt n'existe pas")
+            expected = {rows[0]['file']: {'outcome': '0', 'moves': '17'}, rows[1]['file']: {'outcome': rows[1]['outcome'], 'moves': ''}}
+            self.assertEqual(len(get_differences(rows, expected)), 1)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+from copy import deepcopy
+import unittest
+
+from ulbloque import *
+from solver import solve
+from server import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+def get_solution_keys(game: dict) -> list[str]:
+    keys = []
+    for letter, direction in solve(deepcopy(game)):
+        keys += [letter, direction]
+    return keys
+
+
+class TestServer(unittest.TestCase):
+    def test_strip_telnet(self):
+        self.assertEqual(strip_telnet(b'abc'), (b'abc', 0, b''))
+        data = bytes([IAC, DO, ECHO]) + b'a' + bytes([IAC, IAC]) + PING + b'b' + bytes([IAC, SB, 24, 1, IAC, SE]) + PING
+        self.assertEqual(strip_telnet(data), (b'a\xffb', 2, b''))
+        self.assertEqual(strip_telnet(b'a' + bytes([IAC, WILL])), (b'a', 0, bytes([IAC, WILL])), "La fin est gardée pour la lecture suivante")
+
+    def test_encode_key(self):
+        text = "".join(encode_key(key).decode() for key in LOAD_KEYS + ['a'])
+        self.assertEqual(decode_keys(text + "\r\n"), (LOAD_KEYS + ['a'], ''))
+
+    def test_sessions_share_the_template(self):
+        template = load_template('game1.txt')
+        first, second = new_player(template), new_player(template)
+        self.assertIs(first['template']['game'], second['template']['game'])
+        handle_key(first, 'D')
+        handle_key(first, 'DOWN')
+        self.assertEqual(first['game']['cars'][3][0], (0, 4))
+        self.assertEqual(second['game']['cars'][3][0], (0, 3), "Chaque session a ses propres voitures")
+        self.assertEqual(template['game']['cars'][3][0], (0, 3))
+
+    def test_handle_key(self):
+        template = load_template('game1.txt')
+        player = new_player(template)
+        outcome = None
+        for key in get_solution_keys(template['game']):
+            updates, outcome = handle_key(player, key)
+        self.assertEqual(outcome, 0)
+        self.assertIn("won in 18 moves", updates)
+        self.assertEqual(handle_key(new_player(template), 'ESCAPE')[1], 2)
+
+    def test_dead_start_position(self):
+        template = load_template('game1.txt')
+        template['game']['max_moves'] = 10
+        player = new_player(template)
+        output = get_start_str(player)
+        template['hints']['thread'].join()
+        output += handle_key(player, 'A')[0] + handle_key(player, 'B')[0]
+        self.assertEqual(output.count("Can't win in the 10 moves left (18 needed)"), 1)
+        self.assertIn("Can't win in the 10 moves left", get_start_str(new_player(template)), "La table est déjà prête")
+
+    def test_escape_split_across_reads(self):
+        async def play():
+            stats = new_stats()
+            server = await start_server(['game1.txt'], port=0, stats=stats)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            await reader.readuntil(b'\xe2\x95\x9d')
+            writer.write(b'D\x1b')
+            await writer.drain()
+            await asyncio.sleep(ESCAPE_DELAY / 5)
+            writer.write(b'[B' + PING)
+            await reader.readuntil(PONG)
+            moved = stats['outcomes'] == [0, 0, 0]
+            writer.write(b'\x1b')
+            output = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return moved, output, stats
+
+        moved, output, stats = asyncio.run(play())
+        self.assertTrue(moved, "ESC puis [B est la flèche du bas, pas la touche échap")
+        self.assertEqual(stats['keys'], 3)
+        self.assertEqual(stats['outcomes'], [0, 0, 1], "ESC seul termine la partie après le délai")
+        self.assertIn(b"Leaving Game!", output)
+
+    def test_play_over_socket(self):
+        async def play():
+            stats = new_stats()
+            server = await start_server(['game1.txt'], port=0, stats=stats)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            frame = await reader.readuntil(b'\xe2\x95\x9d')  # fin du cadre des contrôles
+            writer.write(b"".join(encode_key(key) for key in get_solution_keys(TEST_GAME_GAME)))
+            output = await reader.read()
+            writer.close()
+            report = await run_load_test('127.0.0.1', port, players=20, key_count=10, think=0, ramp=0, seed=1)
+            server.close()
+            await server.wait_closed()
+            return frame, output, stats, report
+
+        frame, output, stats, report = asyncio.run(play())
+        self.assertTrue(frame.startswith(TELNET_SETUP))
+        self.assertIn(b"won in 18 moves", output)
+        self.assertIn(b"\r\n", output, "Les fins de ligne doivent être CR LF")
+        self.assertEqual(stats['outcomes'][0], 1)
+        self.assertEqual(stats['started'], 21)
+        self.assertEqual(report['errors'], 0)
+        self.assertGreater(report['keys'], 0)
+        self.assertLessEqual(report['p50'], report['p99'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+from copy import deepcopy
+import unittest
+
+from ulbloque import *
+from solver import *
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+BLOCKED_GAME_GAME = {
+    'width': 4,
+    'height': 3,
+    'max_moves': 10,
+    'cars': (
+        [(0, 1), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B, occupe toute la colonne
+    )
+}
+
+SYMMETRIC_GAME_GAME = {
+    'width': 6,
+    'height': 5,
+    'max_moves': 30,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A, sur la ligne du milieu
+        [(2, 3), 'v', 2],  # Voiture B, interchangeable avec C
+        [(2, 0), 'v', 2],  # Voiture C
+        [(3, 0), 'h', 2],  # Voiture D, symétrique de E
+        [(3, 4), 'h', 2],  # Voiture E
+        [(4, 2), 'v', 2],  # Voiture F
+    )
+}
+
+
+class TestSolver(unittest.TestCase):
+    def assertSolves(self, game: dict, moves: list):
+        """Replays moves with move_car and checks that the game is won"""
+        game = deepcopy(game)
+        for i, (letter, direction) in enumerate(moves):
+            self.assertTrue(move_car(game, ord(letter) - ord('A'), direction), f"Le mouvement {i} ({letter} {direction}) est invalide")
+        self.assertTrue(is_win(game), "La solution ne mène pas à une victoire")
+
+    def test_pack_unpack_state(self):
+        game = deepcopy(TEST_GAME_GAME)
+        layout = get_layout(game)
+        state = pack_state(layout, game['cars'])
+        self.assertListEqual(unpack_state(layout, state), [0, 0, 3, 3, 3, 3, 4, 1])
+        game['cars'][0][0] = (3, 2)
+        apply_state(layout, game, state)
+        self.assertTupleEqual(game['cars'][0][0], (0, 2), "apply_state n'a pas remis la voiture A en place")
+
+    def test_successors_match_move_car(self):
+        game = deepcopy(TEST_GAME_GAME)
+        layout = get_layout(game)
+        state = pack_state(layout, game['cars'])
+        for car_index, direction, next_state in get_successors(layout, state):
+            moved = deepcopy(game)
+            self.assertTrue(move_car(moved, car_index, direction))
+            self.assertEqual(pack_state(layout, moved['cars']), next_state)
+
+    def test_solve(self):
+        moves = solve(deepcopy(TEST_GAME_GAME))
+        self.assertIsNotNone(moves, "Le jeu de test a une solution")
+        self.assertEqual(len(moves), 18, "La solution trouvée n'est pas optimale")
+        self.assertSolves(TEST_GAME_GAME, moves)
+
+    def test_solve_does_not_modify_game(self):
+        game = deepcopy(TEST_GAME_GAME)
+        solve(game)
+        self.assertEqual(game, TEST_GAME_GAME, "solve ne doit pas modifier le jeu")
+
+    def test_solve_already_won(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['cars'][0][0] = (4, 2)
+        self.assertListEqual(solve(game), [])
+
+    def test_solve_unsolvable(self):
+        result = search(deepcopy(BLOCKED_GAME_GAME))
+        self.assertIsNone(result['moves'], "Ce jeu n'a pas de solution")
+        self.assertEqual(result['explored'], 1)
+
+    def test_strategies(self):
+        for strategy in STRATEGIES:
+            moves = solve(deepcopy(TEST_GAME_GAME), strategy)
+            self.assertEqual(len(moves), 18, f"La solution de {strategy} n'est pas optimale")
+            self.assertSolves(TEST_GAME_GAME, moves)
+            game = deepcopy(TEST_GAME_GAME)
+            game['cars'][0][0] = (4, 2)
+            self.assertListEqual(solve(game, strategy), [], f"{strategy} : le jeu est déjà gagné")
+            self.assertIsNone(solve(deepcopy(BLOCKED_GAME_GAME), strategy), f"{strategy} : ce jeu n'a pas de solution")
+
+    def test_heuristics_admissible(self):
+        game = deepcopy(TEST_GAME_GAME)
+        layout = get_layout(game)
+        distances = get_distance_table(layout, pack_state(layout, game['cars']))
+        for state, distance in distances.items():
+            blockers = heuristic_blockers(layout, state)
+            chains = heuristic_blocker_chains(layout, state)
+            self.assertLessEqual(blockers, chains)
+            self.assertLessEqual(chains, distance, "L'heuristique surestime la distance à la victoire")
+
+    def test_winning_states(self):
+        game = deepcopy(TEST_GAME_GAME)
+        layout = get_layout(game)
+        wins = get_winning_states(layout)
+        self.assertEqual(len(wins), len(set(wins)))
+        reachable = {state for state in get_reachable_states(layout, pack_state(layout, game['cars'])) if is_win_state(layout, state)}
+        self.assertTrue(reachable <= set(wins), "Il manque des positions gagnantes")
+        for state in wins:
+            self.assertTrue(is_win_state(layout, state))
+            cells = [layout['cells'][i][off] for i, off in enumerate(unpack_state(layout, state))]
+            occupied = 0
+            for mask in cells:
+                self.assertFalse(occupied & mask, "Des voitures se chevauchent")
+                occupied |= mask
+
+    def test_canonical_state(self):
+        game = deepcopy(SYMMETRIC_GAME_GAME)
+        layout = get_layout(game)
+        self.assertListEqual(layout['classes'], [[1, 2]])
+        self.assertIsNotNone(layout['mirror'])
+        start = pack_state(layout, game['cars'])
+        canonical = canonical_state(layout, start)
+        self.assertListEqual(unpack_state(layout, canonical)[1:3], [0, 3], "B et C sont triées")
+        # la même position retournée, et avec les voitures dans un autre ordre
+        flipped = deepcopy(game)
+        flipped['cars'] = [[(x, 4 - y - (size - 1 if o == 'v' else 0)), o, size] for (x, y), o, size in game['cars']]
+        self.assertEqual(canonical_state(layout, pack_state(layout, flipped['cars'])), canonical)
+        self.assertIsNone(get_layout(deepcopy(TEST_GAME_GAME))['mirror'])
+        self.assertFalse(get_layout(deepcopy(TEST_GAME_GAME))['canonical'])
+
+    def test_canonical_searches(self):
+        for strategy in STRATEGIES:
+            moves = solve(deepcopy(SYMMETRIC_GAME_GAME), strategy)
+            self.assertEqual(len(moves), 10, strategy)
+            self.assertSolves(SYMMETRIC_GAME_GAME, moves)
+        layout = get_layout(deepcopy(SYMMETRIC_GAME_GAME))
+        start = pack_state(layout, SYMMETRIC_GAME_GAME['cars'])
+        self.assertEqual(len(get_reachable_states(layout, start)), 114)
+        raw = dict(layout, canonical=False, mirror=None)
+        self.assertEqual(len(get_reachable_states(raw, start)), 228, "Chaque position a son symétrique")
+        distances = get_distance_table(layout, start)
+        self.assertEqual(distances[canonical_state(layout, start)], 10)
+        # les indices sont des coups de la vraie partie, pas de sa version retournée
+        game = deepcopy(SYMMETRIC_GAME_GAME)
+        moves = []
+        while not is_win(game):
+            moves.append(get_best_move(layout, distances, pack_state(layout, game['cars'])))
+            self.assertTrue(move_car(game, ord(moves[-1][0]) - ord('A'), moves[-1][1]))
+        self.assertEqual(len(moves), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
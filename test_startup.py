@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import getkey
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# modules only needed once the game reads a key or starts its hint thread
+LAZY_MODULES = ['tty', 'termios', 'msvcrt', 'threading', 'contextlib']
+
+IMPORT_BUDGET_MS = 40
+
+
+def run_python(code: str, *options: str, cwd: str = HERE) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=HERE)
+    return subprocess.run([sys.executable, *options, '-c', code], cwd=cwd, env=env, capture_output=True, text=True)
+
+def get_import_ms() -> float:
+    """Cumulative import time of ulbloque, in milliseconds, as -X importtime reports it."""
+    result = run_python("import ulbloque", '-X', 'importtime')
+    for line in result.stderr.splitlines():
+        if line.endswith('| ulbloque'):
+            return int(line.split('|')[1]) / 1000
+    raise AssertionError(result.stderr)
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_is_quiet(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, getkey.SEQUENCE_FILE_NAME), 'w') as f:
+                f.write("A\nESCAPE\n")
+            result = run_python("import ulbloque", cwd=tmp)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, "", "Importer ulbloque ne doit rien afficher, même avec sequence.txt")
+
+    def test_lazy_modules(self):
+        code = ("import sys, ulbloque, getkey\n"
+                f"print(getkey._backend, *[m for m in {LAZY_MODULES!r} if m in sys.modules])")
+        result = run_python(code)
+        self.assertEqual(result.stdout.split(), ['None'], "Aucun terminal ni thread à l'import")
+
+    def test_backend_on_first_key(self):
+        with patch('getkey._backend', None), patch('getkey._Getch') as mock_getch:
+            mock_getch.return_value.side_effect = ['A', 'B']
+            self.assertEqual(getkey.getkey(), 'A')
+            self.assertEqual(getkey.getkey(), 'B')
+        mock_getch.assert_called_once_with()
+
+    def test_import_budget(self):
+        run_python("import ulbloque")  # writes the .pyc files
+        best = min(get_import_ms() for _ in range(5))
+        self.assertLess(best, IMPORT_BUDGET_MS, f"Importer ulbloque prend {best:.1f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,266 @@
+from copy import deepcopy
+import random
+import re
+import unittest
+from unittest.mock import patch, mock_open
+
+from ulbloque import *
+from bench import move_car_sets
+
+
+TEST_GAME_GAME = {
+    'width': 6,
+    'height': 6,
+    'max_moves': 40,
+    'cars': (
+        [(0, 2), 'h', 2],  # Voiture A
+        [(2, 0), 'v', 3],  # Voiture B
+        [(3, 0), 'h', 3],  # Voiture C
+        [(0, 3), 'v', 2],  # Voiture D
+        [(3, 3), 'h', 2],  # Voiture E
+        [(5, 3), 'v', 3],  # Voiture F
+        [(4, 4), 'v', 2],  # Voiture G
+        [(1, 5), 'h', 3]   # Voiture H
+    )
+}
+
+
+class TestOccupancy(unittest.TestCase):
+    def test_build_occupancy(self):
+        game = deepcopy(TEST_GAME_GAME)
+        occupancy = build_occupancy(game)
+        self.assertIs(game['occupancy'], occupancy)
+        self.assertEqual(occupancy[2 * 6 + 0], 1, "La case (0, 2) devrait être occupée par A")
+        self.assertEqual(occupancy[2 * 6 + 2], 2, "La case (2, 2) devrait être occupée par B")
+        self.assertEqual(occupancy[0], 0, "La case (0, 0) devrait être vide")
+        self.assertEqual(sum(1 for cell in occupancy if cell), 2 + 3 + 3 + 2 + 2 + 3 + 2 + 3)
+
+    def test_occupancy_follows_moves(self):
+        game = deepcopy(TEST_GAME_GAME)
+        move_car(game, 1, 'DOWN')
+        moved = game['occupancy']
+        self.assertEqual(moved, build_occupancy(deepcopy(game)), "La grille d'occupation n'a pas suivi le mouvement")
+
+    def test_same_result_as_sets(self):
+        rng = random.Random(42)
+        game, reference = deepcopy(TEST_GAME_GAME), deepcopy(TEST_GAME_GAME)
+        for _ in range(2000):
+            car_index = rng.randrange(len(game['cars']))
+            direction = rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+            self.assertEqual(move_car(game, car_index, direction), move_car_sets(reference, car_index, direction))
+            self.assertEqual(game['cars'], reference['cars'])
+
+    def test_invalid_car_index(self):
+        game = deepcopy(TEST_GAME_GAME)
+        self.assertFalse(move_car(game, -1, 'RIGHT'))
+        self.assertFalse(move_car(game, len(game['cars']), 'RIGHT'))
+
+
+class TestSlide(unittest.TestCase):
+    def test_move_car_distance(self):
+        game = deepcopy(TEST_GAME_GAME)
+        self.assertFalse(move_car(game, 4, 'LEFT', 3), "E est bloquée par D")
+        move_car(game, 3, 'DOWN')
+        self.assertTrue(move_car(game, 4, 'LEFT', 3), "E devrait pouvoir aller 3 cases à gauche")
+        self.assertTupleEqual(game['cars'][4][0], (0, 3))
+        self.assertEqual(game['occupancy'], build_occupancy(deepcopy(game)))
+
+    def test_move_car_distance_blocked(self):
+        game = deepcopy(TEST_GAME_GAME)
+        # B est bloquée par H après 2 cases
+        self.assertFalse(move_car(game, 1, 'DOWN', 3))
+        self.assertTupleEqual(game['cars'][1][0], (2, 0), "Un mouvement refusé ne doit pas déplacer la voiture")
+        self.assertFalse(move_car(game, 1, 'DOWN', 0))
+
+    def test_move_car_distance_longer_than_car(self):
+        game = deepcopy(TEST_GAME_GAME)
+        move_car(game, 3, 'DOWN')
+        self.assertTrue(move_car(game, 4, 'LEFT', 3))
+        self.assertTrue(move_car(game, 4, 'RIGHT', 3))
+        self.assertTupleEqual(game['cars'][4][0], (3, 3))
+        self.assertEqual(game['occupancy'], build_occupancy(deepcopy(game)))
+
+    def test_slide_car(self):
+        game = deepcopy(TEST_GAME_GAME)
+        self.assertEqual(slide_car(game, 1, 'DOWN'), 2)
+        self.assertTupleEqual(game['cars'][1][0], (2, 2))
+        self.assertEqual(slide_car(game, 1, 'DOWN'), 0, "B est déjà contre H")
+        self.assertEqual(slide_car(game, 1, 'LEFT'), 0, "B est verticale")
+        self.assertEqual(slide_car(game, 2, 'LEFT', 1), 1, "La distance maximale n'est pas respectée")
+        self.assertTupleEqual(game['cars'][2][0], (2, 0))
+        self.assertEqual(game['occupancy'], build_occupancy(deepcopy(game)))
+
+    def test_play_game_slide(self):
+        game = deepcopy(TEST_GAME_GAME)
+        sequence = ['D', 'DOWN', 'E', 'SHIFT+LEFT', 'B', 'SHIFT+DOWN', 'ESCAPE']
+        with patch('ulbloque.getkey', side_effect=sequence), patch('builtins.print'):
+            self.assertEqual(play_game(game), 2)
+        self.assertTupleEqual(game['cars'][4][0], (0, 3))
+        self.assertTupleEqual(game['cars'][1][0], (2, 2))
+
+    def test_play_game_slide_counts_moves(self):
+        game = deepcopy(TEST_GAME_GAME)
+        game['max_moves'] = 3
+        # 1 + 2 mouvements sur les 3 autorisés, la glissade de E s'arrête à la limite
+        sequence = ['D', 'DOWN', 'E', 'SHIFT+LEFT']
+        with patch('ulbloque.getkey', side_effect=sequence), patch('builtins.print'):
+            self.assertEqual(play_game(game), 1)
+        self.assertTupleEqual(game['cars'][4][0], (1, 3))
+
+
+def get_screen(text: str) -> list[list[str]]:
+    """Splits printed text into lines of glyphs, a colored letter is a single glyph"""
+    return [re.findall(r"\x1b\[\d+m.\x1b\[0m|.", line) for line in text.split("\n")]
+
+def apply_updates(screen: list[list[str]], updates: str):
+    """Applies cursor-positioned updates (as emitted by get_move_update_str) on screen"""
+    for row, col, clear, payload in re.findall(r"\x1b\[(\d+);(\d+)H(\x1b\[2K)?((?:\x1b\[\d+m.\x1b\[0m|[^\x1b])*)", updates):
+        line = screen[int(row) - 1]
+        if clear:
+            line.clear()
+        glyphs = get_screen(payload)[0]
+        line.extend([' '] * (int(col) - 1 + len(glyphs) - len(line)))
+        line[int(col) - 1:int(col) - 1 + len(glyphs)] = glyphs
+
+
+class TestRenderer(unittest.TestCase):
+    def assertUpdateMatchesFullFrame(self, game: dict, moves: list, top: int = 3):
+        """Updates applied on the old frame must give the new full frame"""
+        screen = get_screen("\n" * top + get_game_str(game, 0))
+        for i, (car_index, direction) in enumerate(moves):
+            old_pos = game['cars'][car_index][0]
+            self.assertTrue(move_car(game, car_index, direction))
+            updates = get_move_update_str(game, car_index, old_pos, i + 1, top)
+            self.assertTrue(updates.startswith("\0337") and updates.endswith("\0338"), "Le curseur doit être restauré")
+            apply_updates(screen, updates)
+            self.assertListEqual(screen, get_screen("\n" * top + get_game_str(game, i + 1)))
+
+    def test_move_update(self):
+        game = deepcopy(TEST_GAME_GAME)
+        self.assertUpdateMatchesFullFrame(game, [(3, 'DOWN'), (4, 'LEFT'), (4, 'LEFT'), (4, 'LEFT'), (1, 'DOWN'), (2, 'LEFT'), (1, 'DOWN')])
+
+    def test_update_only_moved_cells(self):
+        game = deepcopy(TEST_GAME_GAME)
+        move_car(game, 1, 'DOWN')
+        updates = get_move_update_str(game, 1, (2, 0), 1, 0)
+        # une case libérée, une case occupée et le compteur
+        self.assertEqual(updates.count("H"), 3)
+
+    def test_play_game_no_output_on_rejected_move(self):
+        game = deepcopy(TEST_GAME_GAME)
+        with patch('ulbloque.getkey', side_effect=['A', 'RIGHT', 'UP', 'B', 'LEFT', 'ESCAPE']), patch('builtins.print') as mock_print:
+            play_game(game)
+        # écran complet (effacement, contrôles, jeu) puis le message de sortie
+        self.assertEqual(mock_print.call_count, 4)
+
+
+def start_hint_table_now(game: dict) -> dict:
+    """start_hint_table, but waits for the table to be ready"""
+    hints = start_hint_table(game)
+    hints['thread'].join()
+    return hints
+
+
+class TestHint(unittest.TestCase):
+    def test_distance_table(self):
+        game = deepcopy(TEST_GAME_GAME)
+        layout = get_layout(game)
+        start = pack_state(layout, game['cars'])
+        distances = get_distance_table(layout, start)
+        self.assertEqual(distances[start], 18, "La distance de départ doit être celle de la solution optimale")
+
+    def test_follow_hints(self):
+        game = deepcopy(TEST_GAME_GAME)
+        hints = start_hint_table_now(game)
+        moves = 0
+        while not is_win(game):
+            letter, direction = get_hint_move(game, hints)
+            self.assertTrue(move_car(game, ord(letter) - ord('A'), direction))
+            moves += 1
+        self.assertEqual(moves, 18)
+        self.assertIsNone(get_hint_move(game, hints), "Pas d'indice quand la partie est gagnée")
+
+    def test_hint_table_limit(self):
+        game = deepcopy(TEST_GAME_GAME)
+        layout = get_layout(game)
+        start = pack_state(layout, game['cars'])
+        self.assertIsNone(get_distance_table(layout, start, max_states=100))
+        self.assertEqual(get_distance_table(layout, start, max_states=10_000)[start], 18)
+        hints = start_hint_table(game, max_states=100)
+        hints['thread'].join()
+        self.assertIsNone(hints['distances'])
+        self.assertTrue(hints['unavailable'])
+        self.assertIn("Hint: unavailable", get_show_hint_str(game, hints, new_shown_hint(), 10))
+        self.assertEqual(get_dead_position_str(game, hints, 0), "", "Pas d'avertissement sans table")
+
+    def test_hint_not_ready(self):
+        game = deepcopy(TEST_GAME_GAME)
+        self.assertIsNone(get_hint_move(game, {'layout': None, 'distances': None}))
+
+    def test_play_game_hint_key(self):
+        game = deepcopy(TEST_GAME_GAME)
+        with patch('ulbloque.start_hint_table', start_hint_table_now), patch('ulbloque.getkey', side_effect=['?', 'ESCAPE']), patch('builtins.print') as mock_print:
+            self.assertEqual(play_game(game), 2)
+        output = "".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertIn("Hint: ", output)
+        self.assertIn("\u001b[4m", output, "La voiture conseillée doit être soulignée")
+
+
+class TestGameFile(unittest.TestCase):
+    def test_parse_grid(self):
+        with open('game2.txt') as f:
+            lines = f.read().splitlines()
+        game = parse_grid(lines[1:-2], 18)
+        self.assertEqual((game['width'], game['height'], game['max_moves']), (7, 5, 18))
+        self.assertListEqual(game['cars'][1], [(6, 1), 'v', 4], "La voiture B est mal lue")
+        self.assertListEqual(game['cars'][8], [(1, 3), 'h', 5], "La voiture I est mal lue")
+
+    def test_parse_grid_single_cell_car(self):
+        with self.assertRaises(ValueError):
+            parse_grid(["|AA.B|", "|....|"], 10)
+
+    def test_read_games_pack(self):
+        with open('game1.txt') as f1, open('game3.txt') as f3:
+            pack = f1.read() + "\n" + f3.read()
+        games = list(read_games(pack.splitlines()))
+        self.assertEqual(len(games), 2)
+        self.assertEqual(games[0], parse_game('game1.txt'))
+        self.assertEqual(games[1], parse_game('game3.txt'))
+
+    def test_read_games_incomplete(self):
+        with open('game1.txt') as f:
+            lines = f.read().splitlines()
+        with self.assertRaises(ValueError):
+            list(read_games(lines[:-1]))
+        with self.assertRaises(ValueError):
+            list(read_games(lines[1:]))
+
+    def test_read_games_skip_errors(self):
+        with open('game1.txt') as f1, open('game3.txt') as f3:
+            game1, game3 = f1.read(), f3.read()
+        single_cell = "+---+\n|AA.|\n|.B..\n+---+\n5\n"
+        pack = game1 + single_cell + "garbage\n" + game1 + "+---+\n+---+\n3\n" + game3 + game3.rsplit("\n", 2)[0]
+        with self.assertRaises(ValueError):
+            list(read_games(pack.splitlines()))
+        games = list(read_games(pack.splitlines(), skip_errors=True))
+        self.assertEqual([type(game).__name__ for game in games], ['dict', 'ValueError', 'ValueError', 'dict', 'ValueError', 'dict', 'ValueError'])
+        self.assertEqual(str(games[1]), "car B is a single cell")
+        self.assertEqual(games[3], parse_game('game1.txt'), "La lecture reprend au jeu suivant")
+        self.assertEqual(games[5], parse_game('game3.txt'))
+
+    def test_iter_games_is_lazy(self):
+        with open('game2.txt') as f:
+            game_str = f.read()
+        with patch("builtins.open", mock_open(read_data=game_str * 3 + "garbage\n")):
+            games = iter_games('pack.txt')
+            self.assertEqual(next(games)['max_moves'], 18)
+            self.assertEqual(next(games)['max_moves'], 18)
+
+    def test_game_file_round_trip(self):
+        for name in ['game1.txt', 'game2.txt', 'game3.txt']:
+            with open(name) as f:
+                self.assertEqual(get_game_file_str(parse_game(name)), f.read(), f"{name} n'est pas réécrit à l'identique")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,55 +5,116 @@
 from getkey import *
 import sys
 
-def sorted_insert(t: list[list], e: list):
-    """ Finds the right index to insert e, alphabetic order"""
-    i = 0
-    while (i < len(t) and e[0] > t[i][0]):
-        i += 1;
-    t.insert(i, e)
+from solver import get_layout, pack_state, canonical_state, get_distance_table, get_best_move
+from analysis import get_locked_cars, get_exit_blockers
+from journal import new_journal, record_move, get_journal_moves, undo_move, redo_move
+
+def parse_grid(grid: list[str], max_moves: int) -> dict:
+    """Builds game data from the rows of a board (without the top and bottom borders)."""
+    width, height = len(grid[0]) - 2, len(grid)
+
+    # one pass over the cells, row by row: the first cell of a car is its
+    # top-left one and the second tells its orientation
+    cells = "".join(row[1:width + 1].ljust(width, '.') for row in grid)
+    starts, sizes, orientations = {}, {}, {}
+    for i, char in enumerate(cells):
+        if char.isalpha():
+            if char not in starts:
+                starts[char] = i
+                sizes[char] = 1
+            else:
+                if sizes[char] == 1:
+                    orientations[char] = 'h' if i == starts[char] + 1 else 'v'
+                sizes[char] += 1
+
+    # cars in alphabetic order, A first
+    cars = []
+    for char in sorted(starts):
+        if char not in orientations:
+            raise ValueError(f"car {char} is a single cell")
+        cars.append([(starts[char] % width, starts[char] // width), orientations[char], sizes[char]])
+    return {
+        'width': width,
+        'height': height,
+        'max_moves': max_moves,
+        'cars': cars
+    }
+
+def read_games(lines, skip_errors: bool = False):
+    """Yields the games found in lines: one game*.txt file, or several concatenated (a puzzle pack).
+
+    With skip_errors, a game that can't be read is yielded as its ValueError
+    and reading goes on at the next top border.
+    """
+    grid = []
+    expected = 'border'
+    for line in lines:
+        line = line.rstrip()
+        if not line:
+            continue  # blank lines between games
+        stage = expected
+        try:
+            if expected == 'border':
+                if not line.startswith('+'):
+                    raise ValueError(f"expected the top border of a game, got {line!r}")
+                expected = 'row'
+            elif expected == 'row':
+                if line.startswith('+'):
+                    if not grid:
+                        raise ValueError("a game has no rows")
+                    expected = 'max_moves'
+                else:
+                    grid.append(line)
+            elif expected == 'max_moves':
+                game_grid, grid = grid, []
+                expected = 'border'
+                yield parse_grid(game_grid, int(line))
+            elif line.startswith('+'):
+                # skipping a bad game, this is the next one
+                expected = 'row'
+        except ValueError as e:
+            if not skip_errors:
+                raise
+            yield e
+            grid = []
+            # a bad board ends at its max_moves line, anything else is skipped up to a top border
+            expected = 'border' if stage == 'max_moves' else 'skip'
+    if expected not in ('border', 'skip'):
+        if not skip_errors:
+            raise ValueError("the last game is incomplete")
+        yield ValueError("the last game is incomplete")
 
 def parse_game(game_file_path: str) -> dict:
     """Parses game*.txt and returns game data"""
     with open(game_file_path) as f:
-        game_data = f.readlines()
-    grid = [line.rstrip() for line in game_data[1:len(game_data)-2]]
-    max_moves = int(game_data[-1].rstrip())
-    f.close()
-
-    game = {
-        'width': len(grid[0])-2,
-        'height': len(grid),
-        'max_moves': max_moves,
-        'cars': []
-    }
-    # scanning grid
-    memo = set()
-    tmp_cars = []
-    for y in range(game['height']):
-        line = grid[y].replace('|', '')
-        for x in range(game['width']):
-            if x < len(line):
-                char = line[x]
-                if char.isalpha() and char not in memo:
-                    memo.add(char) # found new car
-
-                    # check horizontal size
-                    size_h = 1
-                    while (x+size_h)<game['width'] and line[x+size_h]==char:
-                            size_h += 1
-                    # check vertical size
-                    size_v = 1
-                    while (y+size_v)<game['height'] and grid[y+size_v].replace('|','')[x]==char:
-                        size_v += 1
-
-                    # add car to cars with correct orientation
-                    if size_h > size_v:
-                        car = [char, (x,y), 'h', size_h]
-                    elif size_v > size_h:
-                        car = [char, (x,y), 'v', size_v]
-                    sorted_insert(tmp_cars, car)
-    game['cars'] = [car[1:] for car in tmp_cars]
-    return game
+        game_data = f.read()
+    for game in read_games(game_data.splitlines()):
+        return game
+    raise ValueError(f"no game found in {game_file_path}")
+
+def iter_games(pack_path: str, skip_errors: bool = False):
+    """Yields the games of a puzzle pack one at a time, reading the file lazily (see read_games for skip_errors)."""
+    with open(pack_path) as f:
+        yield from read_games(f, skip_errors)
+
+# cars are written as the letters A-Z
+MAX_CARS = 26
+
+def get_game_file_str(game: dict) -> str:
+    """Return game in the game*.txt format read by parse_game."""
+    if len(game['cars']) > MAX_CARS:
+        raise ValueError(f"at most {MAX_CARS} cars can be written to a game file")
+    grid = [['.'] * game['width'] for _ in range(game['height'])]
+    for i, car in enumerate(game['cars']):
+        for x, y in get_car_cells(*car):
+            grid[y][x] = chr(65 + i)
+    border = "+" + "-" * game['width'] + "+"
+    a_y = game['cars'][0][0][1]
+    # the exit is a gap in the right border on A's row
+    lines = [border]
+    lines += ["|" + "".join(row) + ("." if y == a_y else "|") for y, row in enumerate(grid)]
+    lines += [border, str(game['max_moves'])]
+    return "\n".join(lines) + "\n"
 
 def get_car_color(index: int) -> str:
     """Return the color code for a car based on its index."""
@@ -68,6 +129,11 @@ def get_car_color(index: int) -> str:
     ]
     return colors[0] if index == 0 else colors[1 + (index - 1) % 6]
 
+def get_moves_str(game: dict, current_move_number: int) -> str:
+    """Return the move counter line of the game display."""
+    moves_left = game['max_moves'] - current_move_number
+    return f"Moves: {current_move_number}/{game['max_moves']} ({moves_left} left)"
+
 def get_game_str(game: dict, current_move_number: int) -> str:
     """Return a string representation of the current game state."""
 
@@ -91,12 +157,11 @@ def get_game_str(game: dict, current_move_number: int) -> str:
     # prep header
     separator = "=" * (game['width'] * 3 + 4)
     border = "+" + "-" * (game['width'] * 3) + "+"
-    moves_left = game['max_moves'] - current_move_number
 
     # prep output
     output = [
         separator,
-        f"Moves: {current_move_number}/{game['max_moves']} ({moves_left} left)",
+        get_moves_str(game, current_move_number),
         separator,
         border
     ]
@@ -120,11 +185,33 @@ def get_game_str(game: dict, current_move_number: int) -> str:
     output.append(border)
     return "\n".join(output)
 
-def move_car(game: dict, car_index: int, direction: str) -> bool:
-    """Move a car in the specified direction if possible."""
+def build_occupancy(game: dict) -> bytearray:
+    """Builds the occupancy grid of game, one byte per cell (car index + 1, 0 if empty)."""
+    width = game['width']
+    occupancy = bytearray(width * game['height'])
+    for i, car in enumerate(game['cars']):
+        pos, orientation, size = car
+        x, y = pos
+        step = 1 if orientation == 'h' else width
+        for j in range(size):
+            occupancy[y * width + x + j * step] = i + 1
+    game['occupancy'] = occupancy
+    return occupancy
+
+def get_occupancy(game: dict) -> bytearray:
+    """Return the occupancy grid of game, building it on first use."""
+    # kept up to date by move_car and slide_car afterwards, anything that moves
+    # cars without them must drop game['occupancy']
+    occupancy = game.get('occupancy')
+    if occupancy is None:
+        occupancy = build_occupancy(game)
+    return occupancy
+
+def move_car(game: dict, car_index: int, direction: str, distance: int = 1) -> bool:
+    """Move a car distance cells in the specified direction if possible."""
 
     # check if car index is valid
-    if 0 > car_index >= len(game['width']):
+    if not 0 <= car_index < len(game['cars']) or distance < 1:
         return False
 
     car = game['cars'][car_index]
@@ -140,13 +227,13 @@ def move_car(game: dict, car_index: int, direction: str) -> bool:
     # new position
     new_x, new_y = x, y
     if direction == 'LEFT':
-        new_x -= 1
+        new_x -= distance
     elif direction == 'RIGHT':
-        new_x += 1
+        new_x += distance
     elif direction == 'UP':
-        new_y -= 1
+        new_y -= distance
     else:
-        new_y += 1
+        new_y += distance
 
     # check boundaries
     if orientation == 'h':
@@ -156,37 +243,97 @@ def move_car(game: dict, car_index: int, direction: str) -> bool:
         if new_y < 0 or new_y + size > game['height']:
             return False
 
-    # check for collisions
-    for i, other_car in enumerate(game['cars']):
-        if i == car_index:
-            continue
-
-        other_pos, other_orientation, other_size = other_car
-        other_x, other_y = other_pos
+    occupancy = get_occupancy(game)
 
-        # all positions for both cars
-        new_car_positions = set()
-        other_car_positions = set()
+    width = game['width']
+    step = 1 if orientation == 'h' else width
+    head = y * width + x
+    tail = head + size * step
 
-        # moving car new positions
-        if orientation == 'h':
-            new_car_positions = {(new_x + j, y) for j in range(size)}
+    # a one cell move enters a single cell and leaves a single cell
+    if distance == 1:
+        if direction in ['RIGHT', 'DOWN']:
+            entered, left = tail, head
         else:
-            new_car_positions = {(x, new_y + j) for j in range(size)}
-
-        # other car positions
-        if other_orientation == 'h':
-            other_car_positions = {(other_x + j, other_y) for j in range(other_size)}
-        else:
-            other_car_positions = {(other_x, other_y + j) for j in range(other_size)}
+            entered, left = head - step, tail - step
+        if occupancy[entered]:
+            return False
+        occupancy[entered] = car_index + 1
+        occupancy[left] = 0
+        game['cars'][car_index][0] = (new_x, new_y)
+        return True
+
+    # longer moves cross every cell of path, cell indices go from head to tail
+    new_head = new_y * width + new_x
+    new_tail = new_head + size * step
+    if direction in ['RIGHT', 'DOWN']:
+        path = range(tail, new_tail, step)
+        entered = range(max(tail, new_head), new_tail, step)
+        left = range(head, min(new_head, tail), step)
+    else:
+        path = range(new_head, head, step)
+        entered = range(new_head, min(new_tail, head), step)
+        left = range(max(new_tail, head), tail, step)
 
-        # check for overlap
-        if new_car_positions & other_car_positions:
+    # check for collisions
+    for cell in path:
+        if occupancy[cell]:
             return False
+
     # move valid, update position
+    for cell in left:
+        occupancy[cell] = 0
+    for cell in entered:
+        occupancy[cell] = car_index + 1
     game['cars'][car_index][0] = (new_x, new_y)
     return True
 
+def slide_car(game: dict, car_index: int, direction: str, max_distance: int = None) -> int:
+    """Slide a car until it hits something (or max_distance), returns the distance moved."""
+    if not 0 <= car_index < len(game['cars']):
+        return 0
+
+    car = game['cars'][car_index]
+    pos, orientation, size = car
+    x, y = pos
+    if orientation == 'h' and direction not in ['LEFT', 'RIGHT']:
+        return 0
+    if orientation == 'v' and direction not in ['UP', 'DOWN']:
+        return 0
+
+    occupancy = get_occupancy(game)
+    width = game['width']
+    step = 1 if orientation == 'h' else width
+    head = y * width + x
+    offset = x if orientation == 'h' else y
+
+    # room between the car and the border, first cell in front of the car
+    if direction in ['RIGHT', 'DOWN']:
+        room = (width if orientation == 'h' else game['height']) - offset - size
+        cell = head + size * step
+    else:
+        room = offset
+        step = -step
+        cell = head + step
+    if max_distance is not None:
+        room = min(room, max_distance)
+
+    # single scan of the lane
+    distance = 0
+    while distance < room and not occupancy[cell]:
+        distance += 1
+        cell += step
+    if distance == 0:
+        return 0
+
+    # update position
+    step = abs(step)
+    new_head = head + distance * step if direction in ['RIGHT', 'DOWN'] else head - distance * step
+    occupancy[head:head + size * step:step] = bytes(size)
+    occupancy[new_head:new_head + size * step:step] = bytes([car_index + 1]) * size
+    game['cars'][car_index][0] = (new_head % width, new_head // width)
+    return distance
+
 def is_win(game: dict) -> bool:
     """Check if the game is won (car A has reached the right edge)."""
     if not game['cars']:
@@ -200,45 +347,267 @@ def is_win(game: dict) -> bool:
     res = orientation == 'h' and (pos[0] + size) >= game['width']
     return res
 
-def play_game(game: dict) -> int:
-    """Main game loop."""
-    selected_car = None
-    current_moves = 0
+def get_car_cells(pos: tuple, orientation: str, size: int) -> set[tuple]:
+    """Return the cells covered by a car."""
+    x, y = pos
+    if orientation == 'h':
+        return {(x + j, y) for j in range(size)}
+    return {(x, y + j) for j in range(size)}
+
+def get_cell_update_str(x: int, y: int, cell: str, top: int) -> str:
+    """Return the ANSI update drawing cell at (x, y) of the grid.
+
+    top is the number of terminal lines printed above get_game_str's output.
+    """
+    # grid rows start 4 lines below the top of get_game_str, cells are 3 columns wide
+    return f"\033[{top + 5 + y};{3 + 3 * x}H{cell}"
+
+def get_move_update_str(game: dict, car_index: int, old_pos: tuple, current_move_number: int, top: int) -> str:
+    """Return the ANSI updates redrawing a car that moved from old_pos and the move counter."""
+    pos, orientation, size = game['cars'][car_index]
+    old_cells = get_car_cells(old_pos, orientation, size)
+    new_cells = get_car_cells(pos, orientation, size)
+    car_str = f"{get_car_color(car_index)}{chr(65 + car_index)}\u001b[0m"
+
+    updates = ["\0337"]  # save cursor
+    for x, y in old_cells - new_cells:
+        updates.append(get_cell_update_str(x, y, ".", top))
+    for x, y in new_cells - old_cells:
+        updates.append(get_cell_update_str(x, y, car_str, top))
+    updates.append(f"\033[{top + 2};1H\033[2K{get_moves_str(game, current_move_number)}")
+    updates.append("\0338")  # restore cursor
+    return "".join(updates)
+
+def get_car_update_str(game: dict, car_index: int, top: int, style: str = "") -> str:
+    """Return the ANSI updates redrawing every cell of a car, with an extra style code."""
+    pos, orientation, size = game['cars'][car_index]
+    car_str = f"{get_car_color(car_index)}{style}{chr(65 + car_index)}\u001b[0m"
+    cells = [get_cell_update_str(x, y, car_str, top) for x, y in get_car_cells(pos, orientation, size)]
+    return "\0337" + "".join(cells) + "\0338"
+
+def get_message_update_str(game: dict, text: str, top: int, line: int = 0) -> str:
+    """Return the ANSI update writing text on a line below the board (empty text clears it)."""
+    # get_game_str is height + 5 lines long, leave one blank line under it
+    return f"\0337\033[{top + game['height'] + 7 + line};1H\033[2K{text}\0338"
+
+# Past this many reachable positions the hint table would take too long and
+# too much memory: the game goes on without hints.
+HINT_STATES = 1_000_000
+
+def start_hint_table(game: dict, max_states: int = HINT_STATES) -> dict:
+    """Starts building the distance-to-goal table of game in a background thread.
+
+    distances stays None for good, with unavailable set, when the board has more than max_states positions.
+    """
+    # locked cars never move, no need to try them
+    layout = get_layout(game, get_locked_cars(game))
+    hints = {'layout': layout, 'start': pack_state(layout, game['cars']), 'distances': None, 'unavailable': False}
+
+    def build():
+        distances = get_distance_table(layout, hints['start'], max_states)
+        hints['unavailable'] = distances is None
+        hints['distances'] = distances
+
+    # only games being played need a thread, not every tool importing this module
+    import threading
+
+    hints['thread'] = threading.Thread(target=build, daemon=True)
+    hints['thread'].start()
+    return hints
+
+def get_hint_move(game: dict, hints: dict) -> tuple[str, str] | None:
+    """Return the optimal next (car letter, direction), None if there is none or the table isn't ready."""
+    if hints['distances'] is None:
+        return None
+    layout = hints['layout']
+    return get_best_move(layout, hints['distances'], pack_state(layout, game['cars']))
+
+def new_shown_hint() -> dict:
+    """What get_show_hint_str has put on screen: the message line, the underlined car."""
+    return {'message': False, 'car': None}
+
+def get_hide_hint_str(game: dict, shown_hint: dict, top: int) -> str:
+    """Return the ANSI updates removing the hint on screen, empty if there is none."""
+    updates = ""
+    if shown_hint['car'] is not None:
+        updates += get_car_update_str(game, shown_hint['car'], top)
+        shown_hint['car'] = None
+    if shown_hint['message']:
+        updates += get_message_update_str(game, "", top)
+        shown_hint['message'] = False
+    return updates
+
+def get_show_hint_str(game: dict, hints: dict, shown_hint: dict, top: int) -> str:
+    """Return the ANSI updates showing the hint for the current position (underlined car and message)."""
+    updates = get_hide_hint_str(game, shown_hint, top)
+    move = get_hint_move(game, hints)
+    if hints.get('unavailable'):
+        text = "Hint: unavailable, this board has too many positions."
+    elif hints['distances'] is None:
+        text = "Hint: still thinking..."
+    elif move is None:
+        text = "Hint: no way to win from here."
+    else:
+        letter, direction = move
+        shown_hint['car'] = ord(letter) - ord('A')
+        text = f"Hint: {letter} {direction}"
+        updates += get_car_update_str(game, shown_hint['car'], top, "\u001b[4m")  # underlined
+    shown_hint['message'] = True
+    return updates + get_message_update_str(game, text, top)
+
+def new_session(game: dict) -> dict:
+    """Selected car, move count and move journal of a game being played."""
+    return {'selected_car': None, 'moves': 0, 'journal': new_journal(game), 'checked': False}
+
+ARROW_KEYS = {'UP', 'DOWN', 'LEFT', 'RIGHT'}
+SLIDE_KEYS = {'SHIFT+UP': 'UP', 'SHIFT+DOWN': 'DOWN', 'SHIFT+LEFT': 'LEFT', 'SHIFT+RIGHT': 'RIGHT'}
+UNDO_KEY, REDO_KEY = '-', '+'
+
+def apply_key(game: dict, session: dict, key: str) -> tuple | None:
+    """Selects, moves, undoes or redoes for key (as returned by getkey) like play_game.
+
+    Returns (car_index, old_pos) of the car that moved, None if none did.
+    """
+    key = key.upper()
+    selected_car = session['selected_car']
+    journal = session['journal']
+    if key in ARROW_KEYS:
+        # proceed to move proper car
+        if selected_car is not None:
+            old_pos = game['cars'][selected_car][0]
+            if move_car(game, selected_car, key):
+                record_move(journal, game, selected_car, 1 if key in ['RIGHT', 'DOWN'] else -1)
+                session['moves'] = get_journal_moves(journal)
+                return selected_car, old_pos
+    elif key in SLIDE_KEYS:
+        # slide the car until it hits something, each cell counts as a move
+        if selected_car is not None:
+            old_pos = game['cars'][selected_car][0]
+            moves_left = game['max_moves'] - session['moves']
+            distance = slide_car(game, selected_car, SLIDE_KEYS[key], moves_left)
+            if distance:
+                record_move(journal, game, selected_car, distance if key in ['SHIFT+RIGHT', 'SHIFT+DOWN'] else -distance)
+                session['moves'] = get_journal_moves(journal)
+                return selected_car, old_pos
+    elif key in [UNDO_KEY, REDO_KEY]:
+        # an undone move is given back: max_moves limits the moves of the position on the board
+        moved = undo_move(journal, game) if key == UNDO_KEY else redo_move(journal, game)
+        session['moves'] = get_journal_moves(journal)
+        return moved
+    elif len(key) == 1 and key.isalpha():
+        car_index = ord(key) - ord('A')
+        if 0 <= car_index < len(game['cars']):
+            session['selected_car'] = car_index
+    return None
+
+def get_unwinnable_str(game: dict) -> str:
+    """Return a warning when some car will always stand in A's way, empty otherwise."""
+    blockers = get_exit_blockers(game, get_locked_cars(game))
+    if not blockers:
+        return ""
+    return f"This board can't be won: {', '.join(chr(65 + i) for i in blockers)} can't get out of A's way."
+
+def get_dead_position_str(game: dict, hints: dict, current_move_number: int) -> str:
+    """Return a warning when the position can't be won in the moves left, empty if it can or the table isn't ready."""
+    if hints['distances'] is None:
+        return ""
+    layout = hints['layout']
+    distance = hints['distances'].get(canonical_state(layout, pack_state(layout, game['cars'])))
+    moves_left = game['max_moves'] - current_move_number
+    if distance is None:
+        return f"No way to win from here, undo with {UNDO_KEY}."
+    if distance > moves_left:
+        return f"Can't win in the {moves_left} moves left ({distance} needed), undo with {UNDO_KEY}."
+    return ""
+
+def get_table_ready_str(game: dict, hints: dict, session: dict) -> str:
+    """get_dead_position_str of the position reached when the hint table gets ready, once per session.
+
+    The start position and the moves played while the table was built could not be checked.
+    """
+    if session['checked'] or hints['distances'] is None:
+        return ""
+    session['checked'] = True
+    return get_dead_position_str(game, hints, session['moves'])
+
+def play_game(game: dict, log=None) -> int:
+    """Main game loop. Every key is also recorded in log (a recorder.SessionLog) when given."""
+    session = new_session(game)
+    recording = None
+    if log is not None:
+        import recorder
+        recording = recorder.new_recording(game)
+
+    def finish(outcome):
+        if recording is not None:
+            recorder.record_end(recording, outcome, session['moves'])
+            log.write(recording)
+        return outcome
 
     def clear_screen():
         print("\033[H\033[J", end="")
 
-    while current_moves < game['max_moves']:
-        clear_screen()
-        print(get_controls_str())
-        print(get_game_str(game, current_moves))
+    # full frame once, then only the cells that change
+    controls = get_controls_str()
+    top = len(controls.splitlines())
+    clear_screen()
+    print(controls)
+    print(get_game_str(game, session['moves']))
+
+    # hints come from a table built in the background while the player thinks
+    hints = start_hint_table(game)
+    shown_hint = new_shown_hint()
+
+    # a board that can't be won is told right away, a lost position after the move
+    def show_warning(warning):
+        shown_hint['message'] = True
+        return get_message_update_str(game, warning, top)
+
+    warning = get_unwinnable_str(game)
+    if warning:
+        # says more than the dead position warning would
+        session['checked'] = True
+        print(show_warning(warning), end="", flush=True)
+
+    def redraw_car(car_index, old_pos):
+        updates = get_hide_hint_str(game, shown_hint, top)
+        updates += get_move_update_str(game, car_index, old_pos, session['moves'], top)
+        warning = get_dead_position_str(game, hints, session['moves'])
+        if warning:
+            updates += show_warning(warning)
+        print(updates, end="", flush=True)
+
+    while session['moves'] < game['max_moves']:
+        warning = get_table_ready_str(game, hints, session)
+        if warning:
+            print(show_warning(warning), end="", flush=True)
         key = getkey().upper()
         
         # abandoned
         if key == 'ESCAPE':
             print("Leaving Game! See you soon!")
-            return 2
-        if key in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-            # proceed to move proper car
-            if selected_car is not None:
-                if move_car(game, selected_car, key):
-                    current_moves += 1
-        elif key.isalpha() and len(key) == 1:
-            car_index = ord(key) - ord('A')
-            if 0 <= car_index < len(game['cars']):
-                selected_car = car_index
+            return finish(2)
+        moved = None
+        if key == '?':
+            print(get_show_hint_str(game, hints, shown_hint, top), end="", flush=True)
+        else:
+            moved = apply_key(game, session, key)
+            if moved is not None:
+                redraw_car(*moved)
+        if recording is not None:
+            recorder.record_key(recording, game, session, key, moved)
        
         if is_win(game):
             clear_screen()
-            print(get_game_str(game, current_moves))
-            print(f"\nCongratulations! You've won in {current_moves} moves!")
-            return 0  # victory!
+            print(get_game_str(game, session['moves']))
+            print(f"\nCongratulations! You've won in {session['moves']} moves!")
+            return finish(0)  # victory!
     
     # end of loop without outcome
     clear_screen()
-    print(get_game_str(game, current_moves))
+    print(get_game_str(game, session['moves']))
     print("\nGame Over! You've run out of moves.")
-    return 1  # defeat (out of moves)
+    return finish(1)  # defeat (out of moves)
 
 def get_controls_str() -> str:
     controls = "\n".join([
@@ -247,6 +616,9 @@ def get_controls_str() -> str:
         "╠════════════════════════╣",
         "║ A-Z : Pick a car       ║",
         "║ ↑↓←→: Déplacer         ║", 
+        "║ ⇧+↑↓←→: Glisser        ║",
+        "║ ?   : Indice           ║",
+        "║ -/+ : Annuler/Refaire  ║",
         "║ ESC : Quitter          ║",
         "╚════════════════════════╝"
     ])
@@ -254,15 +626,100 @@ def get_controls_str() -> str:
 
 
 if __name__ == '__main__':
-    usage = """
-Usage: python3 ulbloque.py <game_file>
+    import argparse
+    import os
+
+    examples = """
 Examples:
  python3 ulbloque.py game1.txt
+ python3 ulbloque.py --live game1.txt
+ python3 ulbloque.py --profile stats.json game1.txt
+ python3 ulbloque.py --record logs/ game1.txt
  python3 ulbloque.py puzzle2.txt
+ python3 ulbloque.py --solve game1.txt
+ python3 ulbloque.py --solve --strategy astar game3.txt
+ python3 ulbloque.py --check levels/ --jobs 8 --report report.csv
+ python3 ulbloque.py --check pack.txt --jobs 8
+ python3 ulbloque.py --solve --cache game1.txt
+ python3 ulbloque.py --explore game1.txt --graph game1.graph
+ python3 ulbloque.py --analyse game2.txt
+ python3 ulbloque.py --db puzzles.db --size 6x6 --length 25-30
     """
-    if len(sys.argv) != 2:
-        print(usage)
+    parser = argparse.ArgumentParser(epilog=examples, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('game_file', nargs='?', help="game to play (or to solve with --solve)")
+    parser.add_argument('--live', action='store_true', help="play with a clock and the hint progress updated between keys (Unix)")
+    parser.add_argument('--profile', metavar='FILE', nargs='?', const='1', help="time key reads, moves and rendering, print a summary at the end (or write it as JSON to FILE); also ULBLOQUE_PROFILE=1|FILE")
+    parser.add_argument('--record', metavar='DIR', help="append the keys played and their timing to the session logs of DIR (see recorder.py)")
+    parser.add_argument('--solve', action='store_true', help="print a shortest solution instead of playing")
+    parser.add_argument('--strategy', choices=['bfs', 'astar', 'bidirectional'], default='bfs', help="search used by --solve, reports the nodes expanded and time on stderr")
+    parser.add_argument('--check', metavar='PATH', help="solve every game*.txt of a directory (or every game of a puzzle pack) and check its max_moves")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes for --check")
+    parser.add_argument('--report', metavar='FILE', help="--check report file, .csv or .json (default: csv on stdout)")
+    parser.add_argument('--cache', action='store_true', help="reuse solutions stored next to the game files")
+    parser.add_argument('--analyse', action='store_true', help="print the locked cars and whether the game can be won within max_moves")
+    parser.add_argument('--explore', action='store_true', help="print statistics about every reachable position")
+    parser.add_argument('--graph', metavar='FILE', help="--explore also writes the binary configuration graph to FILE")
+    parser.add_argument('--raw-count', action='store_true', help="--explore also counts the states before merging mirror images (a second enumeration)")
+    parser.add_argument('--db', metavar='FILE', help="play a random puzzle of a puzzle database (see puzzledb.py) instead of game_file")
+    parser.add_argument('--size', default='6x6', help="--db puzzle size, WxH")
+    parser.add_argument('--length', default='0-65534', help="--db optimal length, MIN-MAX")
+    args = parser.parse_args()
+
+    if args.check:
+        from checker import check_levels
+        exit(0 if check_levels(args.check, args.jobs, args.report, args.cache) else 1)
+    if args.db:
+        from puzzledb import PuzzleDatabase, parse_size, parse_range
+        with PuzzleDatabase(args.db) as db:
+            record = db.get_random_record(*parse_size(args.size), *parse_range(args.length))
+        if record is None:
+            print(f"No {args.size} puzzle of length {args.length} in {args.db}.", file=sys.stderr)
+            exit(1)
+        game = record['game']
+    elif args.game_file is None:
+        parser.print_help()
         exit(1)
-    game = parse_game(sys.argv[1])
-    result = play_game(game)
-
+    else:
+        game = parse_game(args.game_file)
+    if args.analyse:
+        from analysis import analyse_game, get_analysis_str
+        analysis = analyse_game(game)
+        print(get_analysis_str(analysis))
+        exit(0 if analysis['winnable'] else 1)
+    if args.explore:
+        from explorer import explore, get_exploration_str
+        print(get_exploration_str(game, explore(game, args.graph, args.raw_count)))
+        exit(0)
+    if args.solve:
+        from solver import STRATEGIES, get_solution_str
+        if args.cache:
+            from cache import SolutionCache, get_cache_path, solve_cached
+            with SolutionCache(get_cache_path(args.game_file or args.db)) as cache:
+                solution = solve_cached(game, cache)
+        else:
+            result = STRATEGIES[args.strategy](game)
+            solution = result['moves']
+            print(f"{args.strategy}: {result['expanded']} nodes expanded in {result['time']:.3f}s", file=sys.stderr)
+        print(get_solution_str(solution))
+        exit(0 if solution is not None else 1)
+    if args.record and args.live:
+        parser.error("--record only records the game played without --live")
+    if args.live:
+        import async_game
+        play, modules = async_game.run_game, [async_game, sys.modules['ulbloque'], sys.modules['getkey']]
+    else:
+        play, modules = play_game, [sys.modules[__name__]]
+    profile = args.profile or os.environ.get('ULBLOQUE_PROFILE')
+    if profile:
+        import instrument
+        stats = instrument.new_stats()
+        for module in modules:
+            instrument.enable(module, stats)
+    if args.record:
+        from recorder import SessionLog
+        with SessionLog(args.record) as log:
+            result = play(game, log)
+    else:
+        result = play(game)
+    if profile:
+        instrument.report(stats, profile)